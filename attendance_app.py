@@ -1,269 +1,202 @@
 import streamlit as st
 import pandas as pd
-from datetime import datetime, timedelta
-import io
+import json
+import os
+import uuid
+from datetime import time, timedelta
+from attendance_core import iter_attendance_cached
+from compact_records import has_time, ordinals_to_dates
+from result_cache import ResultCache
+from exports import EXPORT_FORMATS
+from attendance_explorer import FILTERS, PAGE_SIZES, page_slice
+from shift_policy import DEFAULT_POLICY, ShiftPolicy
+from time_parsing import format_minutes
+from processing_pool import ProcessingCancelled, ProcessingPool
+from attendance_calendar import WEEKDAYS
 
-def extract_clock_times(clock_in_out_time, clock_out_column):
-    all_times = []
-    original_times = []
-    
-    # Collect all times from Clock-in/out Time column
-    if not pd.isna(clock_in_out_time) and clock_in_out_time != '':
-        times = str(clock_in_out_time).split()
-        for time_str in times:
-            try:
-                time_obj = datetime.strptime(time_str, '%H:%M')
-                all_times.append(time_obj)
-                original_times.append(time_str)
-            except ValueError:
-                continue
-    
-    # Collect time from Clock Out column
-    if not pd.isna(clock_out_column) and clock_out_column != '':
-        try:
-            time_obj = datetime.strptime(str(clock_out_column), '%H:%M')
-            all_times.append(time_obj)
-            original_times.append(str(clock_out_column))
-        except ValueError:
-            pass
-    
-    if not all_times:
-        return None, None
-    
-    # Add 9 hours to all times for comparison purposes only
-    normalized_times = []
-    for i, time_obj in enumerate(all_times):
-        # Add 9 hours
-        new_time = time_obj + timedelta(hours=9)
-        
-        # If it goes over 23:59, subtract 24 hours to bring it back in range
-        if new_time.day > time_obj.day:
-            new_time = new_time - timedelta(hours=24)
-        
-        normalized_times.append((new_time, original_times[i]))
-    
-    # Sort by normalized times
-    normalized_times.sort(key=lambda x: x[0])
-    
-    # Get original times for first (check-in) and last (check-out)
-    first_original = normalized_times[0][1]
-    last_original = normalized_times[-1][1] if len(normalized_times) > 1 else None
-    
-    # If there's only one time, treat it as check-in
-    if len(normalized_times) == 1:
-        # if it's between 02:00 and 18:00, return None for check-in
-        if datetime.strptime(first_original, '%H:%M').time() >= datetime.strptime('02:00', '%H:%M').time() and \
-           datetime.strptime(first_original, '%H:%M').time() <= datetime.strptime('18:00', '%H:%M').time():
-            return None, first_original
-        return first_original, None
+# Streamlit frontend only: the processing pipeline lives in attendance_core
+
+@st.cache_resource
+def get_result_cache():
+    """Result cache shared by every session; set ATTENDANCE_CACHE_DIR to also keep results on disk"""
+    return ResultCache(cache_dir=os.environ.get('ATTENDANCE_CACHE_DIR') or None)
+
+@st.cache_resource
+def get_processing_pool():
+    """Worker pool shared by every session; set ATTENDANCE_WORKERS to change its size"""
+    return ProcessingPool()
+
+def _progress_text(progress):
+    stage, done, total = progress
+    if stage == 'Queued':
+        return "Waiting for a free worker..."
+    if total:
+        return f"{stage}: {min(done, total):,} of {total:,}"
+    return f"{stage}: {done:,}"
+
+def _cancel_processing():
+    file_id, options, job = st.session_state['processing_job']
+    job.cancel()
+    st.session_state['cancelled_upload'] = file_id
+
+def process_with_progress(uploaded_file, trace_memory, profile):
+    """process_attendance_cached in the shared pool, with a progress bar and a Cancel button"""
+    if st.session_state.get('cancelled_upload') == uploaded_file.file_id:
+        st.info("Processing was cancelled.")
+        if st.button("Process again"):
+            del st.session_state['cancelled_upload']
+            st.rerun()
+        st.stop()
     
-    # Check if check-in and check-out are within 1 hour of each other
-    if first_original and last_original:
+    # A rerun while the upload is being processed (e.g. a sidebar change) picks up the running job
+    options = (trace_memory, profile)
+    running = st.session_state.get('processing_job')
+    if running is not None and running[:2] == (uploaded_file.file_id, options) and not running[2].cancelled:
+        job = running[2]
+    else:
+        if running is not None:
+            # A new upload (or other diagnostics options) replaces the job
+            running[2].cancel()
+            del st.session_state['processing_job']
+        steps = iter_attendance_cached(uploaded_file, get_result_cache(), trace_memory=trace_memory, profile=profile)
+        # The first step only looks up the result cache, so reruns of a processed upload never wait for a worker
         try:
-            first_time = datetime.strptime(first_original, '%H:%M')
-            last_time = datetime.strptime(last_original, '%H:%M')
-            
-            # Handle overnight case for time difference calculation
-            if last_time < first_time:
-                last_time += timedelta(days=1)
-            
-            time_diff = abs((last_time - first_time).total_seconds() / 3600)
-            
-            # If within 1 hour, apply the rule
-            if time_diff <= 1:
-                # Convert to hour for comparison
-                first_hour = datetime.strptime(first_original, '%H:%M').time()
-                
-                # If time is between 02:00 and 18:00, keep only check-out
-                if datetime.strptime('02:00', '%H:%M').time() <= first_hour <= datetime.strptime('18:00', '%H:%M').time():
-                    return None, last_original
-                # If time is outside 02:00-18:00 range (18:01-01:59), keep only check-in
-                else:
-                    return first_original, None
-        except:
-            pass
+            next(steps)
+        except StopIteration as cached:
+            return cached.value
+        session = st.session_state.setdefault('session_id', uuid.uuid4().hex)
+        job = get_processing_pool().submit(session, steps)
+        st.session_state['processing_job'] = (uploaded_file.file_id, options, job)
     
-    return first_original, last_original
+    bar = st.progress(0.0, text=_progress_text(job.progress))
+    cancel = st.empty()
+    cancel.button("Cancel", on_click=_cancel_processing)
+    while not job.wait(0.25):
+        bar.progress(job.fraction(), text=_progress_text(job.progress))
+    bar.empty()
+    cancel.empty()
+    del st.session_state['processing_job']
+    try:
+        return job.result()
+    except ProcessingCancelled:
+        st.stop()
 
-def calculate_time_difference(start_time, end_time):
-    """Calculate time difference in hours between two time strings"""
-    if pd.isna(start_time) or pd.isna(end_time):
-        return 0
+def _minute_of_day(value):
+    return value.hour * 60 + value.minute
+
+def _time_of_day(minute):
+    return time(minute // 60, minute % 60)
+
+def shift_policy_controls():
+    """Sidebar inputs for the shift rules; returns the chosen ShiftPolicy"""
+    default = DEFAULT_POLICY
+    shift_start = st.time_input("Shift start (later check-ins are late)", value=_time_of_day(default.shift_start), step=60)
+    shift_end = st.time_input("Shift end (earlier check-outs are early)", value=_time_of_day(default.shift_end), step=60)
+    window = st.slider(
+        "A lone punch is a check-out between",
+        value=tuple(_time_of_day(minute) for minute in default.out_only_window),
+        min_value=time(0, 0), max_value=time(23, 59), step=timedelta(minutes=1), format="HH:mm"
+    )
+    collapse_minutes = st.number_input(
+        "Check-in and check-out this close are one punch (minutes)",
+        min_value=0, max_value=1439, value=default.collapse_minutes, step=5
+    )
+    return ShiftPolicy(
+        shift_start=_minute_of_day(shift_start),
+        shift_end=_minute_of_day(shift_end),
+        out_only_window=(_minute_of_day(window[0]), _minute_of_day(window[1])),
+        collapse_minutes=int(collapse_minutes),
+    )
+
+def download_controls(exports, dataset, stem, label, button_type):
+    """Format picker plus a download button; the file is only encoded once a download is requested"""
+    export_format = st.selectbox("Download format", list(EXPORT_FORMATS), key=f"{dataset}_format")
+    if not exports.is_ready(dataset, export_format):
+        if not st.button(f"Prepare {export_format} download", key=f"{dataset}_prepare"):
+            return
+        with st.spinner(f"Encoding {export_format}..."):
+            exports.get(dataset, export_format)
     
-    try:
-        start = datetime.strptime(start_time, '%H:%M')
-        end = datetime.strptime(end_time, '%H:%M')
-        
-        # Handle overnight shifts
-        if end < start:
-            end += timedelta(days=1)
-        
-        diff = end - start
-        return diff.total_seconds() / 3600  # Convert to hours
-    except:
-        return 0
+    st.download_button(
+        label=label,
+        data=exports.get(dataset, export_format),
+        file_name=exports.file_name(dataset, export_format, stem),
+        mime=EXPORT_FORMATS[export_format][1],
+        type=button_type,
+        key=f"{dataset}_download"
+    )
 
-def generate_employee_summary(df):
-    """Generate employee summary with attendance statistics"""
+def show_page(key, total, fetch):
+    """Page size and page pickers, then only the requested page of `total` rows"""
+    col1, col2 = st.columns(2)
+    with col1:
+        page_size = st.selectbox("Rows per page", PAGE_SIZES, index=1, key=f"{key}_page_size")
+    pages = max(1, -(-total // page_size))
+    with col2:
+        # The page count is part of the key so a narrower filter starts again at page 1
+        page = st.number_input(f"Page (of {pages:,})", min_value=1, max_value=pages, value=1, key=f"{key}_page_{pages}")
     
-    # Extract month from date
-    df['Date'] = pd.to_datetime(df['Date'])
-    df['Month'] = df['Date'].dt.strftime('%b')
+    st.dataframe(fetch(page - 1, page_size), use_container_width=True, hide_index=True)
+    first_row = (page - 1) * page_size
+    st.caption(f"Rows {min(first_row + 1, total):,}–{min(first_row + page_size, total):,} of {total:,}")
+
+def attendance_explorer(explorer, policy=DEFAULT_POLICY):
+    """Name/date/flag filters over the cleaned records, late and early as `policy` defines them"""
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        name_prefix = st.text_input("Employee name starts with", key="explore_name")
+    with col2:
+        bounds = explorer.date_bounds()
+        date_range = st.date_input("Date range", value=bounds, key="explore_dates") if bounds else ()
+    with col3:
+        show = st.selectbox("Show", FILTERS, key="explore_show")
     
-    # Calculate total working days (days when any employee checked in)
-    total_working_days = len(df[df['Clock In'].notna()]['Date'].dt.date.unique())
+    # A half-picked range (start only) filters from that day on
+    start = date_range[0] if len(date_range) > 0 else None
+    end = date_range[1] if len(date_range) > 1 else None
+    positions = explorer.query(name_prefix.strip(), start, end, show, policy)
+    show_page("explore", len(positions), lambda page, page_size: explorer.page(positions, page, page_size))
+
+def attendance_calendar(calendar):
+    """Absences and streaks against a working-day calendar with weekly offs and holidays"""
+    first_day, last_day = calendar.day_range()
+    if last_day < first_day:
+        st.info("No dated attendance records")
+        return
+    first, last = ordinals_to_dates([first_day, last_day]).astype('datetime64[D]').tolist()
     
-    summary_data = []
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        weekly_offs = st.multiselect("Weekly days off", WEEKDAYS, key="calendar_offs")
+    with col2:
+        holidays = st.text_input("Holidays (comma-separated dates)", key="calendar_holidays",
+                                 placeholder="2025-06-16, 2025-06-17")
+    with col3:
+        date_range = st.date_input("Report range", value=(first, last), min_value=first, max_value=last, key="calendar_range")
+    monthly = st.checkbox("Per month", key="calendar_monthly")
     
-    for employee in df.groupby('Name'):
-        name = employee[0]
-        emp_data = employee[1]
-        
-        # Basic info
-        month = emp_data['Month'].iloc[0]
-        
-        # Count check-ins and check-outs
-        total_checkins = emp_data['Clock In'].notna().sum()
-        total_checkouts = emp_data['Clock Out'].notna().sum()
-        
-        # Calculate employee attendance days
-        employee_checkin_days = len(emp_data[emp_data['Clock In'].notna()]['Date'].dt.date.unique())
-        employee_checkout_days = len(emp_data[emp_data['Clock Out'].notna()]['Date'].dt.date.unique())
-        employee_attendance_days = max(employee_checkin_days, employee_checkout_days)
-        
-        # Calculate absences
-        absences = total_working_days - employee_attendance_days
-        
-        # Late check-ins (after 19:00)
-        late_checkins = 0
-        for _, row in emp_data.iterrows():
-            if pd.notna(row['Clock In']):
-                checkin_time = datetime.strptime(row['Clock In'], '%H:%M').time()
-                if checkin_time > datetime.strptime('19:00', '%H:%M').time():
-                    late_checkins += 1
-        
-        # Early checkouts (before 04:00)
-        early_checkouts = 0
-        for _, row in emp_data.iterrows():
-            if pd.notna(row['Clock Out']):
-                checkout_time = datetime.strptime(row['Clock Out'], '%H:%M').time()
-                if checkout_time < datetime.strptime('04:00', '%H:%M').time():
-                    early_checkouts += 1
-        
-        # Calculate undertime and overtime
-        total_undertime = 0
-        total_overtime = 0
-        
-        for _, row in emp_data.iterrows():
-            if pd.notna(row['Clock In']) and pd.notna(row['Clock Out']):
-                checkin_time = datetime.strptime(row['Clock In'], '%H:%M').time()
-                checkout_time = datetime.strptime(row['Clock Out'], '%H:%M').time()
-                
-                # Undertime calculation
-                # Late check-in after 19:00
-                if checkin_time > datetime.strptime('19:00', '%H:%M').time():
-                    late_minutes = (datetime.combine(datetime.today(), checkin_time) - 
-                                  datetime.combine(datetime.today(), datetime.strptime('19:00', '%H:%M').time())).total_seconds() / 60
-                    total_undertime += late_minutes / 60
-                
-                # Early checkout before 04:00
-                if checkout_time < datetime.strptime('04:00', '%H:%M').time():
-                    early_minutes = (datetime.combine(datetime.today(), datetime.strptime('04:00', '%H:%M').time()) - 
-                                   datetime.combine(datetime.today(), checkout_time)).total_seconds() / 60
-                    total_undertime += early_minutes / 60
-                
-                # Overtime calculation
-                # Early check-in before 19:00
-                if checkin_time < datetime.strptime('19:00', '%H:%M').time():
-                    early_minutes = (datetime.combine(datetime.today(), datetime.strptime('19:00', '%H:%M').time()) - 
-                                   datetime.combine(datetime.today(), checkin_time)).total_seconds() / 60
-                    total_overtime += early_minutes / 60
-                
-                # Late checkout after 04:00
-                if checkout_time > datetime.strptime('04:00', '%H:%M').time():
-                    late_minutes = (datetime.combine(datetime.today(), checkout_time) - 
-                                  datetime.combine(datetime.today(), datetime.strptime('04:00', '%H:%M').time())).total_seconds() / 60
-                    total_overtime += late_minutes / 60
-        
-        # Net overtime
-        net_overtime = total_overtime - total_undertime
-        
-        summary_data.append({
-            'Name': name,
-            'Month': month,
-            'Total Check-ins': total_checkins,
-            'Total Check-outs': total_checkouts,
-            'Absences': absences,
-            'Late Check-ins': late_checkins,
-            'Early Checkouts': early_checkouts,
-            'Undertime (hrs)': round(total_undertime, 2),
-            'Overtime (hrs)': round(total_overtime, 2),
-            'Net Overtime (hrs)': round(net_overtime, 2)
-        })
-    
-    return pd.DataFrame(summary_data)
-
-def process_attendance_file(uploaded_file):
     try:
-        # Read Excel file - handle both .xlsx and .xls formats
-        if uploaded_file.name.endswith('.xls'):
-            try:
-                df = pd.read_excel(uploaded_file, engine='xlrd')
-            except ImportError:
-                return None, None, "Missing dependency: xlrd is required for .xls files. Please run: pip install xlrd==2.0.1"
-            except Exception as e:
-                return None, None, f"Error reading .xls file with xlrd engine: {str(e)}"
-        else:
-            df = pd.read_excel(uploaded_file)
-        
-        # Extract clock times
-        df[['Extracted_Clock_In', 'Extracted_Clock_Out']] = df.apply(
-            lambda row: pd.Series(extract_clock_times(row['Clock-in/out Time'], row['Clock Out'])), axis=1
-        )
-        
-        # Handle different column structures
-        columns_to_keep = []
-        final_columns = []
-        
-        # Check for employee number column
-        if 'Emp No.' in df.columns:
-            columns_to_keep.append('Emp No.')
-            final_columns.append('Emp No.')
-        else:
-            # Create a default employee number if missing
-            df['Emp No.'] = range(1, len(df) + 1)
-            columns_to_keep.append('Emp No.')
-            final_columns.append('Emp No.')
-        
-        # Check for AC number column
-        if 'AC-No.' in df.columns:
-            columns_to_keep.append('AC-No.')
-            final_columns.append('AC-No.')
-        else:
-            # Create a default AC number if missing
-            df['AC-No.'] = range(1000, 1000 + len(df))
-            columns_to_keep.append('AC-No.')
-            final_columns.append('AC-No.')
-        
-        # Add required columns
-        columns_to_keep.extend(['Name', 'Date', 'Extracted_Clock_In', 'Extracted_Clock_Out'])
-        final_columns.extend(['Name', 'Date', 'Clock In', 'Clock Out'])
-        
-        df_cleaned = df[columns_to_keep].copy()
-        
-        # Rename columns
-        df_cleaned.columns = final_columns
-        
-        # Filter out rows with no clock in or clock out
-        df_filtered = df_cleaned.dropna(subset=['Clock In', 'Clock Out'], how='all')
-        
-        # Generate employee summary
-        df_summary = generate_employee_summary(df_filtered)
-        
-        return df_filtered, df_summary, None
-        
-    except Exception as e:
-        return None, None, str(e)
+        work = calendar.work_calendar(weekly_offs, [day.strip() for day in holidays.split(',') if day.strip()])
+    except ValueError as e:
+        st.error(f"Invalid holiday date: {e}")
+        return
+    # A half-picked range (start only) reports from that day on
+    start = date_range[0] if len(date_range) > 0 else None
+    end = date_range[1] if len(date_range) > 1 else None
+    st.caption(
+        f"{work.working_days(start, end)} working days: every day of the records' range except weekly days off "
+        "and holidays. An employee attends a day with any clock-in or clock-out; streaks count working days only."
+    )
+    
+    report = calendar.period_report(work, 'M', start, end) if monthly else calendar.report(work, start, end)
+    st.dataframe(report, use_container_width=True, hide_index=True)
+    st.download_button(
+        label="📥 Download Calendar Report",
+        data=report.to_csv(index=False),
+        file_name="attendance_calendar.csv",
+        mime="text/csv",
+        key="calendar_download"
+    )
 
 def main():
     st.set_page_config(page_title="Attendance Data Processor", page_icon="📊", layout="wide")
@@ -273,21 +206,31 @@ def main():
     
     # File upload
     uploaded_file = st.file_uploader(
-        "Choose an Excel file", 
-        type=['xlsx', 'xls'],
-        help="Upload your attendance Excel file"
+        "Choose an Excel file or a punch log", 
+        type=['xlsx', 'xls', 'csv', 'txt'],
+        help="Upload your attendance Excel file, or a raw punch log exported from the terminal (one AC-No. and timestamp per line)"
     )
     
+    # Opt-in diagnostics for slow uploads
+    with st.sidebar:
+        # Changing the policy recomputes the summary from per-employee histograms, without reprocessing
+        st.subheader("Shift policy")
+        policy = shift_policy_controls()
+        
+        st.subheader("Diagnostics")
+        trace_memory = st.checkbox("Trace peak memory per stage (slower)")
+        profile = st.checkbox("Profile with cProfile")
+    
     if uploaded_file is not None:
         st.success(f"File uploaded: {uploaded_file.name}")
         
-        # Process the file
-        with st.spinner("Processing attendance data..."):
-            df_processed, df_summary, error = process_attendance_file(uploaded_file)
+        # Process the file in chunks, taking turns with other sessions' uploads
+        result, error, from_cache = process_with_progress(uploaded_file, trace_memory, profile)
         
         if error:
             st.error(f"Error processing file: {error}")
         else:
+            df_processed = result['cleaned']
             st.success("✅ File processed successfully!")
             
             # Display statistics
@@ -295,52 +238,69 @@ def main():
             with col1:
                 st.metric("Total Records", len(df_processed))
             with col2:
-                records_with_clock_in = df_processed['Clock In'].notna().sum()
+                records_with_clock_in = has_time(df_processed['Clock In']).sum()
                 st.metric("Records with Clock In", records_with_clock_in)
             with col3:
-                records_with_clock_out = df_processed['Clock Out'].notna().sum()
+                records_with_clock_out = has_time(df_processed['Clock Out']).sum()
                 st.metric("Records with Clock Out", records_with_clock_out)
             with col4:
                 # Calculate total working days (days when any employee checked in)
-                total_working_days = len(df_processed[df_processed['Clock In'].notna()]['Date'].dt.date.unique()) if not df_processed.empty else 0
+                total_working_days = df_processed.loc[has_time(df_processed['Clock In']), 'Date'].nunique(dropna=False)
                 st.metric("Total Working Days", total_working_days)
             
+            # Rejected tokens and suspicious rows are reported, not silently dropped
+            diagnostics = result['diagnostics']
+            if len(diagnostics):
+                st.warning(
+                    f"⚠️ {int(diagnostics['Count'].sum())} data-quality findings for "
+                    f"{diagnostics['Employee'].nunique()} employees, see the Data Quality tab"
+                )
+            
             # Create tabs for different views
-            tab1, tab2 = st.tabs(["📋 Attendance Data", "📊 Employee Summary"])
+            tab1, tab2, tab3, tab4 = st.tabs(["📋 Attendance Data", "📊 Employee Summary", "🩺 Data Quality", "📅 Calendar"])
             
             with tab1:
-                st.subheader("📋 Attendance Data Preview")
-                st.dataframe(df_processed.head(10), use_container_width=True)
+                st.subheader("📋 Attendance Data")
+                attendance_explorer(result['explorer'], policy)
                 
                 # Download button for attendance data
-                csv_buffer = io.StringIO()
-                df_processed.to_csv(csv_buffer, index=False)
-                csv_data = csv_buffer.getvalue()
-                
-                st.download_button(
-                    label="📥 Download Cleaned CSV",
-                    data=csv_data,
-                    file_name="attendance_cleaned.csv",
-                    mime="text/csv",
-                    type="primary"
-                )
+                download_controls(result['exports'], 'cleaned', "attendance_cleaned", "📥 Download Cleaned Data", "primary")
             
             with tab2:
                 st.subheader("📊 Employee Summary")
-                st.dataframe(df_summary, use_container_width=True)
+                explorer = result['explorer']
+                summary, exports = result['summary'], result['exports']
+                if policy != DEFAULT_POLICY:
+                    summary, exports = result['what_if'].summary(policy), result['what_if'].exports(policy)
+                    st.caption(
+                        f"Shift policy: {format_minutes(policy.shift_start)}–{format_minutes(policy.shift_end)}, "
+                        f"lone punches between {format_minutes(policy.out_only_window[0])} and "
+                        f"{format_minutes(policy.out_only_window[1])} are check-outs, "
+                        f"punches within {policy.collapse_minutes} minutes are one punch. "
+                        "The downloads below use this policy; the Attendance Data tab keeps the default punch rules "
+                        "and flags late check-ins and early checkouts by this shift."
+                    )
                 
-                # Download button for summary
-                summary_buffer = io.StringIO()
-                df_summary.to_csv(summary_buffer, index=False)
-                summary_data = summary_buffer.getvalue()
+                # The what-if summary has the same employees in the same order, so the name index applies to it
+                name_prefix = st.text_input("Employee name starts with", key="summary_name")
+                positions = explorer.query_summary(name_prefix.strip())
+                show_page("summary", len(positions), lambda page, page_size: summary.iloc[page_slice(positions, page, page_size)])
                 
-                st.download_button(
-                    label="📥 Download Summary CSV",
-                    data=summary_data,
-                    file_name="employee_summary.csv",
-                    mime="text/csv",
-                    type="secondary"
-                )
+                # Download button for summary
+                download_controls(exports, 'summary', "employee_summary", "📥 Download Summary", "secondary")
+            
+            with tab3:
+                st.subheader("🩺 Data Quality")
+                if len(diagnostics):
+                    st.dataframe(result['quality_totals'], use_container_width=True, hide_index=True)
+                    st.dataframe(diagnostics, use_container_width=True, hide_index=True)
+                    download_controls(result['exports'], 'diagnostics', "attendance_diagnostics", "📥 Download Diagnostics", "secondary")
+                else:
+                    st.info("No malformed times, duplicate punches or suspicious dates found")
+            
+            with tab4:
+                st.subheader("📅 Attendance Calendar")
+                attendance_calendar(result['calendar'])
             
             # Show processing info
             with st.expander("ℹ️ Processing Information"):
@@ -367,6 +327,25 @@ def main():
                    - Overtime for early arrivals and late departures
                    - Net overtime (overtime - undertime)
                 """)
+                
+                # Per-stage timings for the run that produced these results
+                run = result['metrics']
+                st.markdown("**Processing run:**" + (" (served from cache)" if from_cache else ""))
+                st.dataframe(pd.DataFrame(run['stages']), use_container_width=True, hide_index=True)
+                st.caption(
+                    f"Total {run['total_seconds']:.2f}s"
+                    + (f" · peak RSS {run['max_rss_mb']:.0f} MB" if run['max_rss_mb'] else "")
+                    + (" · streaming mode" if run.get('streaming') else "")
+                    + (f" · processed by {run['service']}" if run.get('service') else "")
+                )
+                st.download_button(
+                    label="📥 Download run metrics (JSON)",
+                    data=json.dumps(run, indent=2),
+                    file_name="processing_metrics.json",
+                    mime="application/json"
+                )
+                if result['profile']:
+                    st.code(result['profile'], language=None)
     
     else:
         st.info("👆 Please upload an Excel file to get started")
@@ -0,0 +1,255 @@
+"""Working-day calendar and per-employee attendance bitsets.
+
+    calendar = AttendanceCalendar(df_cleaned)
+    work = calendar.work_calendar(weekly_offs=['Fri'], holidays=['2025-06-16'])
+    calendar.report(work)                   # Name, Working Days, Attended, Absences, streaks, ...
+    calendar.period_report(work, 'M')       # the same counts per month
+
+Usage:
+    python attendance_calendar.py attendance_cleaned.csv --weekly-offs Fri Sat --holidays 2025-06-16 --output calendar.csv
+
+Days are bits of Python ints: bit i stands for the i-th day of the records'
+date range. A WorkCalendar is one bitmap of working days (every day but the
+weekly offs and holidays); each employee has one bitmap of the days they
+clocked in or out. Working days in a range, days attended, absences and
+attendance on days off are then ANDs and int.bit_count() per employee,
+whatever the span of the records. Streaks (longest run of attended working
+days, longest run of absences) are counted over working days only, so a
+weekend or holiday neither breaks nor extends them.
+
+The employee summary keeps its own rule (a working day is a day anyone
+checked in); the calendar is the alternative for rosters with fixed days off.
+"""
+import argparse
+import sys
+
+import numpy as np
+import pandas as pd
+
+from compact_records import NAT_ORDINAL, compact_attendance_frame, day_ordinals, is_compact_frame
+from time_parsing import MISSING_MINUTE
+
+WEEKDAYS = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
+
+REPORT_COLUMNS = ['Name', 'Working Days', 'Attended', 'Absences', 'Attendance %', 'Days Off Attended',
+                  'Longest Streak', 'Longest Absence']
+
+
+def weekday_number(day):
+    """0 (Monday) to 6 (Sunday) for a number, 'Fri' or 'Friday'"""
+    if isinstance(day, (int, np.integer)):
+        if not 0 <= day <= 6:
+            raise ValueError(f'Weekday numbers run from 0 (Monday) to 6 (Sunday), got {day}')
+        return int(day)
+    name = str(day).strip()[:3].title()
+    if name not in WEEKDAYS:
+        raise ValueError(f'Unknown weekday: {day}')
+    return WEEKDAYS.index(name)
+
+
+def to_ordinal(day):
+    """Day ordinal (days since 1970-01-01) of a date, a date string or an ordinal"""
+    if isinstance(day, (int, np.integer)):
+        return int(day)
+    return int(np.datetime64(pd.Timestamp(day), 'D').astype(np.int64))
+
+
+def bits_from_mask(mask):
+    """Python int with bit i set where the boolean array `mask` is True"""
+    return int.from_bytes(np.packbits(np.asarray(mask, dtype=bool), bitorder='little').tobytes(), 'little')
+
+
+def mask_from_bits(bits, n_days):
+    """Boolean array of the first `n_days` bits of a Python int"""
+    data = np.frombuffer(bits.to_bytes((n_days + 7) // 8, 'little'), dtype=np.uint8)
+    return np.unpackbits(data, count=n_days, bitorder='little').astype(bool)
+
+
+def longest_run(bits):
+    """Length of the longest run of set bits, in O(log length) shifts and ANDs"""
+    if not bits:
+        return 0
+    # runs[i]: bits that start a run of at least 2**i set bits
+    runs = [bits]
+    while True:
+        longer = runs[-1] & (runs[-1] >> (1 << (len(runs) - 1)))
+        if not longer:
+            break
+        runs.append(longer)
+    # Extend the longest power-of-two run by smaller powers while some run is still that long
+    length = 1 << (len(runs) - 1)
+    starts = runs[-1]
+    for i in range(len(runs) - 2, -1, -1):
+        extended = starts & (runs[i] >> length)
+        if extended:
+            starts = extended
+            length += 1 << i
+    return length
+
+
+class WorkCalendar:
+    """Working days of an inclusive range of day ordinals, as a bitmap (bit i = day first_day + i)"""
+    __slots__ = ('first_day', 'last_day', 'weekly_offs', 'holidays', 'working')
+
+    def __init__(self, first_day, last_day, weekly_offs=(), holidays=()):
+        self.first_day = to_ordinal(first_day)
+        self.last_day = to_ordinal(last_day)
+        self.weekly_offs = sorted({weekday_number(day) for day in weekly_offs})
+        self.holidays = sorted({to_ordinal(day) for day in holidays})
+
+        days = np.arange(self.first_day, self.last_day + 1, dtype=np.int64)
+        # 1970-01-01 was a Thursday
+        weekdays = (days + 3) % 7
+        self.working = bits_from_mask(~np.isin(weekdays, self.weekly_offs) & ~np.isin(days, self.holidays))
+
+    def __len__(self):
+        return max(self.last_day - self.first_day + 1, 0)
+
+    def mask(self, start=None, end=None):
+        """Bitmap of every day from `start` to `end` (inclusive, clipped to the calendar)"""
+        first = max(to_ordinal(start) if start is not None else self.first_day, self.first_day) - self.first_day
+        last = min(to_ordinal(end) if end is not None else self.last_day, self.last_day) - self.first_day
+        if last < first:
+            return 0
+        return ((1 << (last - first + 1)) - 1) << first
+
+    def working_days(self, start=None, end=None):
+        """Number of working days from `start` to `end`"""
+        return (self.working & self.mask(start, end)).bit_count()
+
+    def compress(self, bitsets):
+        """`bitsets` keeping only the working days, renumbered 0, 1, 2, ... (for streaks over working days)"""
+        n_bytes = (len(self) + 7) // 8
+        rows = np.frombuffer(b''.join(bits.to_bytes(n_bytes, 'little') for bits in bitsets), dtype=np.uint8)
+        days = np.unpackbits(rows.reshape(len(bitsets), n_bytes), axis=1, count=len(self), bitorder='little')
+        kept = np.packbits(days[:, mask_from_bits(self.working, len(self))], axis=1, bitorder='little')
+        return [int.from_bytes(row.tobytes(), 'little') for row in kept]
+
+
+class AttendanceCalendar:
+    """One attendance bitmap per employee (days with a clock-in or clock-out) over the records' date range"""
+
+    def __init__(self, cleaned):
+        self.cleaned = cleaned
+        self._bitsets = None
+
+    def _prepare(self):
+        """(first day, last day, names, bitsets), built on first use"""
+        if self._bitsets is None:
+            df = self.cleaned if is_compact_frame(self.cleaned) else compact_attendance_frame(self.cleaned)
+            names = df['Name'] if isinstance(df['Name'].dtype, pd.CategoricalDtype) else df['Name'].astype('category')
+            codes = names.cat.codes.to_numpy()
+            days = day_ordinals(df['Date']).to_numpy()
+            present = ((df['Clock In'].to_numpy() != MISSING_MINUTE) | (df['Clock Out'].to_numpy() != MISSING_MINUTE))
+            dated = days != NAT_ORDINAL
+
+            # Employees that have records, in name order, as in the summary
+            named = codes >= 0
+            employees = np.unique(codes[named])
+            use = named & dated & present
+            if use.any():
+                first_day, last_day = int(days[use].min()), int(days[use].max())
+            else:
+                first_day, last_day = 0, -1
+
+            attended = np.zeros((len(employees), max(last_day - first_day + 1, 0)), dtype=bool)
+            attended[np.searchsorted(employees, codes[use]), days[use] - first_day] = True
+            packed = np.packbits(attended, axis=1, bitorder='little')
+            bitsets = [int.from_bytes(row.tobytes(), 'little') for row in packed]
+            self._bitsets = (first_day, last_day, np.asarray(names.cat.categories)[employees], bitsets)
+        return self._bitsets
+
+    @property
+    def names(self):
+        return self._prepare()[2]
+
+    def day_range(self):
+        """(first, last) day ordinal with attendance; last < first when there is none"""
+        first_day, last_day, _, _ = self._prepare()
+        return first_day, last_day
+
+    def work_calendar(self, weekly_offs=(), holidays=()):
+        """A WorkCalendar over the records' date range"""
+        first_day, last_day = self.day_range()
+        return WorkCalendar(first_day, last_day, weekly_offs, holidays)
+
+    def bitset(self, name):
+        """Attendance bitmap of one employee (0 if they have no records)"""
+        _, _, names, bitsets = self._prepare()
+        position = np.searchsorted(names, name)
+        return bitsets[position] if position < len(names) and names[position] == name else 0
+
+    def _aligned(self, calendar):
+        """Bitsets shifted onto `calendar`'s day numbering and cut to its range"""
+        first_day, _, _, bitsets = self._prepare()
+        offset = first_day - calendar.first_day
+        full = calendar.mask()
+        if offset >= 0:
+            return [(bits << offset) & full for bits in bitsets]
+        return [(bits >> -offset) & full for bits in bitsets]
+
+    def report(self, calendar, start=None, end=None):
+        """Per-employee working days, attendance, absences and streaks from `start` to `end`"""
+        names = self.names
+        period = calendar.mask(start, end)
+        working = calendar.working & period
+        days_off = ~calendar.working & period
+        n_working = working.bit_count()
+
+        bitsets = [bits & period for bits in self._aligned(calendar)]
+        if not bitsets:
+            return pd.DataFrame(columns=REPORT_COLUMNS)
+        present = calendar.compress([bits & working for bits in bitsets])
+        absent = calendar.compress([working & ~bits for bits in bitsets])
+
+        rows = []
+        for name, bits, present_bits, absent_bits in zip(names, bitsets, present, absent):
+            attended = (bits & working).bit_count()
+            rows.append((name, n_working, attended, n_working - attended,
+                         round(100 * attended / n_working, 1) if n_working else 0.0,
+                         (bits & days_off).bit_count(), longest_run(present_bits), longest_run(absent_bits)))
+        return pd.DataFrame(rows, columns=REPORT_COLUMNS)
+
+    def period_report(self, calendar, freq='M', start=None, end=None):
+        """Working days, attendance and absences per employee and period ('M' months, 'Q' quarters, 'Y' years)"""
+        names = self.names
+        bitsets = self._aligned(calendar)
+        first = pd.Timestamp(np.datetime64(calendar.first_day, 'D'))
+        last = pd.Timestamp(np.datetime64(calendar.last_day, 'D'))
+        rows = []
+        if not len(calendar):
+            return pd.DataFrame(columns=['Name', 'Period', 'Working Days', 'Attended', 'Absences'])
+        for period in pd.period_range(first, last, freq=freq):
+            working = calendar.working & calendar.mask(period.start_time, period.end_time) & calendar.mask(start, end)
+            n_working = working.bit_count()
+            for name, bits in zip(names, bitsets):
+                attended = (bits & working).bit_count()
+                rows.append((name, str(period), n_working, attended, n_working - attended))
+        return pd.DataFrame(rows, columns=['Name', 'Period', 'Working Days', 'Attended', 'Absences'])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Absences and streaks against a working-day calendar')
+    parser.add_argument('cleaned', help='Cleaned attendance CSV (as downloaded from the app)')
+    parser.add_argument('--weekly-offs', nargs='*', default=[], help="Weekly days off, e.g. 'Fri Sat'")
+    parser.add_argument('--holidays', nargs='*', default=[], help='Holiday dates, e.g. 2025-06-16')
+    parser.add_argument('--start', help='First day of the report (default: first record)')
+    parser.add_argument('--end', help='Last day of the report (default: last record)')
+    parser.add_argument('--monthly', action='store_true', help='Report per month instead of over the whole range')
+    parser.add_argument('--output', default='attendance_calendar.csv', help='Where to write the report CSV')
+    args = parser.parse_args(argv)
+
+    calendar = AttendanceCalendar(pd.read_csv(args.cleaned, dtype={'Clock In': str, 'Clock Out': str}))
+    work = calendar.work_calendar(args.weekly_offs, args.holidays)
+    if args.monthly:
+        report = calendar.period_report(work, 'M', args.start, args.end)
+    else:
+        report = calendar.report(work, args.start, args.end)
+    report.to_csv(args.output, index=False)
+    print(f"{len(calendar.names)} employees, {work.working_days(args.start, args.end)} working days, "
+          f"report saved to {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,845 @@
+"""Attendance processing core: clock-time extraction, employee summary and the file pipeline.
+
+    from attendance_core import process_attendance_file
+
+    with open('June.xlsx', 'rb') as f:
+        df_cleaned, df_summary, error = process_attendance_file(f)
+
+This module has no UI. The Streamlit app (attendance_app.py), the batch and
+daily CLIs and the processing service all run on it. Only numpy and pandas
+are imported up front. Modules that are slow to import or only used on
+some paths are imported inside the functions that need them: openpyxl (via
+exports), the explorer and store, the service client and the parallel summary.
+That keeps a cold `import attendance_core` plus a small file well under a
+second.
+"""
+import contextlib
+import os
+import pickle
+
+import numpy as np
+import pandas as pd
+
+from compact_records import (
+    MISSING_DAY, NAT_ORDINAL, clock_minutes, compact_attendance_frame, day_ordinals,
+    has_time, ordinals_to_dates,
+)
+from excel_streaming import DEFAULT_CHUNK_ROWS, iter_excel_chunks
+from instrumentation import PipelineMetrics, log_path
+from result_cache import content_key
+from shift_policy import DEFAULT_POLICY, policy_clock_minutes, select_punches
+from time_parsing import MINUTES_PER_DAY, MISSING_MINUTE, parse_hhmm, parse_hhmm_series, minutes_between
+
+# Uploads larger than this are spilled to disk before their row chunks are read
+STREAMING_THRESHOLD_BYTES = 1024 * 1024
+
+# Bump whenever processing output changes so stale cached results are not reused
+RESULT_CACHE_VERSION = 11
+
+# Below this many rows process start-up costs more than a parallel summary saves
+PARALLEL_MIN_ROWS = 200000
+
+# Seconds the app waits for a processing-service job before giving up on it
+SERVICE_JOB_TIMEOUT = 600
+
+# Raw punch logs (one punch per line, see punch_log) rather than workbooks
+PUNCH_LOG_EXTENSIONS = ('.csv', '.txt')
+
+# Rows per step of iter_attendance_cached: the unit of progress, cancellation and fair sharing of the processing pool
+PROGRESS_CHUNK_ROWS = 5000
+
+# Punch times are ordered with 9 hours added (wrapping past midnight), so a shift day
+# runs from 15:00 to 14:59 and a night shift's punches stay in one row, in order
+SHIFT_ORDER_OFFSET = 540
+
+CLEANED_COLUMNS = ['Emp No.', 'AC-No.', 'Name', 'Date', 'Clock In', 'Clock Out']
+
+
+def extract_clock_times(clock_in_out_time, clock_out_column, policy=DEFAULT_POLICY):
+    all_times = []
+    original_times = []
+
+    # Collect all times from Clock-in/out Time column
+    if not pd.isna(clock_in_out_time) and clock_in_out_time != '':
+        times = str(clock_in_out_time).split()
+        for time_str in times:
+            minutes = parse_hhmm(time_str)
+            if minutes is None:
+                continue
+            all_times.append(minutes)
+            original_times.append(time_str)
+
+    # Collect time from Clock Out column
+    if not pd.isna(clock_out_column) and clock_out_column != '':
+        minutes = parse_hhmm(str(clock_out_column))
+        if minutes is not None:
+            all_times.append(minutes)
+            original_times.append(str(clock_out_column))
+
+    if not all_times:
+        return None, None
+
+    # Add 9 hours to all times for comparison purposes only,
+    # wrapping past 23:59 back into the same day
+    normalized_times = []
+    for i, minutes in enumerate(all_times):
+        normalized_times.append(((minutes + SHIFT_ORDER_OFFSET) % MINUTES_PER_DAY, minutes, original_times[i]))
+
+    # Sort by normalized times
+    normalized_times.sort(key=lambda x: x[0])
+
+    # Get original times for first (check-in) and last (check-out)
+    first_minutes, first_original = normalized_times[0][1:]
+    last_minutes, last_original = normalized_times[-1][1:] if len(normalized_times) > 1 else (None, None)
+
+    # A lone punch is a check-out inside the out-only window (02:00-18:00), otherwise a check-in
+    low, high = policy.out_only_window
+    if len(normalized_times) == 1:
+        if low <= first_minutes <= high:
+            return None, first_original
+        return first_original, None
+
+    # Check if check-in and check-out are within the collapse distance (1 hour) of each other
+    # (overnight aware: an earlier check-out counts as the next day)
+    if minutes_between(first_minutes, last_minutes) <= policy.collapse_minutes:
+        # Inside the out-only window keep only check-out
+        if low <= first_minutes <= high:
+            return None, last_original
+        # Outside it (18:01-01:59 by default) keep only check-in
+        else:
+            return first_original, None
+
+    return first_original, last_original
+
+
+def _punch_bounds(row_ids, minutes, n_rows):
+    """Find the first and last punch of every row of a flat punch stream, in shift order.
+
+    `row_ids` and `minutes` describe one punch each, listed in their original order
+    within a row. Returns two arrays of punch positions: -1 where the row has no
+    punch, and for the last punch also where the row has only one.
+    """
+    first_idx = np.full(n_rows, -1, dtype=np.int64)
+    last_idx = np.full(n_rows, -1, dtype=np.int64)
+    if len(row_ids) == 0:
+        return first_idx, last_idx
+
+    # Add 9 hours for comparison purposes only, wrapping past midnight
+    normalized = (minutes + SHIFT_ORDER_OFFSET) % MINUTES_PER_DAY
+
+    # Sort by row, then normalized time; ties keep their original order
+    order = np.lexsort((np.arange(len(row_ids)), normalized, row_ids))
+    sorted_rows = row_ids[order]
+    starts = np.flatnonzero(np.r_[True, sorted_rows[1:] != sorted_rows[:-1]])
+    ends = np.r_[starts[1:], len(order)] - 1
+
+    rows = sorted_rows[starts]
+    first_idx[rows] = order[starts]
+    last_idx[rows] = np.where(starts == ends, -1, order[ends])
+    return first_idx, last_idx
+
+
+def _select_punches(row_ids, minutes, n_rows, policy=DEFAULT_POLICY):
+    """Pick the check-in and check-out punch for every row of a flat punch stream.
+
+    Returns two arrays of punch positions (-1 where the row has none), following
+    the same rules as extract_clock_times.
+    """
+    first_idx, last_idx = _punch_bounds(row_ids, minutes, n_rows)
+
+    # Index -1 (no punch) picks the sentinel appended at the end
+    padded = np.append(minutes, MISSING_MINUTE)
+    has_in, has_out = select_punches(padded[first_idx], padded[last_idx], policy)
+    in_idx = np.where(has_in, first_idx, -1)
+    out_idx = np.where(has_out, np.where(last_idx >= 0, last_idx, first_idx), -1)
+    return in_idx, out_idx
+
+
+def _split_tokens(clock_in_out_times, clock_out_column):
+    """Flatten both clock columns into one stream of tokens, valid or not.
+
+    Returns (row positions, token strings, minute of day as float with NaN where the
+    token is not a valid HH:MM time, True for tokens from 'Clock Out') arrays, with a
+    row's 'Clock-in/out Time' tokens in order followed by its 'Clock Out'.
+    """
+    # Tokenize both columns at once into one flat stream (row position, token)
+    clock_in_out_values = pd.Series(clock_in_out_times.to_numpy(), dtype=object)
+    clock_out_values = pd.Series(clock_out_column.to_numpy(), dtype=object)
+    split_tokens = clock_in_out_values[clock_in_out_values.notna()].astype(str).str.split().explode().dropna()
+    clock_out_tokens = clock_out_values[clock_out_values.notna()].astype(str)
+    tokens = pd.concat([split_tokens, clock_out_tokens])
+
+    from_clock_out = np.zeros(len(tokens), dtype=bool)
+    from_clock_out[len(split_tokens):] = True
+    minutes = parse_hhmm_series(tokens).to_numpy(dtype=np.float64)
+    return tokens.index.to_numpy(dtype=np.int64), tokens.to_numpy(dtype=object), minutes, from_clock_out
+
+
+def tokenize_punches(clock_in_out_times, clock_out_column):
+    """Flatten both clock columns into one punch stream of valid HH:MM tokens.
+
+    Returns (row positions, token strings, minute of day) arrays, one entry per punch,
+    with a row's 'Clock-in/out Time' tokens in order followed by its 'Clock Out'.
+    """
+    row_ids, tokens, minutes, _ = _split_tokens(clock_in_out_times, clock_out_column)
+
+    # Drop anything that is not a valid HH:MM token
+    valid = ~np.isnan(minutes)
+    return row_ids[valid], tokens[valid], minutes[valid].astype(np.int64)
+
+
+def extract_clock_times_batch(clock_in_out_times, clock_out_column, policy=DEFAULT_POLICY):
+    """Vectorized extract_clock_times over whole columns, returns 'Clock In'/'Clock Out' columns"""
+    index = clock_in_out_times.index
+    n_rows = len(index)
+    row_ids, token_values, token_minutes = tokenize_punches(clock_in_out_times, clock_out_column)
+    in_idx, out_idx = _select_punches(row_ids, token_minutes, n_rows, policy)
+
+    clock_in = np.full(n_rows, None, dtype=object)
+    clock_out = np.full(n_rows, None, dtype=object)
+    clock_in[in_idx >= 0] = token_values[in_idx[in_idx >= 0]]
+    clock_out[out_idx >= 0] = token_values[out_idx[out_idx >= 0]]
+    return pd.DataFrame({'Clock In': clock_in, 'Clock Out': clock_out}, index=index)
+
+
+def punch_bound_minutes(row_ids, minutes, n_rows):
+    """First and last punch minute of every row of a flat punch stream, in shift order.
+
+    uint16 arrays; MISSING_MINUTE where the row has no punch, and for the last punch
+    also where it has only one. `row_ids` and `minutes` list one punch each, in their
+    original order within a row.
+    """
+    first_idx, last_idx = _punch_bounds(row_ids, minutes, n_rows)
+    padded = np.append(minutes, MISSING_MINUTE).astype(np.uint16)
+    return padded[first_idx], padded[last_idx]
+
+
+def select_clock_minutes(row_ids, minutes, n_rows, policy=DEFAULT_POLICY):
+    """Check-in and check-out minute of every row of a flat punch stream (uint16, MISSING_MINUTE if none)"""
+    first, last = punch_bound_minutes(row_ids, minutes, n_rows)
+    return policy_clock_minutes(first, last, policy)
+
+
+def extract_punch_bounds(clock_in_out_times, clock_out_column):
+    """Each row's first and last punch in shift order as 'First Punch'/'Last Punch' uint16 columns"""
+    row_ids, _, token_minutes = tokenize_punches(clock_in_out_times, clock_out_column)
+    first, last = punch_bound_minutes(row_ids, token_minutes, len(clock_in_out_times))
+    return pd.DataFrame({'First Punch': first, 'Last Punch': last}, index=clock_in_out_times.index)
+
+
+def extract_clock_minutes_batch(clock_in_out_times, clock_out_column, policy=DEFAULT_POLICY):
+    """Like extract_clock_times_batch, but as uint16 minute-of-day columns (MISSING_MINUTE if none)"""
+    bounds = extract_punch_bounds(clock_in_out_times, clock_out_column)
+    clock_in, clock_out = policy_clock_minutes(bounds['First Punch'], bounds['Last Punch'], policy)
+    return pd.DataFrame({'Clock In': clock_in, 'Clock Out': clock_out}, index=clock_in_out_times.index)
+
+
+def calculate_time_difference(start_time, end_time):
+    """Calculate time difference in hours between two time strings"""
+    if pd.isna(start_time) or pd.isna(end_time):
+        return 0
+
+    start = parse_hhmm(start_time)
+    end = parse_hhmm(end_time)
+    if start is None or end is None:
+        return 0
+
+    # Handle overnight shifts
+    return minutes_between(start, end) / 60  # Convert to hours
+
+
+def summary_rows(df, policy=DEFAULT_POLICY):
+    """Per-row summary inputs: attendance flags, day ordinals, late/early flags and overtime minutes.
+
+    Reads compact frames (uint16 minutes, int32 day ordinals) as well as "HH:MM" strings and dates.
+    Late, early, undertime and overtime are measured against the policy's shift start and end.
+    The rows are grouped with SUMMARY_TOTALS (or employee_totals) by the summary paths that
+    merge partial totals: SummaryAccumulator, the attendance store, month partitions and shards.
+    """
+    has_clock_in = has_time(df['Clock In'])
+    has_clock_out = has_time(df['Clock Out'])
+    has_both = has_clock_in & has_clock_out
+    day = day_ordinals(df['Date'])
+
+    # Minute-of-day for every check-in/check-out, one pass over the whole frame
+    checkin = clock_minutes(df['Clock In'])
+    checkout = clock_minutes(df['Clock Out'])
+
+    # Undertime: late check-in after 19:00, early checkout before 04:00
+    # Overtime: early check-in before 19:00, late checkout after 04:00
+    shift_start, shift_end = policy.shift_start, policy.shift_end
+    undertime = (checkin - shift_start).clip(lower=0) + (shift_end - checkout).clip(lower=0)
+    overtime = (shift_start - checkin).clip(lower=0) + (checkout - shift_end).clip(lower=0)
+
+    return pd.DataFrame({
+        'Name': df['Name'],
+        'Day': day,
+        # NaN for undated rows, so the Month span (see month_labels) skips them
+        'Dated Day': day.where(day != NAT_ORDINAL),
+        'Clock In': has_clock_in,
+        'Clock Out': has_clock_out,
+        'Checkin Day': day.where(has_clock_in),
+        'Checkout Day': day.where(has_clock_out),
+        'Late': checkin > shift_start,
+        'Early': checkout < shift_end,
+        'Undertime': undertime.where(has_both, 0),
+        'Overtime': overtime.where(has_both, 0),
+    })
+
+
+# Per-employee totals shared by generate_employee_summary and SummaryAccumulator
+SUMMARY_TOTALS = dict(
+    first_day=('Dated Day', 'min'),
+    last_day=('Dated Day', 'max'),
+    checkins=('Clock In', 'sum'),
+    checkouts=('Clock Out', 'sum'),
+    late=('Late', 'sum'),
+    early=('Early', 'sum'),
+    undertime=('Undertime', 'sum'),
+    overtime=('Overtime', 'sum'),
+)
+
+
+def month_labels(first_days, last_days):
+    """Month column values: '2025-06' for records within one month, '2025-06..2025-08' for a span (NaN if undated).
+
+    `first_days` and `last_days` are each employee's first and last day ordinal (NaN if none).
+    """
+    first = ordinals_to_dates(np.nan_to_num(np.asarray(first_days, dtype=np.float64), nan=MISSING_DAY))
+    last = ordinals_to_dates(np.nan_to_num(np.asarray(last_days, dtype=np.float64), nan=MISSING_DAY))
+    labels = np.asarray(pd.DatetimeIndex(first).strftime('%Y-%m'), dtype=object)
+
+    # An employee whose records cross a month boundary gets the whole span, not just the first month
+    spans = ~np.isnat(first) & (first.astype('datetime64[M]') != last.astype('datetime64[M]'))
+    if spans.any():
+        labels[spans] = labels[spans] + '..' + np.asarray(pd.DatetimeIndex(last[spans]).strftime('%Y-%m'), dtype=object)
+    return labels
+
+
+def finalize_summary(grouped, total_working_days):
+    """Build the summary frame from per-employee totals (minutes and attendance day counts).
+
+    `grouped` is indexed by name and has the SUMMARY_TOTALS columns plus checkin_days and
+    checkout_days, as employee_totals returns; absences are `total_working_days` less each
+    employee's attendance days. An empty `grouped` gives an empty frame.
+    """
+    if grouped.empty:
+        return pd.DataFrame()
+
+    # Absences = working days - employee attendance days
+    attendance_days = np.maximum(grouped['checkin_days'], grouped['checkout_days'])
+
+    summary = pd.DataFrame({
+        'Name': np.asarray(grouped.index),
+        'Month': month_labels(grouped['first_day'], grouped['last_day']),
+        'Total Check-ins': grouped['checkins'].to_numpy(),
+        'Total Check-outs': grouped['checkouts'].to_numpy(),
+        'Absences': (total_working_days - attendance_days).to_numpy(),
+        'Late Check-ins': grouped['late'].to_numpy(),
+        'Early Checkouts': grouped['early'].to_numpy(),
+        'Undertime (hrs)': (grouped['undertime'] / 60).round(2).to_numpy(),
+        'Overtime (hrs)': (grouped['overtime'] / 60).round(2).to_numpy(),
+        'Net Overtime (hrs)': ((grouped['overtime'] - grouped['undertime']) / 60).round(2).to_numpy(),
+    })
+
+    # Hours stay integer zeros when nobody ever accrued any, as with plain int sums
+    if not grouped['undertime'].any():
+        summary['Undertime (hrs)'] = summary['Undertime (hrs)'].astype(np.int64)
+    if not grouped['overtime'].any():
+        summary['Overtime (hrs)'] = summary['Overtime (hrs)'].astype(np.int64)
+    if not (grouped['undertime'].any() or grouped['overtime'].any()):
+        summary['Net Overtime (hrs)'] = summary['Net Overtime (hrs)'].astype(np.int64)
+
+    return summary
+
+
+def employee_totals(rows):
+    """Per-employee totals and attendance day counts from summary_rows output, sorted by name.
+
+    Totals for disjoint sets of employees can be concatenated and passed to finalize_summary.
+    """
+    return rows.groupby('Name', observed=True).agg(
+        checkin_days=('Checkin Day', 'nunique'),
+        checkout_days=('Checkout Day', 'nunique'),
+        **SUMMARY_TOTALS,
+    )
+
+
+def generate_employee_summary(df, policy=DEFAULT_POLICY):
+    """Generate employee summary with attendance statistics (`df` is not modified)"""
+    rows = summary_rows(df, policy)
+
+    # Calculate total working days (days when any employee checked in)
+    total_working_days = rows.loc[rows['Clock In'], 'Day'].nunique()
+
+    return finalize_summary(employee_totals(rows), total_working_days)
+
+
+class EmployeeTotals:
+    """Running summary totals for one employee"""
+    __slots__ = ('first_day', 'last_day', 'checkins', 'checkouts', 'checkin_days', 'checkout_days',
+                 'late', 'early', 'undertime', 'overtime')
+
+    def __init__(self):
+        # First and last dated day ordinal, NaN until one is seen
+        self.first_day = np.nan
+        self.last_day = np.nan
+        self.checkins = 0
+        self.checkouts = 0
+        self.checkin_days = set()
+        self.checkout_days = set()
+        self.late = 0
+        self.early = 0
+        self.undertime = 0
+        self.overtime = 0
+
+    def add_days(self, first_day, last_day):
+        """Widen the first/last day span (NaN is ignored)"""
+        self.first_day = float(np.fmin(self.first_day, first_day))
+        self.last_day = float(np.fmax(self.last_day, last_day))
+
+    def __setstate__(self, state):
+        _, slots = state
+        # States saved before the day span was kept have a first-row month label instead
+        if 'month' in slots:
+            del slots['month']
+            days = [day for day in slots['checkin_days'] | slots['checkout_days'] if day != NAT_ORDINAL]
+            slots['first_day'] = float(min(days)) if days else np.nan
+            slots['last_day'] = float(max(days)) if days else np.nan
+        for name, value in slots.items():
+            setattr(self, name, value)
+
+
+class _StateUnpickler(pickle.Unpickler):
+    """Also reads states saved when these classes lived in attendance_app"""
+
+    def find_class(self, module, name):
+        return super().find_class(__name__ if module == 'attendance_app' else module, name)
+
+
+class SummaryAccumulator:
+    """Mergeable per-employee summary totals, built up one chunk of cleaned rows at a time.
+
+    Feeding every chunk of a file through add() and calling summary() gives the same
+    frame as generate_employee_summary on the whole file. Updates cost O(new rows):
+    absences are derived from the working-day count only when summary() is called.
+    The totals can be saved and loaded to keep folding in new days across runs.
+    """
+
+    def __init__(self):
+        self.employees = {}
+        self.working_days = set()
+        self.ingested_days = set()
+        # Day ordinal -> names with a check-in or check-out that day, for add_new_days
+        self.names_by_day = {}
+
+    def add(self, df):
+        """Fold a chunk of cleaned rows (Name, Date, Clock In, Clock Out) into the totals"""
+        rows = summary_rows(df)
+        self.working_days.update(rows.loc[rows['Clock In'], 'Day'].unique().tolist())
+        self.ingested_days.update(rows['Day'].unique().tolist())
+
+        grouped = rows.groupby('Name', sort=False, observed=True).agg(**SUMMARY_TOTALS)
+        for name, first_day, last_day, checkins, checkouts, late, early, undertime, overtime in grouped.itertuples():
+            totals = self.employees.get(name)
+            if totals is None:
+                totals = self.employees[name] = EmployeeTotals()
+            totals.add_days(first_day, last_day)
+            totals.checkins += int(checkins)
+            totals.checkouts += int(checkouts)
+            totals.late += int(late)
+            totals.early += int(early)
+            totals.undertime += int(undertime)
+            totals.overtime += int(overtime)
+
+        for column, attribute in (('Checkin Day', 'checkin_days'), ('Checkout Day', 'checkout_days')):
+            days = rows[['Name', column]].dropna().drop_duplicates()
+            for name, day in zip(days['Name'].tolist(), days[column].astype(np.int64).tolist()):
+                getattr(self.employees[name], attribute).add(day)
+                self.names_by_day.setdefault(day, set()).add(name)
+
+    def add_new_days(self, df):
+        """Fold in only rows for an employee and date not ingested yet, so re-running a daily import is a no-op.
+
+        Another export of a day already ingested (a second terminal, another branch) still
+        adds the employees it has for that day. Rows without a name are kept by date alone.
+        Returns the number of rows folded in; the caller reports the rest as skipped.
+        """
+        days = day_ordinals(df['Date']).to_numpy()
+        names = df['Name']
+        unnamed = names.isna().to_numpy()
+        seen = np.zeros(len(df), dtype=bool)
+        # Only the days in `df` are looked up, so the cost does not grow with the history kept
+        for day in np.unique(days).tolist():
+            on_day = days == day
+            seen[on_day & unnamed] = day in self.ingested_days
+            known = self.names_by_day.get(day)
+            if known:
+                seen[on_day & ~unnamed] = names[on_day & ~unnamed].isin(known).to_numpy()
+        df_new = df.loc[~seen]
+        if not df_new.empty:
+            self.add(df_new)
+        return len(df_new)
+
+    def merge(self, other):
+        """Fold another accumulator (covering later rows) into this one"""
+        self.working_days |= other.working_days
+        self.ingested_days |= other.ingested_days
+        for day, names in other.names_by_day.items():
+            self.names_by_day.setdefault(day, set()).update(names)
+        for name, theirs in other.employees.items():
+            totals = self.employees.get(name)
+            if totals is None:
+                totals = self.employees[name] = EmployeeTotals()
+            totals.add_days(theirs.first_day, theirs.last_day)
+            totals.checkins += theirs.checkins
+            totals.checkouts += theirs.checkouts
+            totals.checkin_days |= theirs.checkin_days
+            totals.checkout_days |= theirs.checkout_days
+            totals.late += theirs.late
+            totals.early += theirs.early
+            totals.undertime += theirs.undertime
+            totals.overtime += theirs.overtime
+        return self
+
+    def summary(self):
+        """Employee summary for everything added so far"""
+        names = sorted(self.employees)
+        grouped = pd.DataFrame.from_records(
+            [(t.first_day, t.last_day, t.checkins, t.checkouts, len(t.checkin_days), len(t.checkout_days),
+              t.late, t.early, t.undertime, t.overtime)
+             for t in (self.employees[name] for name in names)],
+            index=pd.Index(names, name='Name'),
+            columns=['first_day', 'last_day', 'checkins', 'checkouts', 'checkin_days', 'checkout_days',
+                     'late', 'early', 'undertime', 'overtime'],
+        )
+        return finalize_summary(grouped, len(self.working_days))
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        # States saved before names_by_day was kept rebuild it from the per-employee day sets
+        if 'names_by_day' not in state:
+            self.names_by_day = {}
+            for name, totals in self.employees.items():
+                for day in totals.checkin_days | totals.checkout_days:
+                    self.names_by_day.setdefault(day, set()).add(name)
+
+    def save(self, path):
+        """Persist the totals so a later run can keep folding in new days"""
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """Load totals written by save()"""
+        with open(path, 'rb') as f:
+            return _StateUnpickler(f).load()
+
+
+def clean_attendance_frame(df, row_offset=0, metrics=None, policy=DEFAULT_POLICY, quality=None):
+    """Extract clock times and keep the output columns, dropping rows with no clock in or clock out.
+
+    Returns the compact layout described in compact_records, including each row's
+    first and last punch. `row_offset` is the position of the first row in the file,
+    used for default numbering. When a DataQualityReport is given as `quality`, the
+    rows are also checked for bad tokens, duplicate punches and bad dates, reusing
+    the extraction's token stream.
+    """
+    metrics = metrics or PipelineMetrics()
+
+    # Extract clock times for all rows at once
+    with metrics.stage('extract_clock_times', rows=len(df)):
+        row_ids, tokens, minutes, from_clock_out = _split_tokens(df['Clock-in/out Time'], df['Clock Out'])
+        valid = ~np.isnan(minutes)
+        first, last = punch_bound_minutes(row_ids[valid], minutes[valid].astype(np.int64), len(df))
+        clock_in, clock_out = policy_clock_minutes(first, last, policy)
+
+    if quality is not None:
+        with metrics.stage('data_quality', rows=len(df)):
+            quality.add(df, row_ids, tokens, minutes, from_clock_out)
+
+    with metrics.stage('filter', rows=len(df)):
+        # Filter out rows with no clock in or clock out
+        keep = (clock_in != MISSING_MINUTE) | (clock_out != MISSING_MINUTE)
+        positions = np.flatnonzero(keep)
+        index = df.index[positions]
+
+        # Only the kept rows of the output columns are copied; `df` itself is left untouched
+        columns = {}
+        # Number rows by file position when the workbook has no employee or AC number column
+        if 'Emp No.' in df.columns:
+            columns['Emp No.'] = df['Emp No.'].iloc[positions]
+        else:
+            columns['Emp No.'] = pd.Series(row_offset + 1 + positions, index=index)
+        if 'AC-No.' in df.columns:
+            columns['AC-No.'] = df['AC-No.'].iloc[positions]
+        else:
+            columns['AC-No.'] = pd.Series(1000 + row_offset + positions, index=index)
+        columns['Name'] = df['Name'].iloc[positions]
+        columns['Date'] = df['Date'].iloc[positions]
+        columns['Clock In'] = pd.Series(clock_in[positions], index=index)
+        columns['Clock Out'] = pd.Series(clock_out[positions], index=index)
+        df_cleaned = compact_attendance_frame(pd.DataFrame(columns))
+
+        # Kept so another ShiftPolicy can be applied without the workbook (see shift_whatif)
+        df_cleaned['First Punch'] = first[positions]
+        df_cleaned['Last Punch'] = last[positions]
+        return df_cleaned
+
+
+def iter_attendance_stream(source, file_name, chunk_rows=DEFAULT_CHUNK_ROWS, cleaned_sink=None, metrics=None,
+                           quality=None):
+    """process_attendance_stream one chunk at a time, for a caller that reports progress or interleaves work.
+
+    Yields (stage, rows done, total rows) after each chunk and before the summary; the
+    total is the workbook's own row count estimate (None if it has none, and it may be
+    off). Returns (cleaned, summary, error). Closing the generator stops the work
+    between chunks.
+    """
+    metrics = metrics or PipelineMetrics()
+    try:
+        accumulator = SummaryAccumulator() if cleaned_sink is not None else None
+        cleaned_chunks = []
+        sheet_info = {}
+        chunks = iter_excel_chunks(source, file_name, chunk_rows, sheet_info)
+        rows_done = 0
+        while True:
+            with metrics.stage('read_excel') as stage:
+                chunk = next(chunks, None)
+                stage.rows += len(chunk) if chunk is not None else 0
+            if chunk is None:
+                break
+
+            df_filtered = clean_attendance_frame(chunk, row_offset=chunk.index[0] if len(chunk) else 0, metrics=metrics,
+                                                 quality=quality)
+            if cleaned_sink is not None:
+                with metrics.stage('employee_summary', rows=len(df_filtered)):
+                    accumulator.add(df_filtered)
+                cleaned_sink(df_filtered)
+            else:
+                cleaned_chunks.append(df_filtered)
+            rows_done += len(chunk)
+            # The stated row count includes the header row
+            total_rows = sheet_info.get('rows')
+            yield 'Reading rows', rows_done, total_rows - 1 if total_rows else None
+
+        yield 'Summarizing', rows_done, rows_done
+        if cleaned_sink is not None:
+            with metrics.stage('employee_summary'):
+                return None, accumulator.summary(), None
+
+        if not cleaned_chunks:
+            return None, None, "The first sheet of the workbook is empty"
+        df_filtered = pd.concat(cleaned_chunks)
+        # Chunks carry their own name categories, re-encode them over the whole file
+        df_filtered['Name'] = df_filtered['Name'].astype('category')
+        return df_filtered, summarize_attendance(df_filtered, metrics), None
+
+    except ImportError as e:
+        if file_name.endswith('.xls'):
+            return None, None, "Missing dependency: xlrd is required for .xls files. Please run: pip install xlrd==2.0.1"
+        return None, None, str(e)
+    except Exception as e:
+        return None, None, str(e)
+
+
+def process_attendance_stream(source, file_name, chunk_rows=DEFAULT_CHUNK_ROWS, cleaned_sink=None, metrics=None,
+                              quality=None):
+    """Process a workbook in fixed-size row chunks, so only one chunk of raw rows is decoded at a time.
+
+    Cleaned chunks are passed to `cleaned_sink` when given (and not kept in memory, only
+    their summary totals), otherwise they are concatenated into the returned cleaned
+    frame and summarized at the end. A DataQualityReport given as `quality` collects
+    the findings of every chunk.
+    """
+    return run_steps(iter_attendance_stream(source, file_name, chunk_rows, cleaned_sink, metrics, quality))
+
+
+def run_steps(steps):
+    """Run a step generator (see iter_attendance_stream) to the end and return its result"""
+    while True:
+        try:
+            next(steps)
+        except StopIteration as done:
+            return done.value
+
+
+def process_attendance_file(uploaded_file, streaming=False, metrics=None, quality=None):
+    metrics = metrics or PipelineMetrics()
+    if uploaded_file.name.lower().endswith(PUNCH_LOG_EXTENSIONS):
+        from punch_log import process_punch_log
+        metrics.info['punch_log'] = True
+        return process_punch_log(uploaded_file, metrics=metrics, quality=quality)
+
+    metrics.info['streaming'] = streaming
+    if streaming:
+        return process_attendance_stream(uploaded_file, uploaded_file.name, metrics=metrics, quality=quality)
+
+    try:
+        # Read Excel file - handle both .xlsx and .xls formats
+        with metrics.stage('read_excel') as stage:
+            if uploaded_file.name.endswith('.xls'):
+                try:
+                    df = pd.read_excel(uploaded_file, engine='xlrd')
+                except ImportError:
+                    return None, None, "Missing dependency: xlrd is required for .xls files. Please run: pip install xlrd==2.0.1"
+                except Exception as e:
+                    return None, None, f"Error reading .xls file with xlrd engine: {str(e)}"
+            else:
+                df = pd.read_excel(uploaded_file)
+            stage.rows = len(df)
+
+        df_filtered = clean_attendance_frame(df, metrics=metrics, quality=quality)
+        # The raw rows are not needed for the summary
+        del df
+        return df_filtered, summarize_attendance(df_filtered, metrics), None
+
+    except Exception as e:
+        return None, None, str(e)
+
+
+def summarize_attendance(df_filtered, metrics=None):
+    """Employee summary of cleaned records, sharded over several processes for very large files"""
+    metrics = metrics or PipelineMetrics()
+    with metrics.stage('employee_summary', rows=len(df_filtered)):
+        if summary_workers() > 1 and len(df_filtered) >= PARALLEL_MIN_ROWS:
+            from parallel_summary import parallel_employee_summary
+            return parallel_employee_summary(df_filtered, workers=summary_workers())
+        return generate_employee_summary(df_filtered)
+
+
+def summary_workers():
+    """Worker processes for the summary, from ATTENDANCE_SUMMARY_WORKERS (1 = serial)"""
+    return max(int(os.environ.get('ATTENDANCE_SUMMARY_WORKERS') or 1), 1)
+
+
+def service_url():
+    """Processing service to submit uploads to, from ATTENDANCE_SERVICE_URL (None processes in-process)"""
+    return os.environ.get('ATTENDANCE_SERVICE_URL') or None
+
+
+def process_attendance_remote(uploaded_file, url, metrics=None, quality=None):
+    """Run process_attendance_file in the processing service (see attendance_service.py)"""
+    from attendance_service import ServiceClient, read_result_csv
+
+    metrics = metrics or PipelineMetrics()
+    metrics.info['service'] = url
+    client = ServiceClient(url)
+    try:
+        with metrics.stage('service_job'):
+            job_id = client.submit(uploaded_file.name, uploaded_file.getvalue())
+            try:
+                status = client.wait(job_id, timeout=SERVICE_JOB_TIMEOUT)
+            except TimeoutError:
+                # Drop the stuck job so it does not hold a place in the service's queue
+                with contextlib.suppress(OSError):
+                    client.delete(job_id)
+                raise
+        if status['status'] == 'failed':
+            return None, None, status['error']
+
+        with metrics.stage('service_download') as stage:
+            df_processed = compact_attendance_frame(read_result_csv(
+                client.result(job_id, 'cleaned.csv'),
+                usecols=CLEANED_COLUMNS,
+                dtype={'Clock In': str, 'Clock Out': str},
+            ))
+            df_summary = read_result_csv(client.result(job_id, 'summary.csv'))
+            if quality is not None:
+                quality.add_table(read_result_csv(client.result(job_id, 'diagnostics.csv'), keep_default_na=False))
+            stage.rows = len(df_processed)
+        client.delete(job_id)
+        return df_processed, df_summary, None
+
+    except Exception as e:
+        return None, None, str(e)
+
+
+def result_cache_key(uploaded_file):
+    """Result cache key of an upload: a hash of its bytes, its extension and RESULT_CACHE_VERSION"""
+    extension = os.path.splitext(uploaded_file.name)[1].lower()
+    return content_key(uploaded_file.getvalue(), extension, RESULT_CACHE_VERSION)
+
+
+def iter_attendance_cached(uploaded_file, cache, trace_memory=False, profile=False, chunk_rows=PROGRESS_CHUNK_ROWS):
+    """process_attendance_cached as a step generator, for processing_pool.ProcessingPool.
+
+    The first step only looks the upload up in the result cache: a hit returns right
+    away, a miss yields ('Queued', 0, None). The workbook is then read in `chunk_rows`
+    chunks, yielding (stage, rows done, total rows) after each (see
+    iter_attendance_stream); closing the generator cancels the work between chunks.
+    Uploads sent to the processing service, and runs that trace memory or profile
+    (cProfile follows a single thread), are processed in one step.
+    """
+    from attendance_calendar import AttendanceCalendar
+    from attendance_explorer import AttendanceExplorer
+    from data_quality import DataQualityReport
+    from exports import ResultExports
+    from shift_whatif import ShiftWhatIf
+    from upload_spill import spill_upload
+
+    key = result_cache_key(uploaded_file)
+    if not (trace_memory or profile):
+        result = cache.get(key)
+        if result is not None:
+            return result, None, True
+    yield 'Queued', 0, None
+
+    metrics = PipelineMetrics(trace_memory=trace_memory, profile=profile)
+    metrics.info.update(file_name=uploaded_file.name, file_bytes=uploaded_file.size, streaming=True)
+    quality = DataQualityReport()
+    try:
+        if service_url() and not (trace_memory or profile):
+            metrics.info['streaming'] = False
+            df_processed, df_summary, error = process_attendance_remote(uploaded_file, service_url(), metrics, quality)
+        else:
+            # Large uploads are decoded from a memory-mapped temporary copy
+            large = uploaded_file.size > STREAMING_THRESHOLD_BYTES
+            uploaded_file.seek(0)
+            with spill_upload(uploaded_file) if large else contextlib.nullcontext(uploaded_file) as upload:
+                if upload.name.lower().endswith(PUNCH_LOG_EXTENSIONS):
+                    from punch_log import iter_punch_log
+                    metrics.info['punch_log'] = True
+                    steps = iter_punch_log(upload, metrics=metrics, quality=quality)
+                else:
+                    steps = iter_attendance_stream(upload, upload.name, chunk_rows, metrics=metrics, quality=quality)
+                if trace_memory or profile:
+                    with metrics.profiling():
+                        df_processed, df_summary, error = run_steps(steps)
+                else:
+                    df_processed, df_summary, error = yield from steps
+        if error:
+            return None, error, False
+    finally:
+        metrics.finish()
+
+    if log_path():
+        metrics.append_to_log(log_path())
+
+    diagnostics = quality.table()
+    run = metrics.as_record()
+    result = {
+        'cleaned': df_processed,
+        'summary': df_summary,
+        'diagnostics': diagnostics,
+        'quality_totals': quality.totals(),
+        'exports': ResultExports(df_processed, df_summary, diagnostics, metrics=run),
+        'explorer': AttendanceExplorer(df_processed, df_summary),
+        'what_if': ShiftWhatIf(df_processed, diagnostics),
+        'calendar': AttendanceCalendar(df_processed),
+        'metrics': run,
+        'profile': metrics.profile_stats(),
+    }
+    cache.put(key, result)
+    return result, None, False
+
+
+def process_attendance_cached(uploaded_file, cache, trace_memory=False, profile=False):
+    """Processed frames, data-quality findings, their lookup index, lazily encoded exports, shift-policy what-ifs, the attendance calendar and run metrics, cached by a hash of the uploaded bytes.
+
+    Returns (result, error, from_cache). Tracing memory or profiling always runs the pipeline again,
+    in-process; otherwise the work goes to the processing service when one is configured.
+    """
+    return run_steps(iter_attendance_cached(uploaded_file, cache, trace_memory, profile))
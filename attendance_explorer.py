@@ -0,0 +1,103 @@
+"""Paged, filterable lookups over processed attendance results.
+
+AttendanceExplorer puts an AttendanceStore (records sorted by employee and
+date) behind the app's tables. A query binary-searches the store's index: a
+case-insensitive name prefix selects a run of employees, the date range is
+located inside every employee's slice with one vectorized searchsorted, and
+flag filters (late check-ins, early checkouts, missing punches) are applied
+only to the rows found. Only the requested page is converted back to display
+strings, so the browser never receives the whole result.
+"""
+import numpy as np
+import pandas as pd
+
+from attendance_store import AttendanceStore
+from compact_records import MISSING_DAY
+from shift_policy import DEFAULT_POLICY
+from time_parsing import MISSING_MINUTE
+
+PAGE_SIZES = [25, 50, 100, 500]
+
+# Record filters of query(); late and early are measured against the shift policy's start and end
+FILTERS = ['All records', 'Late check-ins', 'Early checkouts', 'Missing clock in', 'Missing clock out']
+
+
+class NameIndex:
+    """Case-insensitive prefix search over a list of names"""
+
+    def __init__(self, names):
+        lowered = np.array([str(name).lower() for name in names], dtype=str)
+        self.order = np.argsort(lowered, kind='stable')
+        self.sorted = lowered[self.order]
+
+    def matching(self, prefix):
+        """Positions (ascending) of the names starting with `prefix`"""
+        prefix = prefix.lower()
+        low = np.searchsorted(self.sorted, prefix, side='left')
+        high = np.searchsorted(self.sorted, prefix + '\U0010ffff', side='left')
+        return np.sort(self.order[low:high])
+
+
+def page_slice(positions, page, page_size):
+    """Positions shown on zero-based `page`"""
+    return positions[page * page_size:(page + 1) * page_size]
+
+
+class AttendanceExplorer:
+    """Name/date/flag queries and pages over cleaned records and their summary"""
+
+    def __init__(self, df, summary=None):
+        self.store = AttendanceStore.from_frame(df)
+        self.summary = summary if summary is not None else pd.DataFrame()
+        self.names = NameIndex(self.store.names)
+        self.summary_names = NameIndex(self.summary['Name'] if 'Name' in self.summary else [])
+
+    def flags(self, show, policy=DEFAULT_POLICY):
+        """Boolean flags in store order for one of FILTERS (None for 'All records')"""
+        clock_in = self.store.columns['Clock In']
+        clock_out = self.store.columns['Clock Out']
+        if show == 'All records':
+            return None
+        if show == 'Late check-ins':
+            return (clock_in > policy.shift_start) & (clock_in != MISSING_MINUTE)
+        if show == 'Early checkouts':
+            return clock_out < policy.shift_end
+        if show == 'Missing clock in':
+            return clock_in == MISSING_MINUTE
+        if show == 'Missing clock out':
+            return clock_out == MISSING_MINUTE
+        raise ValueError(f'Unknown filter: {show}')
+
+    def date_bounds(self):
+        """First and last known date as datetime.date, or None if there are none"""
+        known = self.store.dates[self.store.dates != MISSING_DAY]
+        if not len(known):
+            return None
+        return tuple(pd.Timestamp(np.datetime64(int(day), 'D')).date() for day in (known[0], known[-1]))
+
+    def query(self, name_prefix='', start=None, end=None, show='All records', policy=DEFAULT_POLICY):
+        """Store positions of the matching records, sorted by (employee, date).
+
+        `start`/`end` are inclusive dates (anything pandas can parse) or None; `show` is
+        one of FILTERS, with late check-ins and early checkouts as `policy` defines them.
+        """
+        codes = self.names.matching(name_prefix) + 1 if name_prefix else None
+        positions = self.store.find(codes, start, end)
+
+        flags = self.flags(show, policy)
+        if flags is not None:
+            positions = positions[flags[positions]]
+        return positions
+
+    def page(self, positions, page, page_size):
+        """One page of records in the display layout"""
+        return self.store.frame(page_slice(positions, page, page_size))
+
+    def query_summary(self, name_prefix=''):
+        """Summary row positions for employees whose name starts with `name_prefix`"""
+        if not name_prefix:
+            return np.arange(len(self.summary))
+        return self.summary_names.matching(name_prefix)
+
+    def summary_page(self, positions, page, page_size):
+        return self.summary.iloc[page_slice(positions, page, page_size)]
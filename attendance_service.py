@@ -0,0 +1,389 @@
+"""Headless local processing service with a job queue and a worker pool.
+
+Usage:
+    python attendance_service.py --port 8765 --workers 4 --max-pending 16
+
+Endpoints (JSON unless noted):
+
+    POST   /jobs?name=June.xlsx       workbook bytes as the body -> 202 {"id", "status"}
+                                      503 with Retry-After when the queue is full
+    GET    /jobs/<id>                 status: queued, running, done or failed
+    GET    /jobs/<id>/cleaned.csv     streamed cleaned records (text/csv)
+    GET    /jobs/<id>/summary.csv     streamed employee summary (text/csv)
+    GET    /jobs/<id>/diagnostics.csv data-quality findings (text/csv, Examples as JSON arrays)
+    DELETE /jobs/<id>                 drop a job and its files
+    GET    /health                    queue and pool counters
+
+Uploads are spilled to a per-job directory and processed in a bounded
+ProcessPoolExecutor by the same code as the app, so CPU-heavy work never runs
+on the web server's threads. At most `max_pending` jobs are queued or running
+at once; further submissions are refused so clients back off instead of
+piling work up. Results are written to disk by the worker and streamed from
+there. The Streamlit app submits through ServiceClient when
+ATTENDANCE_SERVICE_URL is set.
+"""
+import argparse
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+
+DEFAULT_PORT = 8765
+MAX_UPLOAD_BYTES = 200 * 1024 * 1024
+RESULT_FILES = {'cleaned.csv': 'cleaned.csv', 'summary.csv': 'summary.csv', 'diagnostics.csv': 'diagnostics.csv'}
+
+
+def run_job(path, job_dir):
+    """Worker: process one spilled upload and write its result CSVs to `job_dir`"""
+    # Imported here so each worker process pays for it once, not the server
+    from attendance_core import STREAMING_THRESHOLD_BYTES, process_attendance_file
+    from compact_records import display_attendance_frame
+    from data_quality import DataQualityReport
+    from upload_spill import MappedUpload
+
+    quality = DataQualityReport()
+    with MappedUpload(path) as upload:
+        df_processed, df_summary, error = process_attendance_file(
+            upload, streaming=upload.size > STREAMING_THRESHOLD_BYTES, quality=quality
+        )
+    if error:
+        raise RuntimeError(error)
+
+    display_attendance_frame(df_processed).to_csv(os.path.join(job_dir, 'cleaned.csv'), index=False)
+    df_summary.to_csv(os.path.join(job_dir, 'summary.csv'), index=False)
+    # Examples as JSON arrays, so clients get them back intact (see DataQualityReport.add_table)
+    diagnostics = quality.table(join_examples=False)
+    diagnostics['Examples'] = diagnostics['Examples'].map(json.dumps)
+    diagnostics.to_csv(os.path.join(job_dir, 'diagnostics.csv'), index=False)
+    return len(df_processed), len(df_summary)
+
+
+class Job:
+    """One submitted workbook"""
+    __slots__ = ('id', 'name', 'dir', 'future', 'submitted_at', 'finished_at', 'records', 'employees', 'error')
+
+    def __init__(self, name, job_dir):
+        self.id = uuid.uuid4().hex
+        self.name = name
+        self.dir = job_dir
+        self.future = None
+        self.submitted_at = time.time()
+        self.finished_at = None
+        self.records = None
+        self.employees = None
+        self.error = None
+
+    @property
+    def status(self):
+        if self.future.done():
+            return 'failed' if self.error else 'done'
+        return 'running' if self.future.running() else 'queued'
+
+    def as_dict(self):
+        return {
+            'id': self.id,
+            'name': self.name,
+            'status': self.status,
+            'submitted_at': self.submitted_at,
+            'finished_at': self.finished_at,
+            'records': self.records,
+            'employees': self.employees,
+            'error': self.error,
+        }
+
+
+class JobQueue:
+    """Bounded job queue in front of a process pool"""
+
+    def __init__(self, workers=None, max_pending=16, work_dir=None, keep_finished=100):
+        self.workers = workers or os.cpu_count()
+        self.executor = ProcessPoolExecutor(max_workers=self.workers)
+        self.max_pending = max_pending
+        self.keep_finished = keep_finished
+        # A directory the caller supplies is left in place on shutdown, only the job directories are removed
+        self.owns_work_dir = work_dir is None
+        self.work_dir = work_dir or tempfile.mkdtemp(prefix='attendance-service-')
+        self.jobs = {}
+        self.pending = 0
+        self.lock = threading.Lock()
+
+    def submit(self, name, data):
+        """Queue a workbook; returns the Job, or None when the queue is full"""
+        with self.lock:
+            if self.pending >= self.max_pending:
+                return None
+            self.pending += 1
+
+        job_dir = None
+        try:
+            job_dir = tempfile.mkdtemp(dir=self.work_dir)
+            job = Job(name, job_dir)
+            # Keep the extension, the reader picks the Excel engine from it
+            path = os.path.join(job_dir, 'upload' + os.path.splitext(name)[1].lower())
+            with open(path, 'wb') as f:
+                f.write(data)
+            job.future = self.executor.submit(run_job, path, job_dir)
+        except Exception:
+            # A full disk or a shut-down executor must not leak a pending slot or the job's directory
+            with self.lock:
+                self.pending -= 1
+            if job_dir is not None:
+                shutil.rmtree(job_dir, ignore_errors=True)
+            raise
+        with self.lock:
+            self.jobs[job.id] = job
+        job.future.add_done_callback(lambda future: self._finished(job, path))
+        return job
+
+    def _finished(self, job, path):
+        try:
+            job.records, job.employees = job.future.result()
+        except Exception as e:
+            job.error = str(e) or type(e).__name__
+        job.finished_at = time.time()
+        if os.path.exists(path):
+            os.remove(path)
+        with self.lock:
+            self.pending -= 1
+            deleted = job.id not in self.jobs
+        if deleted:
+            shutil.rmtree(job.dir, ignore_errors=True)
+        self._prune()
+
+    def _prune(self):
+        """Drop the oldest finished jobs beyond `keep_finished`"""
+        with self.lock:
+            finished = sorted((job for job in self.jobs.values() if job.finished_at), key=lambda job: job.finished_at)
+            expired = finished[:max(len(finished) - self.keep_finished, 0)]
+            for job in expired:
+                del self.jobs[job.id]
+        for job in expired:
+            shutil.rmtree(job.dir, ignore_errors=True)
+
+    def get(self, job_id):
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def delete(self, job_id):
+        with self.lock:
+            job = self.jobs.pop(job_id, None)
+        if job is None:
+            return False
+        job.future.cancel()
+        if job.future.done():
+            shutil.rmtree(job.dir, ignore_errors=True)
+        return True
+
+    def stats(self):
+        with self.lock:
+            statuses = [job.status for job in self.jobs.values()]
+        return {
+            'workers': self.workers,
+            'max_pending': self.max_pending,
+            **{status: statuses.count(status) for status in ('queued', 'running', 'done', 'failed')},
+        }
+
+    def shutdown(self):
+        """Stop the workers and remove the job files (and the work directory if the queue created it)"""
+        self.executor.shutdown(cancel_futures=True)
+        if self.owns_work_dir:
+            shutil.rmtree(self.work_dir, ignore_errors=True)
+            return
+        # Deleted jobs' directories were removed when they finished
+        with self.lock:
+            jobs = list(self.jobs.values())
+            self.jobs.clear()
+        for job in jobs:
+            shutil.rmtree(job.dir, ignore_errors=True)
+
+
+class ServiceHandler(BaseHTTPRequestHandler):
+    """Routes requests to the server's JobQueue"""
+    server_version = 'AttendanceService/1.0'
+
+    def send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def route(self):
+        """(job, remaining path parts) for /jobs/<id>/..., or (None, None)"""
+        parts = urllib.parse.urlparse(self.path).path.strip('/').split('/')
+        if len(parts) < 2 or parts[0] != 'jobs':
+            return None, None
+        return self.server.jobs.get(parts[1]), parts[2:]
+
+    def do_GET(self):
+        if urllib.parse.urlparse(self.path).path == '/health':
+            return self.send_json(200, self.server.jobs.stats())
+
+        job, rest = self.route()
+        if job is None:
+            return self.send_json(404, {'error': 'unknown job'})
+        if not rest:
+            return self.send_json(200, job.as_dict())
+        if len(rest) != 1 or rest[0] not in RESULT_FILES:
+            return self.send_json(404, {'error': 'unknown result'})
+        if job.status != 'done':
+            return self.send_json(409, {'error': f'job is {job.status}'})
+
+        # A concurrent DELETE (or pruning) may remove the files after the lookup; an open file stays readable
+        try:
+            f = open(os.path.join(job.dir, RESULT_FILES[rest[0]]), 'rb')
+        except FileNotFoundError:
+            return self.send_json(404, {'error': 'unknown job'})
+
+        # Stream the result from disk in blocks
+        with f:
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/csv; charset=utf-8')
+            self.send_header('Content-Length', str(os.fstat(f.fileno()).st_size))
+            self.end_headers()
+            shutil.copyfileobj(f, self.wfile, 64 * 1024)
+
+    def do_POST(self):
+        url = urllib.parse.urlparse(self.path)
+        if url.path != '/jobs':
+            return self.send_json(404, {'error': 'not found'})
+        name = urllib.parse.parse_qs(url.query).get('name', ['upload.xlsx'])[0]
+        if not name.lower().endswith(('.xlsx', '.xls', '.csv', '.txt')):
+            return self.send_json(400, {'error': 'name must end in .xlsx, .xls, .csv or .txt'})
+        length = int(self.headers.get('Content-Length') or 0)
+        if length <= 0:
+            return self.send_json(411, {'error': 'Content-Length required'})
+        if length > self.server.max_upload_bytes:
+            return self.send_json(413, {'error': f'uploads are limited to {self.server.max_upload_bytes} bytes'})
+
+        data = self.rfile.read(length)
+        job = self.server.jobs.submit(name, data)
+        if job is None:
+            return self.send_json(503, {'error': 'queue is full, retry later'}, {'Retry-After': '2'})
+        self.send_json(202, {'id': job.id, 'status': job.status}, {'Location': f'/jobs/{job.id}'})
+
+    def do_DELETE(self):
+        job, rest = self.route()
+        if job is None or rest or not self.server.jobs.delete(job.id):
+            return self.send_json(404, {'error': 'unknown job'})
+        self.send_json(200, {'id': job.id, 'deleted': True})
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class AttendanceService(ThreadingHTTPServer):
+    """HTTP server owning a JobQueue"""
+    daemon_threads = True
+
+    def __init__(self, address, jobs, max_upload_bytes=MAX_UPLOAD_BYTES, verbose=False):
+        super().__init__(address, ServiceHandler)
+        self.jobs = jobs
+        self.max_upload_bytes = max_upload_bytes
+        self.verbose = verbose
+
+
+class ServiceBusy(Exception):
+    """The service kept refusing submissions (queue full)"""
+
+
+class ServiceClient:
+    """Minimal client for the service, used by the Streamlit app"""
+
+    def __init__(self, base_url, timeout=30):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+
+    def _request(self, method, path, data=None):
+        request = urllib.request.Request(self.base_url + path, data=data, method=method)
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            return response.read()
+
+    def submit(self, name, data, busy_timeout=60):
+        """Submit a workbook, backing off while the queue is full; returns the job id"""
+        deadline = time.monotonic() + busy_timeout
+        query = urllib.parse.urlencode({'name': name})
+        while True:
+            try:
+                return json.loads(self._request('POST', f'/jobs?{query}', data))['id']
+            except urllib.error.HTTPError as e:
+                if e.code != 503:
+                    raise RuntimeError(json.loads(e.read() or b'{}').get('error', str(e)))
+                retry_after = float(e.headers.get('Retry-After') or 1)
+                if time.monotonic() + retry_after > deadline:
+                    raise ServiceBusy('Processing service is busy, please try again shortly')
+                time.sleep(retry_after)
+
+    def status(self, job_id):
+        return json.loads(self._request('GET', f'/jobs/{job_id}'))
+
+    def wait(self, job_id, timeout=None, poll_seconds=0.5):
+        """Poll until the job is done or failed; returns its final status.
+
+        Raises TimeoutError if it is still queued or running after `timeout` seconds (None waits forever).
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            status = self.status(job_id)
+            if status['status'] in ('done', 'failed'):
+                return status
+            if deadline is not None and time.monotonic() + poll_seconds > deadline:
+                raise TimeoutError(f'Processing job {job_id} did not finish within {timeout:g} seconds')
+            time.sleep(poll_seconds)
+
+    def result(self, job_id, name):
+        """Raw bytes of 'cleaned.csv' or 'summary.csv'"""
+        return self._request('GET', f'/jobs/{job_id}/{name}')
+
+    def delete(self, job_id):
+        self._request('DELETE', f'/jobs/{job_id}')
+
+
+def read_result_csv(data, **kwargs):
+    """Result CSV bytes -> frame (an empty summary has no header)"""
+    if not data.strip():
+        return pd.DataFrame()
+    return pd.read_csv(io.BytesIO(data), **kwargs)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run the attendance processing service')
+    parser.add_argument('--host', default='127.0.0.1', help='Interface to bind (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f'Port (default: {DEFAULT_PORT})')
+    parser.add_argument('-w', '--workers', type=int, default=os.cpu_count(), help='Worker processes (default: all cores)')
+    parser.add_argument('--max-pending', type=int, default=16, help='Queued plus running jobs before submissions get 503')
+    parser.add_argument('--work-dir', help='Where uploads and results are kept (default: a temporary directory)')
+    parser.add_argument('-v', '--verbose', action='store_true', help='Log every request')
+    args = parser.parse_args(argv)
+
+    jobs = JobQueue(workers=args.workers, max_pending=args.max_pending, work_dir=args.work_dir)
+    server = AttendanceService((args.host, args.port), jobs, verbose=args.verbose)
+    print(f'Serving on http://{args.host}:{server.server_port} with {jobs.workers} workers')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        jobs.shutdown()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,269 @@
+"""Indexed, read-only query API over cleaned attendance records.
+
+    store = AttendanceStore.from_csv('Attendance_Cleaned.csv')    # or .from_frame(df) / .load('store.npz')
+    store.employee_records('Jane Doe', '2025-04-01', '2025-06-30')
+    store.late_checkins('2025-06-14')
+    store.monthly_totals(month='2025-06')
+    store.save('store.npz')
+
+Records are held as compact typed columns (see compact_records) sorted by
+(employee, date). Two indexes are kept: a composite (employee, day) key for
+per-employee range queries and a stable date order for per-date queries; both
+are answered with binary search. Per-(employee, month) totals are aggregated
+on first use and then kept. save() writes everything, indexes and monthly
+totals included, to one uncompressed .npz snapshot that load() reads back
+without parsing any text.
+"""
+import argparse
+import sys
+
+import numpy as np
+import pandas as pd
+
+from attendance_core import summary_rows
+from compact_records import MISSING_DAY, compact_attendance_frame, day_ordinals, display_attendance_frame, is_compact_frame
+from shift_policy import DEFAULT_POLICY
+from time_parsing import MISSING_MINUTE
+
+SNAPSHOT_VERSION = 1
+
+RECORD_COLUMNS = ['Emp No.', 'AC-No.', 'Name', 'Date', 'Clock In', 'Clock Out']
+
+MONTHLY_COLUMNS = ['Working Days', 'Days Attended', 'Absences', 'Check-ins', 'Check-outs',
+                   'Late Check-ins', 'Early Checkouts', 'Undertime (min)', 'Overtime (min)']
+
+# Day ordinals (int32, MISSING_DAY lowest) are shifted into the low 32 bits of the key
+_DAY_OFFSET = 1 << 31
+
+
+def expand_ranges(low, high):
+    """Concatenate arange(low[i], high[i]) for every i without a Python loop"""
+    lengths = high - low
+    total = int(lengths.sum())
+    if total == 0:
+        return np.empty(0, dtype=np.int64)
+    offsets = np.repeat(np.cumsum(lengths) - lengths, lengths)
+    return np.arange(total) - offsets + np.repeat(low, lengths)
+
+
+def _day(value):
+    """Day ordinal of one date-like value"""
+    return int(day_ordinals(pd.Series([value])).iloc[0])
+
+
+def _month_ordinals(days):
+    """Months since 1970-01 for int32 day ordinals (MISSING_DAY stays MISSING_DAY)"""
+    months = days.astype('datetime64[D]').astype('datetime64[M]').astype(np.int64)
+    return np.where(days == MISSING_DAY, MISSING_DAY, months)
+
+
+class AttendanceStore:
+    """Sorted, indexed cleaned records with monthly totals"""
+
+    def __init__(self, columns, names, by_date, monthly=None):
+        # Name holds codes into `names` shifted by one; 0 is a record without a name
+        self.columns = columns
+        self.names = names
+        self.by_date = by_date
+        self._monthly = monthly
+        self._name_codes = {name: code + 1 for code, name in enumerate(names.tolist())}
+        self.key = (columns['Name'].astype(np.int64) << 32) + (columns['Date'].astype(np.int64) + _DAY_OFFSET)
+        self.dates = columns['Date'][by_date]
+
+    @classmethod
+    def from_frame(cls, df):
+        """Build from cleaned records, in the compact or the CSV layout"""
+        df = df[RECORD_COLUMNS] if is_compact_frame(df) else compact_attendance_frame(df[RECORD_COLUMNS])
+        codes, names = pd.factorize(df['Name'], sort=True)
+        codes = (codes + 1).astype(np.int32)
+        days = df['Date'].to_numpy()
+
+        order = np.lexsort((days, codes))
+        columns = {column: df[column].to_numpy()[order] for column in RECORD_COLUMNS}
+        columns['Name'] = codes[order]
+        names = np.array(names.astype(str).tolist(), dtype=str)
+        return cls(columns, names, np.argsort(columns['Date'], kind='stable'))
+
+    @classmethod
+    def from_csv(cls, path):
+        """Build from a cleaned CSV as written by the app or batch_process.py"""
+        df = pd.read_csv(path, usecols=RECORD_COLUMNS, dtype={'Name': 'category', 'Clock In': str, 'Clock Out': str})
+        return cls.from_frame(df)
+
+    def save(self, path):
+        """Write a binary snapshot (records, indexes and monthly totals) to `path` (.npz)"""
+        # Snapshots are read without pickle, so text columns are stored as fixed-width strings
+        arrays = {f'column {name}': values.astype(str) if values.dtype == object else values
+                  for name, values in self.columns.items()}
+        arrays.update({f'monthly {name}': self.monthly[name].to_numpy() for name in self.monthly.columns})
+        with open(path, 'wb') as f:
+            np.savez(f, version=SNAPSHOT_VERSION, names=self.names, by_date=self.by_date, **arrays)
+
+    @classmethod
+    def load(cls, path):
+        """Read a snapshot written by save()"""
+        with np.load(path, allow_pickle=False) as snapshot:
+            if int(snapshot['version']) != SNAPSHOT_VERSION:
+                raise ValueError(f'{path}: unsupported snapshot version {int(snapshot["version"])}')
+            columns = {name[len('column '):]: snapshot[name] for name in snapshot.files if name.startswith('column ')}
+            monthly = pd.DataFrame({name[len('monthly '):]: snapshot[name]
+                                    for name in snapshot.files if name.startswith('monthly ')})
+            return cls(columns, snapshot['names'], snapshot['by_date'], monthly)
+
+    @property
+    def monthly(self):
+        """Per-(employee code, month ordinal) totals, aggregated on first use"""
+        if self._monthly is None:
+            self._monthly = self._monthly_totals()
+        return self._monthly
+
+    def __len__(self):
+        return len(self.key)
+
+    @property
+    def employees(self):
+        return self.names.tolist()
+
+    def code(self, name):
+        """Employee code of `name` (None if unknown)"""
+        return self._name_codes.get(name)
+
+    def frame(self, positions=None, display=True):
+        """Records at sorted `positions` (all if None), as display strings or in the compact layout"""
+        positions = slice(None) if positions is None else positions
+        codes = self.columns['Name'][positions].astype(np.int64) - 1
+        df = pd.DataFrame({column: self.columns[column][positions] for column in RECORD_COLUMNS})
+        df['Name'] = pd.Categorical.from_codes(codes, categories=self.names)
+        return display_attendance_frame(df) if display else df
+
+    def find(self, codes=None, start=None, end=None):
+        """Sorted positions of the records of employee `codes` (all if None) between inclusive dates.
+
+        Records without a date only match when neither `start` nor `end` is given.
+        """
+        codes = np.arange(len(self.names) + 1) if codes is None else np.asarray(codes, dtype=np.int64)
+        if start is not None:
+            first_day = _day(start)
+        else:
+            first_day = MISSING_DAY if end is None else MISSING_DAY + 1
+        last_day = _DAY_OFFSET - 1 if end is None else _day(end)
+
+        code_keys = codes.astype(np.int64) << 32
+        low = np.searchsorted(self.key, code_keys + (first_day + _DAY_OFFSET), side='left')
+        high = np.searchsorted(self.key, code_keys + (last_day + _DAY_OFFSET), side='right')
+        return expand_ranges(low, high)
+
+    def find_dates(self, start, end=None):
+        """Sorted positions of every record dated `start` (to `end`, inclusive), in date order"""
+        first_day = _day(start)
+        last_day = first_day if end is None else _day(end)
+        low = np.searchsorted(self.dates, first_day, side='left')
+        high = np.searchsorted(self.dates, last_day, side='right')
+        return self.by_date[low:high]
+
+    def employee_records(self, name, start=None, end=None):
+        """One employee's records, optionally limited to an inclusive date range"""
+        code = self.code(name)
+        return self.frame(self.find([] if code is None else [code], start, end))
+
+    def record(self, name, date):
+        """One employee's record(s) on one date"""
+        return self.employee_records(name, date, date)
+
+    def date_records(self, start, end=None):
+        """Every employee's records on a date, or between two inclusive dates"""
+        return self.frame(self.find_dates(start, end))
+
+    def late_checkins(self, start, end=None, policy=DEFAULT_POLICY):
+        """Records with a check-in after the policy's shift start (19:00) on a date (or inclusive date range)"""
+        positions = self.find_dates(start, end)
+        clock_in = self.columns['Clock In'][positions]
+        # MISSING_MINUTE is above every real minute, so exclude it explicitly
+        return self.frame(positions[(clock_in > policy.shift_start) & (clock_in != MISSING_MINUTE)])
+
+    def monthly_totals(self, name=None, month=None):
+        """Per-(employee, month) totals, optionally for one employee and/or one month ('2025-06')"""
+        totals = self.monthly
+        keep = np.ones(len(totals), dtype=bool)
+        if name is not None:
+            keep &= totals['code'].to_numpy() == (self.code(name) or -1)
+        if month is not None:
+            keep &= totals['month'].to_numpy() == pd.Period(month, 'M').ordinal
+        totals = totals[keep]
+        return pd.DataFrame({
+            'Name': self.names[totals['code'].to_numpy() - 1],
+            'Month': pd.PeriodIndex.from_ordinals(totals['month'].to_numpy(), freq='M').astype(str),
+            **{column: totals[column].to_numpy() for column in MONTHLY_COLUMNS},
+        })
+
+    def _monthly_totals(self):
+        """Aggregate the per-(employee, month) totals from the sorted records"""
+        rows = summary_rows(self.frame(display=False))
+        rows['code'] = self.columns['Name']
+        rows['month'] = _month_ordinals(self.columns['Date'])
+        rows = rows[(rows['code'] > 0) & (rows['month'] != MISSING_DAY)]
+
+        # Working days per month: days when any employee checked in
+        working_days = rows.loc[rows['Clock In']].groupby('month')['Day'].nunique()
+        grouped = rows.groupby(['code', 'month'], sort=True).agg(
+            checkin_days=('Checkin Day', 'nunique'),
+            checkout_days=('Checkout Day', 'nunique'),
+            checkins=('Clock In', 'sum'),
+            checkouts=('Clock Out', 'sum'),
+            late=('Late', 'sum'),
+            early=('Early', 'sum'),
+            undertime=('Undertime', 'sum'),
+            overtime=('Overtime', 'sum'),
+        )
+        months = grouped.index.get_level_values('month')
+        days_attended = np.maximum(grouped['checkin_days'], grouped['checkout_days']).to_numpy()
+        month_working_days = working_days.reindex(months, fill_value=0).to_numpy()
+        return pd.DataFrame({
+            'code': grouped.index.get_level_values('code').to_numpy(dtype=np.int64),
+            'month': months.to_numpy(dtype=np.int64),
+            'Working Days': month_working_days,
+            'Days Attended': days_attended,
+            'Absences': month_working_days - days_attended,
+            'Check-ins': grouped['checkins'].to_numpy(dtype=np.int64),
+            'Check-outs': grouped['checkouts'].to_numpy(dtype=np.int64),
+            'Late Check-ins': grouped['late'].to_numpy(dtype=np.int64),
+            'Early Checkouts': grouped['early'].to_numpy(dtype=np.int64),
+            'Undertime (min)': grouped['undertime'].to_numpy(dtype=np.int64),
+            'Overtime (min)': grouped['overtime'].to_numpy(dtype=np.int64),
+        })
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Query cleaned attendance records')
+    parser.add_argument('source', help='Cleaned CSV or a .npz snapshot written by --snapshot')
+    parser.add_argument('--snapshot', help='Save a binary snapshot here for faster later queries')
+    parser.add_argument('--employee', help='Records of this employee')
+    parser.add_argument('--from', dest='start', help='First date (inclusive)')
+    parser.add_argument('--to', dest='end', help='Last date (inclusive)')
+    parser.add_argument('--late', action='store_true', help='Late check-ins between --from and --to')
+    parser.add_argument('--monthly', action='store_true', help='Per-month totals (of --employee if given)')
+    args = parser.parse_args(argv)
+
+    store = AttendanceStore.load(args.source) if args.source.endswith('.npz') else AttendanceStore.from_csv(args.source)
+    if args.snapshot:
+        store.save(args.snapshot)
+        print(f'Snapshot of {len(store)} records saved to {args.snapshot}')
+
+    if args.monthly:
+        result = store.monthly_totals(name=args.employee)
+    elif args.late:
+        if not args.start:
+            parser.error('--late needs --from')
+        result = store.late_checkins(args.start, args.end)
+    elif args.employee:
+        result = store.employee_records(args.employee, args.start, args.end)
+    elif args.start:
+        result = store.date_records(args.start, args.end)
+    else:
+        return 0
+    print(result.to_string(index=False))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
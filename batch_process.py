@@ -0,0 +1,120 @@
+"""Process many attendance workbooks in parallel from the command line.
+
+Usage:
+    python batch_process.py exports/ extra/June.xlsx --output-dir processed --workers 8
+
+Every .xlsx/.xls file (directories are scanned) goes through the same logic as
+the Streamlit app, spread over a process pool. For each workbook
+`<name>_cleaned.csv` and `<name>_summary.csv` are written to the output
+directory, plus `combined_summary.csv` with every summary stacked under a
+'Source File' column.
+"""
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+EXCEL_EXTENSIONS = ('.xlsx', '.xls')
+
+
+def find_workbooks(paths):
+    """Expand files and directories into a sorted list of workbook paths"""
+    workbooks = []
+    for path in paths:
+        if os.path.isdir(path):
+            for entry in sorted(os.scandir(path), key=lambda e: e.name):
+                # Skip Excel's '~$' lock files
+                if entry.is_file() and entry.name.lower().endswith(EXCEL_EXTENSIONS) and not entry.name.startswith('~$'):
+                    workbooks.append(entry.path)
+        elif os.path.isfile(path):
+            workbooks.append(path)
+        else:
+            raise FileNotFoundError(path)
+    return workbooks
+
+
+def output_stems(workbooks):
+    """Output file prefix per workbook, made unique when names repeat across directories"""
+    stems = {}
+    seen = {}
+    for path in workbooks:
+        stem = os.path.splitext(os.path.basename(path))[0]
+        count = seen.get(stem, 0)
+        seen[stem] = count + 1
+        stems[path] = stem if count == 0 else f'{stem}_{count + 1}'
+    return stems
+
+
+def process_workbook(path, output_prefix):
+    """Worker: process one workbook and write its cleaned and summary CSVs.
+
+    Returns (path, summary frame or None, cleaned row count, error message or None).
+    """
+    # Imported here so each worker process pays for it once, not the parent
+    from attendance_core import STREAMING_THRESHOLD_BYTES, process_attendance_file
+    from compact_records import display_attendance_frame
+    from upload_spill import MappedUpload
+
+    with MappedUpload(path) as upload:
+        df_processed, df_summary, error = process_attendance_file(
+            upload, streaming=upload.size > STREAMING_THRESHOLD_BYTES
+        )
+    if error:
+        return path, None, 0, error
+
+    display_attendance_frame(df_processed).to_csv(f'{output_prefix}_cleaned.csv', index=False)
+    df_summary.to_csv(f'{output_prefix}_summary.csv', index=False)
+    return path, df_summary, len(df_processed), None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Process attendance workbooks in parallel')
+    parser.add_argument('inputs', nargs='+', help='Workbook files or directories containing them')
+    parser.add_argument('-o', '--output-dir', default='processed', help='Where to write the CSV outputs')
+    parser.add_argument('-w', '--workers', type=int, default=os.cpu_count(),
+                        help='Worker processes (default: all cores)')
+    args = parser.parse_args(argv)
+
+    workbooks = find_workbooks(args.inputs)
+    if not workbooks:
+        print('No .xlsx/.xls files found')
+        return 1
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    stems = output_stems(workbooks)
+    summaries = {}
+    failed = 0
+
+    with ProcessPoolExecutor(max_workers=min(args.workers, len(workbooks))) as executor:
+        futures = [
+            executor.submit(process_workbook, path, os.path.join(args.output_dir, stems[path]))
+            for path in workbooks
+        ]
+        for future in as_completed(futures):
+            path, df_summary, rows, error = future.result()
+            if error:
+                failed += 1
+                print(f'FAILED {path}: {error}')
+            else:
+                summaries[path] = df_summary
+                print(f'Processed {path}: {rows} records, {len(df_summary)} employees')
+
+    # Roll-up in input order, regardless of which worker finished first
+    rollup = []
+    for path in workbooks:
+        df_summary = summaries.get(path)
+        if df_summary is not None and not df_summary.empty:
+            df_summary = df_summary.copy()
+            df_summary.insert(0, 'Source File', os.path.basename(path))
+            rollup.append(df_summary)
+    if rollup:
+        pd.concat(rollup, ignore_index=True).to_csv(os.path.join(args.output_dir, 'combined_summary.csv'), index=False)
+
+    print(f'{len(workbooks) - failed} of {len(workbooks)} workbooks processed into {args.output_dir}')
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
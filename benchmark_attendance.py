@@ -0,0 +1,199 @@
+"""Benchmark suite for the attendance pipeline.
+
+Usage:
+    python benchmark_attendance.py                          # all cases at 1k/10k/100k/1M rows
+    python benchmark_attendance.py --sizes 1k,10k --cases extract,summary
+    python benchmark_attendance.py --save-baseline          # record the current timings
+
+Each case runs on synthetic workloads (see synthetic_attendance.py) and reports
+the best of `--repeat` runs. Timings are compared with the baselines stored in
+benchmark_baselines.json; any case slower than the baseline by more than
+`--threshold` is reported as a regression and the script exits with status 1.
+
+No baseline file is shipped: timings are machine specific, so record one with
+--save-baseline on the machine you compare on (e.g. on the main branch before a
+change). Until then, and for cases or sizes it has no entry for, nothing is
+compared and the regression check always passes.
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import sys
+import time
+
+import pandas as pd
+
+from attendance_core import (
+    clean_attendance_frame,
+    extract_clock_times,
+    extract_clock_times_batch,
+    generate_employee_summary,
+    process_attendance_file,
+)
+from compact_records import display_attendance_frame
+from synthetic_attendance import generate_rows, to_workbook_bytes
+
+DEFAULT_SIZES = '1k,10k,100k,1m'
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark_baselines.json')
+DEFAULT_THRESHOLD = 0.25
+
+# The row-wise reference implementation is far too slow past this size
+REFERENCE_MAX_ROWS = 10000
+
+
+def parse_size(text):
+    """'10k' -> 10000, '1m' -> 1000000"""
+    text = text.strip().lower()
+    multiplier = {'k': 1000, 'm': 1000000}.get(text[-1], 1)
+    return int(float(text.rstrip('km')) * multiplier)
+
+
+class NamedBytesIO(io.BytesIO):
+    """In-memory upload with the .name attribute process_attendance_file expects"""
+    name = 'synthetic.xlsx'
+
+
+def bench_extract(workload):
+    df = workload['raw']
+    return lambda: extract_clock_times_batch(df['Clock-in/out Time'], df['Clock Out'])
+
+
+def bench_extract_reference(workload):
+    df = workload['raw']
+    if len(df) > REFERENCE_MAX_ROWS:
+        return None
+    return lambda: df.apply(lambda row: pd.Series(extract_clock_times(row['Clock-in/out Time'], row['Clock Out'])), axis=1)
+
+
+def bench_summary(workload):
+    cleaned = workload['cleaned']
+    return lambda: generate_employee_summary(cleaned)
+
+
+def bench_csv(workload):
+    cleaned, summary = workload['cleaned'], workload['summary']
+    return lambda: (display_attendance_frame(cleaned).to_csv(index=False).encode('utf-8'),
+                    summary.to_csv(index=False).encode('utf-8'))
+
+
+def bench_end_to_end(workload):
+    data = workload['workbook']()
+    return lambda: process_attendance_file(NamedBytesIO(data))
+
+
+CASES = {
+    'extract': bench_extract,
+    'extract_reference': bench_extract_reference,
+    'summary': bench_summary,
+    'csv_export': bench_csv,
+    'end_to_end': bench_end_to_end,
+}
+
+
+def build_workload(rows, seed):
+    """Synthetic raw frame plus the cleaned/summary frames later stages start from"""
+    raw = generate_rows(rows, seed=seed)
+    cleaned = clean_attendance_frame(raw)
+    summary = generate_employee_summary(cleaned)
+    workbook = {}
+
+    def get_workbook():
+        # Writing .xlsx is slow, so only do it when end_to_end runs
+        if 'data' not in workbook:
+            workbook['data'] = to_workbook_bytes(raw)
+        return workbook['data']
+
+    return {'raw': raw, 'cleaned': cleaned, 'summary': summary, 'workbook': get_workbook}
+
+
+def time_case(run, repeat):
+    """Best wall time over `repeat` runs"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def load_baselines(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f).get('results', {})
+
+
+def save_baselines(path, results):
+    record = {
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'results': results,
+    }
+    with open(path, 'w') as f:
+        json.dump(record, f, indent=2, sort_keys=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the attendance pipeline on synthetic workloads')
+    parser.add_argument('--sizes', default=DEFAULT_SIZES, help=f'Comma-separated row counts (default: {DEFAULT_SIZES})')
+    parser.add_argument('--cases', default=','.join(CASES), help='Comma-separated cases to run')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per case; the best time is kept')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for the synthetic workload')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='Baseline JSON file')
+    parser.add_argument('--save-baseline', action='store_true', help='Store these timings as the new baseline')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='Allowed slowdown vs baseline before failing (0.25 = 25%%)')
+    args = parser.parse_args(argv)
+
+    sizes = [parse_size(size) for size in args.sizes.split(',')]
+    cases = [case.strip() for case in args.cases.split(',')]
+    unknown = [case for case in cases if case not in CASES]
+    if unknown:
+        parser.error(f"unknown case(s): {', '.join(unknown)}")
+
+    baselines = load_baselines(args.baseline)
+    if not baselines and not args.save_baseline:
+        print(f'No baseline in {args.baseline}: timings are not compared, record one with --save-baseline')
+    results = dict(baselines) if args.save_baseline else {}
+    regressions = []
+
+    print(f"{'case':<18}{'rows':>10}{'seconds':>11}{'rows/s':>13}{'baseline':>11}{'change':>9}")
+    for rows in sizes:
+        workload = build_workload(rows, args.seed)
+        for case in cases:
+            run = CASES[case](workload)
+            if run is None:
+                continue
+            seconds = time_case(run, 1 if rows >= 1000000 else args.repeat)
+            key = f'{case}/{rows}'
+            results[key] = seconds
+
+            baseline = baselines.get(key)
+            change = ''
+            if baseline:
+                ratio = seconds / baseline - 1
+                change = f'{ratio:+.0%}'
+                if ratio > args.threshold:
+                    regressions.append(key)
+                    change += ' !'
+            baseline_text = f'{baseline:.4f}' if baseline else '-'
+            print(f'{case:<18}{rows:>10}{seconds:>11.4f}{rows / seconds:>13,.0f}{baseline_text:>11}{change:>9}')
+
+    if args.save_baseline:
+        save_baselines(args.baseline, results)
+        print(f'Baseline saved to {args.baseline}')
+        return 0
+
+    if regressions:
+        print(f"Regressions over {args.threshold:.0%}: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
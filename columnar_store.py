@@ -0,0 +1,204 @@
+"""Typed columnar store for ingested attendance workbooks.
+
+A workbook is converted once into a directory of .npy column files plus a
+manifest.json. Numeric columns keep their numpy dtype, dates are stored as
+datetime64, text columns are dictionary-encoded (int32 codes + a label
+array), and the punches are pre-parsed into uint16 minute-of-day columns:
+
+    punch_offsets.npy   int64, row i owns punch_minutes[offsets[i]:offsets[i + 1]]
+    punch_minutes.npy   uint16, valid 'Clock-in/out Time' tokens in original order
+    clock_out_minute.npy  uint16, the 'Clock Out' column (MISSING_MINUTE if empty/invalid)
+
+Every file is opened with np.load(mmap_mode='r'), so later stages read the
+columns zero-copy, and re-running on an already ingested workbook (same
+SHA-256) skips Excel decoding and text parsing entirely.
+"""
+import hashlib
+import json
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+from compact_records import minutes_to_labels
+from excel_streaming import iter_excel_chunks
+from time_parsing import MISSING_MINUTE, parse_hhmm_series
+
+FORMAT_VERSION = 1
+MANIFEST = 'manifest.json'
+
+
+def file_sha256(path):
+    """SHA-256 of a file, read in 1 MB blocks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _punch_columns(clock_in_out_times, clock_out_column):
+    """Parse the two punch columns into CSR punch minutes and a clock-out minute column"""
+    values = pd.Series(clock_in_out_times.to_numpy(), dtype=object)
+    tokens = values[values.notna()].astype(str).str.split().explode().dropna()
+    minutes = parse_hhmm_series(tokens)
+    valid = minutes.notna().to_numpy()
+    row_ids = tokens.index.to_numpy(dtype=np.int64)[valid]
+    counts = np.bincount(row_ids, minlength=len(values))
+    offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+
+    clock_out = parse_hhmm_series(pd.Series(clock_out_column.to_numpy(), dtype=object).astype(str))
+    clock_out = clock_out.fillna(MISSING_MINUTE).to_numpy().astype(np.uint16)
+    return offsets, minutes.to_numpy()[valid].astype(np.uint16), clock_out
+
+
+class ColumnarStore:
+    """A directory of memory-mapped .npy attendance columns"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, MANIFEST)) as f:
+            self.manifest = json.load(f)
+
+    @property
+    def rows(self):
+        return self.manifest['rows']
+
+    @property
+    def columns(self):
+        """Source workbook columns, in sheet order"""
+        return [column['name'] for column in self.manifest['columns']]
+
+    def _load(self, file_name):
+        return np.load(os.path.join(self.path, file_name), mmap_mode='r')
+
+    def _entry(self, name):
+        for column in self.manifest['columns'] + self.manifest['derived']:
+            if column['name'] == name:
+                return column
+        raise KeyError(name)
+
+    def has_column(self, name):
+        try:
+            self._entry(name)
+            return True
+        except KeyError:
+            return False
+
+    def array(self, name):
+        """Raw memory-mapped array for a column (category columns return their int32 codes)"""
+        return self._load(self._entry(name)['file'])
+
+    def column(self, name):
+        """A column as a pandas Series; category columns are rebuilt from codes and labels"""
+        entry = self._entry(name)
+        values = self._load(entry['file'])
+        if entry['kind'] == 'category':
+            labels = self._load(entry['labels'])
+            return pd.Series(pd.Categorical.from_codes(values, categories=labels), name=name)
+        if entry['kind'] == 'minutes':
+            return pd.Series(minutes_to_labels(values), name=name)
+        return pd.Series(values, name=name, copy=False)
+
+    def to_frame(self, columns=None):
+        """Selected columns (default: all source columns) as a DataFrame"""
+        columns = self.columns if columns is None else columns
+        return pd.DataFrame({name: self.column(name) for name in columns}, copy=False)
+
+    def punches(self):
+        """(offsets, punch minutes, clock-out minutes) as memory-mapped arrays"""
+        return self._load('punch_offsets.npy'), self._load('punch_minutes.npy'), self._load('clock_out_minute.npy')
+
+    def write_minutes(self, name, minutes):
+        """Store a derived uint16 minute column (MISSING_MINUTE for empty), e.g. an extraction stage's output"""
+        file_name = 'derived_' + re.sub(r'\W+', '_', name).strip('_').lower() + '.npy'
+        self.manifest['derived'] = [c for c in self.manifest['derived'] if c['name'] != name]
+        np.save(os.path.join(self.path, file_name), np.asarray(minutes, dtype=np.uint16))
+        self.manifest['derived'].append({'name': name, 'kind': 'minutes', 'file': file_name})
+        _write_manifest(self.path, self.manifest)
+
+
+def _write_manifest(path, manifest):
+    tmp_path = os.path.join(path, MANIFEST + '.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, os.path.join(path, MANIFEST))
+
+
+def _save_column(path, index, name, series, manifest_columns):
+    """Write one source column with the most compact lossless typed layout"""
+    file_name = f'col_{index:02d}.npy'
+    entry = {'name': name, 'file': file_name}
+
+    if name == 'Date' and series.dtype == object:
+        series = pd.to_datetime(series)
+
+    if pd.api.types.is_datetime64_any_dtype(series.dtype):
+        entry['kind'] = 'datetime'
+        values = series.to_numpy(dtype='datetime64[ns]')
+    elif pd.api.types.is_numeric_dtype(series.dtype) or pd.api.types.is_bool_dtype(series.dtype):
+        entry['kind'] = 'numeric'
+        values = series.to_numpy()
+    else:
+        # Text and mixed columns are dictionary-encoded
+        codes, labels = pd.factorize(series)
+        entry['kind'] = 'category'
+        entry['labels'] = f'col_{index:02d}_labels.npy'
+        np.save(os.path.join(path, entry['labels']), np.array([str(label) for label in labels], dtype=str))
+        values = codes.astype(np.int32)
+
+    np.save(os.path.join(path, file_name), values)
+    manifest_columns.append(entry)
+
+
+def convert_to_columnar(source_path, store_dir):
+    """Convert a workbook into a columnar store directory and return it"""
+    os.makedirs(store_dir, exist_ok=True)
+
+    # Same cell conversion as pd.read_excel, without holding the decoded workbook
+    df = pd.concat(list(iter_excel_chunks(source_path, os.path.basename(source_path))))
+
+    manifest = {
+        'format_version': FORMAT_VERSION,
+        'source_name': os.path.basename(source_path),
+        'source_sha256': file_sha256(source_path),
+        'rows': len(df),
+        'columns': [],
+        'derived': [],
+    }
+    for index, name in enumerate(df.columns):
+        _save_column(store_dir, index, str(name), df[name], manifest['columns'])
+
+    offsets, punch_minutes, clock_out = _punch_columns(df['Clock-in/out Time'], df['Clock Out'])
+    np.save(os.path.join(store_dir, 'punch_offsets.npy'), offsets)
+    np.save(os.path.join(store_dir, 'punch_minutes.npy'), punch_minutes)
+    np.save(os.path.join(store_dir, 'clock_out_minute.npy'), clock_out)
+
+    _write_manifest(store_dir, manifest)
+    return ColumnarStore(store_dir)
+
+
+def is_current(source_path, store_dir):
+    """True when `store_dir` already holds this exact workbook in the current format"""
+    try:
+        with open(os.path.join(store_dir, MANIFEST)) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return False
+    return (manifest.get('format_version') == FORMAT_VERSION
+            and manifest.get('source_sha256') == file_sha256(source_path))
+
+
+def open_columnar_store(source_path, store_dir=None):
+    """Open the columnar store for a workbook, converting it first only if needed"""
+    if store_dir is None:
+        store_dir = default_store_dir(source_path)
+    if is_current(source_path, store_dir):
+        return ColumnarStore(store_dir)
+    return convert_to_columnar(source_path, store_dir)
+
+
+def default_store_dir(source_path):
+    """'June.xlsx' -> 'June.columns'"""
+    return os.path.splitext(source_path)[0] + '.columns'
@@ -0,0 +1,117 @@
+"""Compact typed layout for cleaned attendance records.
+
+process_attendance_file returns cleaned records as:
+
+    Emp No., AC-No.      int32 (left as-is if not integral or out of range)
+    Name                 categorical (dictionary-encoded)
+    Date                 int32 day ordinal (days since 1970-01-01, MISSING_DAY if unknown)
+    Clock In, Clock Out  uint16 minute of day (MISSING_MINUTE if empty)
+    First Punch,         uint16 first and last punch of the row in shift order
+    Last Punch           (Last Punch is MISSING_MINUTE when the row has one punch)
+
+which is several times smaller than Python strings plus datetime64. Only the
+CSV/preview boundary converts back to "HH:MM" strings and dates with
+display_attendance_frame. The helpers below read either layout, so code that
+still builds frames with string times keeps working. The punch columns let a
+different ShiftPolicy be applied later; results read back from CSV lack them.
+"""
+import numpy as np
+import pandas as pd
+
+from time_parsing import MINUTE_LABELS, MISSING_MINUTE, parse_hhmm_series
+
+MISSING_DAY = np.iinfo(np.int32).min
+
+# int64 value numpy uses for NaT, which day_ordinals returns for unknown dates
+NAT_ORDINAL = np.iinfo(np.int64).min
+
+_LABELS = np.array(MINUTE_LABELS + [None], dtype=object)
+
+
+def is_compact_frame(df):
+    """True when the frame uses the compact layout (uint16 clock columns)"""
+    return df['Clock In'].dtype == np.uint16
+
+
+def has_time(series):
+    """Boolean Series: the clock column holds a time"""
+    if series.dtype == np.uint16:
+        return series != MISSING_MINUTE
+    return series.notna()
+
+
+def clock_minutes(series):
+    """Minute of day as floats (NaN where empty) from a uint16 or "HH:MM" column"""
+    if series.dtype == np.uint16:
+        return series.astype(np.float64).where(series != MISSING_MINUTE)
+    return parse_hhmm_series(series)
+
+
+def day_ordinals(series):
+    """Day ordinals as int64 (NAT_ORDINAL if unknown) from an int32 ordinal column or any date-like column"""
+    if pd.api.types.is_integer_dtype(series.dtype):
+        days = series.to_numpy().astype(np.int64)
+        days[days == MISSING_DAY] = NAT_ORDINAL
+        return pd.Series(days, index=series.index)
+    dates = pd.to_datetime(series).to_numpy().astype('datetime64[D]')
+    return pd.Series(dates.astype(np.int64), index=series.index)
+
+
+def ordinals_to_dates(ordinals):
+    """Day ordinals -> datetime64[ns] array (NaT for MISSING_DAY/NAT_ORDINAL)"""
+    days = np.asarray(ordinals).astype(np.int64)
+    days[days == MISSING_DAY] = NAT_ORDINAL
+    return days.astype('datetime64[D]').astype('datetime64[ns]')
+
+
+def minutes_to_labels(minutes):
+    """uint16 minutes -> object array of "HH:MM" strings (None for MISSING_MINUTE)"""
+    minutes = np.asarray(minutes)
+    return _LABELS[np.where(minutes == MISSING_MINUTE, len(MINUTE_LABELS), minutes)]
+
+
+def _to_int32(series):
+    """Downcast integral columns that fit into int32, leave anything else alone"""
+    if not pd.api.types.is_integer_dtype(series.dtype):
+        return series
+    limits = np.iinfo(np.int32)
+    if len(series) and (series.min() < limits.min or series.max() > limits.max):
+        return series
+    return series.astype(np.int32)
+
+
+def compact_attendance_frame(df):
+    """Convert cleaned records (Emp No., AC-No., Name, Date, Clock In, Clock Out) to the compact layout"""
+    dates = pd.to_datetime(df['Date']).to_numpy().astype('datetime64[D]')
+    ordinals = dates.astype(np.int64)
+    ordinals[np.isnat(dates)] = MISSING_DAY
+
+    compact = pd.DataFrame({
+        'Emp No.': _to_int32(df['Emp No.']),
+        'AC-No.': _to_int32(df['AC-No.']),
+        'Name': df['Name'].astype('category'),
+        'Date': ordinals.astype(np.int32),
+    }, index=df.index)
+    for column in ('Clock In', 'Clock Out'):
+        values = df[column]
+        if values.dtype != np.uint16:
+            values = clock_minutes(values).fillna(MISSING_MINUTE).astype(np.uint16)
+        compact[column] = values
+    return compact
+
+
+def display_attendance_frame(df):
+    """Compact records -> the CSV/preview layout with "HH:MM" times, dates and a Month column"""
+    if not is_compact_frame(df):
+        return df
+    dates = ordinals_to_dates(df['Date'].to_numpy())
+    display = pd.DataFrame({
+        'Emp No.': df['Emp No.'],
+        'AC-No.': df['AC-No.'],
+        'Name': df['Name'].astype(object),
+        'Date': dates,
+        'Clock In': minutes_to_labels(df['Clock In'].to_numpy()),
+        'Clock Out': minutes_to_labels(df['Clock Out'].to_numpy()),
+    }, index=df.index)
+    display['Month'] = display['Date'].dt.strftime('%b')
+    return display
@@ -1,9 +1,13 @@
-import pandas as pd
+from columnar_store import default_store_dir, is_current, open_columnar_store
 
 xlsx_file = "Attendance Sheet June 2025 (1).xlsx"
-csv_file = "Attendance Sheet June 2025 (1).csv"
+store_dir = default_store_dir(xlsx_file)
 
-df = pd.read_excel(xlsx_file)
-df.to_csv(csv_file, index=False)
+already_ingested = is_current(xlsx_file, store_dir)
+store = open_columnar_store(xlsx_file, store_dir)
 
-print(f"Converted {xlsx_file} to {csv_file}")
\ No newline at end of file
+if already_ingested:
+    print(f"{xlsx_file} already ingested into {store_dir}, skipping Excel conversion")
+else:
+    print(f"Converted {xlsx_file} to columnar store {store_dir}")
+print(f"Rows: {store.rows}, columns: {len(store.columns)}")
@@ -0,0 +1,48 @@
+"""Fold a day's attendance export into a persistent employee summary.
+
+Usage:
+    python daily_ingest.py "Attendance 2025-06-14.xlsx" --state summary_state.pkl --summary employee_summary.csv
+
+The state file keeps per-employee totals (check-in/check-out counts,
+attendance-day sets, late/early counts, overtime/undertime minutes), so each
+run only processes the new rows instead of recomputing the whole month.
+Rows for an employee and date that are already in the state are skipped, so
+re-running the same export is a no-op, while another terminal's or branch's
+export of the same day still adds the employees it has.
+"""
+import argparse
+import os
+import sys
+
+import pandas as pd
+
+from attendance_core import SummaryAccumulator, clean_attendance_frame
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fold new attendance rows into a persistent summary")
+    parser.add_argument('workbook', help="Excel export with the new days' rows")
+    parser.add_argument('--state', default='summary_state.pkl', help='Summary state file (created if missing)')
+    parser.add_argument('--summary', default='employee_summary.csv', help='Where to write the updated summary CSV')
+    args = parser.parse_args(argv)
+
+    state = SummaryAccumulator.load(args.state) if os.path.exists(args.state) else SummaryAccumulator()
+
+    engine = 'xlrd' if args.workbook.endswith('.xls') else None
+    df_filtered = clean_attendance_frame(pd.read_excel(args.workbook, engine=engine))
+    added = state.add_new_days(df_filtered)
+
+    state.save(args.state)
+    df_summary = state.summary()
+    df_summary.to_csv(args.summary, index=False)
+
+    print(f"Folded {added} of {len(df_filtered)} records into {args.state}")
+    if added < len(df_filtered):
+        print(f"Skipped {len(df_filtered) - added} records for employees and dates already in the state")
+    print(f"Working days: {len(state.working_days)}, employees: {len(state.employees)}")
+    print(f"Summary saved to {args.summary}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
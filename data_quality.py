@@ -0,0 +1,181 @@
+"""Data-quality checks on raw attendance rows, run alongside clock-time extraction.
+
+    quality = DataQualityReport(max_punches=6)
+    df_cleaned, df_summary, error = process_attendance_file(f, quality=quality)
+    quality.table()     # Employee, Column, Issue, Count, Examples
+    quality.totals()    # Column, Issue, Count
+
+Extraction silently ignores anything it cannot use, so a faulty device export
+shows up only as missing check-ins. The checks here reuse the token stream the
+extraction has already built (see attendance_core.clean_attendance_frame), so
+they are a few array operations per chunk rather than another pass over the
+rows:
+
+    Malformed token            a non-empty token that is not an HH:MM time (in punch
+                               logs, an AC number or timestamp that cannot be read)
+    Duplicate punch            the same minute punched again on the same row
+    Too many punches           a row with more than `max_punches` valid punches
+    Missing date               a row with punches but no Date
+    Date out of range          a row with punches dated before `first_date` or after
+                               `last_date` (default: today)
+
+Findings are counted per employee (Name), column and issue, with a few example
+values each. Reports are mergeable, so chunked and parallel runs add up to the
+same table.
+"""
+import json
+
+import numpy as np
+import pandas as pd
+
+MALFORMED_TOKEN = 'Malformed token'
+DUPLICATE_PUNCH = 'Duplicate punch'
+TOO_MANY_PUNCHES = 'Too many punches'
+MISSING_DATE = 'Missing date'
+DATE_OUT_OF_RANGE = 'Date out of range'
+
+ISSUES = [MALFORMED_TOKEN, DUPLICATE_PUNCH, TOO_MANY_PUNCHES, MISSING_DATE, DATE_OUT_OF_RANGE]
+
+TABLE_COLUMNS = ['Employee', 'Column', 'Issue', 'Count', 'Examples']
+
+NO_NAME = '(no name)'
+
+
+class DataQualityReport:
+    """Data-quality findings per (employee, column, issue), with example values"""
+
+    def __init__(self, max_punches=6, first_date='2000-01-01', last_date=None, examples=5):
+        self.max_punches = max_punches
+        self.first_date = pd.Timestamp(first_date)
+        self.last_date = pd.Timestamp(last_date) if last_date is not None else pd.Timestamp.today().normalize()
+        self.examples = examples
+        # (employee, column, issue) -> [count, distinct example values]
+        self.findings = {}
+        self.rows = 0
+
+    def add(self, df, row_ids, tokens, minutes, from_clock_out):
+        """Check a chunk of raw rows, given the token stream extraction built from it.
+
+        `row_ids`, `tokens`, `minutes` (NaN if not HH:MM) and `from_clock_out` hold one
+        entry per token of the 'Clock-in/out Time' and 'Clock Out' columns.
+        """
+        self.rows += len(df)
+        names = df['Name'].to_numpy(dtype=object)
+        valid = ~np.isnan(minutes)
+
+        def employees(rows):
+            found = names[rows]
+            return np.where(pd.isna(found), NO_NAME, found.astype(str))
+
+        def columns(tokens_at):
+            return np.where(from_clock_out[tokens_at], 'Clock Out', 'Clock-in/out Time')
+
+        # Blank 'Clock Out' cells are empty, not malformed
+        malformed = np.flatnonzero(~valid)
+        malformed = malformed[(pd.Series(tokens[malformed], dtype=object).str.strip() != '').to_numpy()]
+        self._record(employees(row_ids[malformed]), columns(malformed), MALFORMED_TOKEN, tokens[malformed])
+
+        # Later copies of a minute already punched on the same row; lexsort is stable, so the first copy is kept
+        punches = np.flatnonzero(valid)
+        punch_rows = row_ids[punches]
+        order = punches[np.lexsort((minutes[punches], punch_rows))]
+        repeated = np.zeros(len(order), dtype=bool)
+        repeated[1:] = (row_ids[order][1:] == row_ids[order][:-1]) & (minutes[order][1:] == minutes[order][:-1])
+        duplicates = order[repeated]
+        self._record(employees(row_ids[duplicates]), columns(duplicates), DUPLICATE_PUNCH, tokens[duplicates])
+
+        punch_counts = np.bincount(punch_rows, minlength=len(df))
+        dates = df['Date']
+
+        def date_values(rows):
+            return dates.iloc[rows].to_numpy(dtype=object)
+
+        many = np.flatnonzero(punch_counts > self.max_punches)
+        self._record(employees(many), 'All punches', TOO_MANY_PUNCHES,
+                     np.array([f'{date}: {count} punches' for date, count in zip(date_values(many), punch_counts[many])],
+                              dtype=object))
+
+        # Only rows that produce a record matter for the dates
+        parsed = pd.to_datetime(dates, errors='coerce').to_numpy()
+        punched = punch_counts > 0
+        missing = np.flatnonzero(punched & np.isnat(parsed))
+        self._record(employees(missing), 'Date', MISSING_DATE, date_values(missing))
+        out_of_range = np.flatnonzero(punched & ~np.isnat(parsed) & (
+            (parsed < self.first_date.to_datetime64()) | (parsed > self.last_date.to_datetime64())))
+        self._record(employees(out_of_range), 'Date', DATE_OUT_OF_RANGE, date_values(out_of_range))
+
+    def add_rejected(self, employees, column, values):
+        """Count input values that could not be read at all (e.g. punch-log lines) as malformed tokens"""
+        self._record(np.asarray(employees, dtype=object), column, MALFORMED_TOKEN, np.asarray(values, dtype=object))
+
+    def _record(self, employees, columns, issue, values):
+        """Fold findings (one entry per occurrence) into the counts"""
+        if not len(employees):
+            return
+        found = pd.DataFrame({
+            'employee': employees,
+            'column': np.broadcast_to(columns, len(employees)),
+            'value': np.where(pd.isna(values), '(empty)', np.asarray(values).astype(str)),
+        })
+        counts = found.groupby(['employee', 'column'], sort=False).size()
+        # The first few distinct values of each group
+        firsts = found.drop_duplicates().groupby(['employee', 'column'], sort=False).head(self.examples)
+        examples = {}
+        for employee, column, value in zip(firsts['employee'], firsts['column'], firsts['value']):
+            examples.setdefault((employee, column), []).append(value)
+        for (employee, column), count in counts.items():
+            self._fold((employee, column, issue), int(count), examples[(employee, column)])
+
+    def _fold(self, key, count, examples):
+        finding = self.findings.get(key)
+        if finding is None:
+            finding = self.findings[key] = [0, []]
+        finding[0] += count
+        for example in examples:
+            if len(finding[1]) >= self.examples:
+                break
+            if example not in finding[1]:
+                finding[1].append(example)
+
+    def merge(self, other):
+        """Fold another report (e.g. of a later chunk) into this one"""
+        self.rows += other.rows
+        for key, (count, examples) in other.findings.items():
+            self._fold(key, count, examples)
+        return self
+
+    def add_table(self, table):
+        """Fold a table(join_examples=False) into this report.
+
+        Examples are lists, or JSON arrays when the table was read back from CSV (e.g. the
+        processing service's diagnostics.csv), never the joined display text: an example
+        can contain ', ' itself.
+        """
+        for employee, column, issue, count, examples in table[TABLE_COLUMNS].itertuples(index=False, name=None):
+            if isinstance(examples, str):
+                examples = json.loads(examples)
+            self._fold((employee, column, issue), int(count), list(examples))
+
+    def __len__(self):
+        return len(self.findings)
+
+    def table(self, join_examples=True):
+        """Findings per employee, column and issue, ordered by issue then employee.
+
+        Examples are joined into one ', '-separated string for display, or kept as
+        lists with `join_examples=False` (for add_table).
+        """
+        if not self.findings:
+            return pd.DataFrame(columns=TABLE_COLUMNS)
+        keys = sorted(self.findings, key=lambda key: (ISSUES.index(key[2]), key[0], key[1]))
+        rows = []
+        for key in keys:
+            count, examples = self.findings[key]
+            rows.append((*key, count, ', '.join(examples) if join_examples else list(examples)))
+        return pd.DataFrame(rows, columns=TABLE_COLUMNS)
+
+    def totals(self):
+        """Finding counts per column and issue over all employees"""
+        table = self.table()
+        totals = table.groupby(['Column', 'Issue'], sort=False, as_index=False)['Count'].sum()
+        return totals.astype({'Count': np.int64})
@@ -0,0 +1,133 @@
+"""Streaming Excel readers that yield fixed-size DataFrame chunks.
+
+pd.read_excel decodes the whole sheet before returning, so peak memory grows
+with the workbook. These readers walk the first sheet row by row (openpyxl
+read-only mode for .xlsx, xlrd on-demand loading for .xls) and hand out
+chunks of `chunk_rows` rows, converting cells the same way pd.read_excel does.
+"""
+import math
+import os
+from datetime import time
+
+import numpy as np
+from pandas.io.parsers import TextParser
+
+DEFAULT_CHUNK_ROWS = 20000
+
+
+def _to_frame(header, rows, start):
+    """Build a chunk DataFrame with pd.read_excel's type inference, indexed from `start`"""
+    width = len(header)
+    padded = [row[:width] + [''] * (width - len(row)) for row in rows]
+    df = TextParser([header] + padded, header=0, skip_blank_lines=False).read()
+    df.index = range(start, start + len(df))
+    return df
+
+
+def _chunk_rows(rows, chunk_rows):
+    """Group converted rows into DataFrame chunks, dropping trailing empty rows like pd.read_excel"""
+    header = None
+    chunk = []
+    pending_blank = []
+    start = 0
+    for row in rows:
+        # Trim trailing empty cells
+        while row and row[-1] == '':
+            row.pop()
+        if header is None:
+            header = row
+            continue
+
+        # Blank rows only count if a non-blank row follows them
+        if not row:
+            pending_blank.append(row)
+            continue
+        chunk.extend(pending_blank)
+        pending_blank = []
+        chunk.append(row)
+
+        if len(chunk) >= chunk_rows:
+            yield _to_frame(header, chunk, start)
+            start += len(chunk)
+            chunk = []
+
+    if header is not None and (chunk or start == 0):
+        yield _to_frame(header, chunk, start)
+
+
+def _xlsx_rows(source, sheet_info):
+    from openpyxl import load_workbook
+    from openpyxl.cell.cell import TYPE_ERROR, TYPE_NUMERIC
+
+    workbook = load_workbook(source, read_only=True, data_only=True)
+    try:
+        sheet = workbook.worksheets[0]
+        # The stored dimensions are only an estimate (some exporters get them wrong), so rows are read without them
+        sheet_info['rows'] = sheet.max_row
+        sheet.reset_dimensions()
+        for row in sheet.rows:
+            converted = []
+            for cell in row:
+                if cell.value is None:
+                    converted.append('')
+                elif cell.data_type == TYPE_ERROR:
+                    converted.append(np.nan)
+                elif cell.data_type == TYPE_NUMERIC:
+                    value = int(cell.value)
+                    converted.append(value if value == cell.value else float(cell.value))
+                else:
+                    converted.append(cell.value)
+            yield converted
+    finally:
+        workbook.close()
+
+
+def _xls_rows(source, sheet_info):
+    import xlrd
+    from xlrd import XL_CELL_BOOLEAN, XL_CELL_DATE, XL_CELL_ERROR, XL_CELL_NUMBER, xldate
+
+    if isinstance(source, (str, os.PathLike)):
+        book = xlrd.open_workbook(source, on_demand=True)
+    else:
+        data = source if isinstance(source, bytes) else source.read()
+        book = xlrd.open_workbook(file_contents=data, on_demand=True)
+
+    epoch1904 = book.datemode
+
+    def convert(value, cell_type):
+        if cell_type == XL_CELL_DATE:
+            try:
+                value = xldate.xldate_as_datetime(value, epoch1904)
+            except OverflowError:
+                return value
+            # Dates on the epoch are times only
+            if value.timetuple()[0:3] == ((1904, 1, 1) if epoch1904 else (1899, 12, 31)):
+                value = time(value.hour, value.minute, value.second, value.microsecond)
+        elif cell_type == XL_CELL_ERROR:
+            value = np.nan
+        elif cell_type == XL_CELL_BOOLEAN:
+            value = bool(value)
+        elif cell_type == XL_CELL_NUMBER and math.isfinite(value):
+            if int(value) == value:
+                value = int(value)
+        return value
+
+    try:
+        # .xls sheets are capped at 65,536 rows, so only the active sheet is loaded
+        sheet = book.sheet_by_index(0)
+        sheet_info['rows'] = sheet.nrows
+        for i in range(sheet.nrows):
+            yield [convert(value, cell_type) for value, cell_type in zip(sheet.row_values(i), sheet.row_types(i))]
+    finally:
+        book.release_resources()
+
+
+def iter_excel_chunks(source, file_name, chunk_rows=DEFAULT_CHUNK_ROWS, sheet_info=None):
+    """Yield the first sheet of an .xlsx/.xls workbook as DataFrames of at most `chunk_rows` rows.
+
+    Once the first chunk is read, `sheet_info` (a dict, if given) holds 'rows': the sheet's
+    row count including the header as the workbook states it, or None if it does not.
+    """
+    sheet_info = {} if sheet_info is None else sheet_info
+    rows = _xls_rows(source, sheet_info) if file_name.endswith('.xls') else _xlsx_rows(source, sheet_info)
+    return _chunk_rows(rows, chunk_rows)
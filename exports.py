@@ -0,0 +1,128 @@
+"""On-demand export of processed results as CSV, gzip CSV, Parquet or XLSX.
+
+Nothing is encoded until a download is requested; ResultExports then keeps the
+encoded bytes with the result, so later reruns (and other sessions sharing the
+cached result) reuse them. The XLSX writer streams rows through openpyxl's
+write-only mode in chunks and holds one workbook with a sheet for the cleaned
+records, one for the employee summary and, when there are findings, one for
+the data-quality diagnostics.
+"""
+import contextlib
+import io
+
+from compact_records import display_attendance_frame
+from instrumentation import record_stage
+
+XLSX_MIME = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+# Label -> (file extension, MIME type)
+EXPORT_FORMATS = {
+    'CSV': ('.csv', 'text/csv'),
+    'CSV (gzip)': ('.csv.gz', 'application/gzip'),
+    'Parquet': ('.parquet', 'application/vnd.apache.parquet'),
+    'Excel (all sheets)': ('.xlsx', XLSX_MIME),
+}
+
+XLSX_CHUNK_ROWS = 10000
+
+
+def to_csv_bytes(df):
+    return df.to_csv(index=False).encode('utf-8')
+
+
+def to_csv_gzip_bytes(df):
+    buffer = io.BytesIO()
+    # mtime=0 keeps the output identical for identical data
+    df.to_csv(buffer, index=False, compression={'method': 'gzip', 'mtime': 0})
+    return buffer.getvalue()
+
+
+def to_parquet_bytes(df):
+    buffer = io.BytesIO()
+    df.to_parquet(buffer, index=False)
+    return buffer.getvalue()
+
+
+def _sheet_rows(df, chunk_rows=XLSX_CHUNK_ROWS):
+    """Rows as tuples with NaN/NaT as None, converted one chunk at a time"""
+    for start in range(0, len(df), chunk_rows):
+        chunk = df.iloc[start:start + chunk_rows].astype(object)
+        yield from chunk.where(chunk.notna(), None).itertuples(index=False, name=None)
+
+
+def to_xlsx_bytes(sheets, chunk_rows=XLSX_CHUNK_ROWS):
+    """Write {sheet title: frame} into one .xlsx with openpyxl's constant-memory writer"""
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    for title, df in sheets.items():
+        sheet = workbook.create_sheet(title)
+        sheet.append([str(column) for column in df.columns])
+        for row in _sheet_rows(df, chunk_rows):
+            sheet.append(row)
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+
+ENCODERS = {
+    'CSV': to_csv_bytes,
+    'CSV (gzip)': to_csv_gzip_bytes,
+    'Parquet': to_parquet_bytes,
+}
+
+
+class ResultExports:
+    """Encoded downloads for one processing result, built on first request.
+
+    When the result's run record (PipelineMetrics.as_record()) is given as `metrics`,
+    each encode is timed into its 'export_encode' stage.
+    """
+
+    def __init__(self, cleaned, summary, diagnostics=None, metrics=None):
+        self.cleaned = cleaned
+        self.summary = summary
+        self.diagnostics = diagnostics
+        self.metrics = metrics
+        self.encoded = {}
+
+    def _timed(self, rows):
+        if self.metrics is None:
+            return contextlib.nullcontext()
+        return record_stage(self.metrics, 'export_encode', rows=rows)
+
+    def _key(self, dataset, label):
+        # The workbook holds both datasets, so it is shared
+        return ('workbook', label) if EXPORT_FORMATS[label][1] == XLSX_MIME else (dataset, label)
+
+    def frame(self, dataset):
+        """'cleaned', 'summary' or 'diagnostics' in their CSV/preview layout"""
+        if dataset == 'cleaned':
+            return display_attendance_frame(self.cleaned)
+        return self.diagnostics if dataset == 'diagnostics' else self.summary
+
+    def is_ready(self, dataset, label):
+        return self._key(dataset, label) in self.encoded
+
+    def get(self, dataset, label):
+        """Encoded bytes of `dataset` ('cleaned', 'summary' or 'diagnostics') in format `label`"""
+        key = self._key(dataset, label)
+        data = self.encoded.get(key)
+        if data is None:
+            if key[0] == 'workbook':
+                sheets = {'Attendance': self.frame('cleaned'), 'Employee Summary': self.frame('summary')}
+                if self.diagnostics is not None and len(self.diagnostics):
+                    sheets['Data Quality'] = self.diagnostics
+                with self._timed(sum(len(df) for df in sheets.values())):
+                    data = to_xlsx_bytes(sheets)
+            else:
+                df = self.frame(dataset)
+                with self._timed(len(df)):
+                    data = ENCODERS[label](df)
+            self.encoded[key] = data
+        return data
+
+    def file_name(self, dataset, label, stem):
+        """Download name, e.g. attendance_cleaned.csv.gz"""
+        extension = EXPORT_FORMATS[label][0]
+        return ('attendance_report' if self._key(dataset, label)[0] == 'workbook' else stem) + extension
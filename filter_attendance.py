@@ -1,16 +1,23 @@
-import pandas as pd
+import numpy as np
+from columnar_store import ColumnarStore
+from time_parsing import MISSING_MINUTE
 
-csv_file = "Attendance_Cleaned_with_Times.csv"
+store_dir = "Attendance Sheet June 2025 (1).columns"
 filtered_file = "Attendance_Filtered.csv"
 
-df = pd.read_csv(csv_file)
+store = ColumnarStore(store_dir)
 
-# Remove rows where both Clock In and Clock Out are empty/NaN
-df_filtered = df.dropna(subset=['Clock In', 'Clock Out'], how='all')
+# Remove rows where both extracted Clock In and Clock Out are empty
+clock_in = store.array('Extracted Clock In')
+clock_out = store.array('Extracted Clock Out')
+keep = np.flatnonzero((clock_in != MISSING_MINUTE) | (clock_out != MISSING_MINUTE))
+
+df_filtered = store.to_frame(['Emp No.', 'AC-No.', 'Name', 'Date', 'Extracted Clock In', 'Extracted Clock Out']).iloc[keep]
+df_filtered.columns = ['Emp No.', 'AC-No.', 'Name', 'Date', 'Clock In', 'Clock Out']
 
 df_filtered.to_csv(filtered_file, index=False)
 
-print(f"Original rows: {len(df)}")
+print(f"Original rows: {store.rows}")
 print(f"Filtered rows: {len(df_filtered)}")
-print(f"Removed rows: {len(df) - len(df_filtered)}")
-print(f"Filtered data saved to {filtered_file}")
\ No newline at end of file
+print(f"Removed rows: {store.rows - len(df_filtered)}")
+print(f"Filtered data saved to {filtered_file}")
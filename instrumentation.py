@@ -0,0 +1,166 @@
+"""Per-stage timing and memory instrumentation for the processing pipeline.
+
+A PipelineMetrics object is threaded through process_attendance_file; each
+stage (Excel decoding, clock-time extraction, filtering, summary) is
+wrapped in `with metrics.stage(name) as stage:` and accumulates wall time,
+rows and calls across chunks. Downloads are encoded later, on request, and
+record_stage adds their time to the finished run's record. Peak memory per stage is measured
+with tracemalloc when `trace_memory=True` (it slows allocation-heavy code
+down, so it is opt-in); the process RSS high-water mark is always recorded.
+An optional cProfile hook captures a full profile of the run.
+"""
+import cProfile
+import io
+import json
+import os
+import pstats
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def max_rss_mb():
+    """Process peak resident set size in MB (None where unavailable)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+class StageMetrics:
+    """Accumulated measurements for one pipeline stage"""
+    __slots__ = ('name', 'seconds', 'rows', 'calls', 'peak_bytes')
+
+    def __init__(self, name):
+        self.name = name
+        self.seconds = 0.0
+        self.rows = 0
+        self.calls = 0
+        self.peak_bytes = None
+
+    def as_dict(self):
+        return {
+            'stage': self.name,
+            'seconds': round(self.seconds, 6),
+            'rows': self.rows,
+            'rows_per_sec': round(self.rows / self.seconds, 1) if self.seconds and self.rows else None,
+            'calls': self.calls,
+            'peak_memory_mb': round(self.peak_bytes / (1024 * 1024), 3) if self.peak_bytes is not None else None,
+        }
+
+
+class PipelineMetrics:
+    """Collects per-stage metrics for one processing run"""
+
+    def __init__(self, trace_memory=False, profile=False):
+        self.trace_memory = trace_memory
+        self.started_at = datetime.now(timezone.utc)
+        self.stages = {}
+        self.info = {}
+        self.profiler = cProfile.Profile() if profile else None
+        self._started_tracing = False
+
+    @contextmanager
+    def stage(self, name, rows=0):
+        """Time a block (and trace its peak allocations); set `.rows` on the yielded stage if unknown upfront"""
+        metrics = self.stages.get(name)
+        if metrics is None:
+            metrics = self.stages[name] = StageMetrics(name)
+        metrics.rows += rows
+
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracing = True
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+
+        start = time.perf_counter()
+        try:
+            yield metrics
+        finally:
+            metrics.seconds += time.perf_counter() - start
+            metrics.calls += 1
+            if self.trace_memory and tracemalloc.is_tracing():
+                peak = tracemalloc.get_traced_memory()[1] - baseline
+                metrics.peak_bytes = max(peak, metrics.peak_bytes or 0)
+
+    @contextmanager
+    def profiling(self):
+        """Run the block under cProfile when profiling was requested"""
+        if self.profiler is None:
+            yield
+            return
+        self.profiler.enable()
+        try:
+            yield
+        finally:
+            self.profiler.disable()
+
+    def finish(self):
+        """Stop memory tracing started by this run"""
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def profile_stats(self, limit=30, sort='cumulative'):
+        """Top profile entries as text, or None if the run was not profiled"""
+        if self.profiler is None:
+            return None
+        stream = io.StringIO()
+        pstats.Stats(self.profiler, stream=stream).sort_stats(sort).print_stats(limit)
+        return stream.getvalue()
+
+    def as_record(self):
+        """JSON-serializable record of the run"""
+        return {
+            'started_at': self.started_at.isoformat(),
+            'total_seconds': round(sum(stage.seconds for stage in self.stages.values()), 6),
+            'max_rss_mb': max_rss_mb(),
+            'trace_memory': self.trace_memory,
+            **self.info,
+            'stages': [stage.as_dict() for stage in self.stages.values()],
+        }
+
+    def to_json(self):
+        return json.dumps(self.as_record(), indent=2)
+
+    def append_to_log(self, path):
+        """Append the run record as one JSON line"""
+        with open(path, 'a') as f:
+            f.write(json.dumps(self.as_record()) + '\n')
+
+
+@contextmanager
+def record_stage(record, name, rows=0):
+    """Time a block run after the pipeline finished into its as_record() dict, accumulating like stage()"""
+    entry = next((stage for stage in record['stages'] if stage['stage'] == name), None)
+    metrics = StageMetrics(name)
+    if entry is not None:
+        metrics.seconds, metrics.rows, metrics.calls = entry['seconds'], entry['rows'], entry['calls']
+    metrics.rows += rows
+
+    start = time.perf_counter()
+    try:
+        yield metrics
+    finally:
+        metrics.seconds += time.perf_counter() - start
+        metrics.calls += 1
+        if entry is None:
+            record['stages'].append(metrics.as_dict())
+        else:
+            entry.update(metrics.as_dict())
+        record['total_seconds'] = round(sum(stage['seconds'] for stage in record['stages']), 6)
+
+
+def log_path():
+    """JSON-lines file every run is appended to, from ATTENDANCE_METRICS_LOG (None when unset)"""
+    return os.environ.get('ATTENDANCE_METRICS_LOG') or None
@@ -0,0 +1,139 @@
+"""Employee summary computed on several cores for very large result sets.
+
+    summary = parallel_employee_summary(df_filtered, workers=8)
+
+The cleaned records are sharded by employee: rows are grouped by employee
+(stable, so each employee keeps their original row order) and cut into
+contiguous ranges of whole employees with roughly equal row counts. The
+compact columns are copied once into a shared-memory block; each worker
+attaches to it, takes its range as zero-copy views and computes the
+per-employee totals for its employees, so no DataFrame is pickled to the
+workers. The number of working days is a property of the whole file, so it
+is computed once in the parent and applied when the partial totals are
+merged. The result is identical to generate_employee_summary.
+
+The app uses this mode for files of PARALLEL_MIN_ROWS (attendance_core) or
+more when ATTENDANCE_SUMMARY_WORKERS is set above 1. From the command line:
+
+    python parallel_summary.py attendance_cleaned.csv --workers 8 --output employee_summary.csv
+"""
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from attendance_core import employee_totals, finalize_summary, summary_rows
+from compact_records import compact_attendance_frame, is_compact_frame
+from time_parsing import MISSING_MINUTE
+
+
+def shard_bounds(sorted_codes, shards):
+    """Row offsets cutting employee-sorted rows into `shards` ranges of whole employees"""
+    n_rows = len(sorted_codes)
+    starts = np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1]]) if n_rows else np.empty(0, np.int64)
+    targets = np.arange(1, shards) * n_rows / shards
+    # Move every cut forward to the next employee boundary
+    cuts = np.searchsorted(starts, targets)
+    cuts = starts[cuts[cuts < len(starts)]]
+    return np.unique(np.r_[0, cuts, n_rows]).astype(np.int64)
+
+
+def _share(arrays):
+    """Copy arrays into one shared-memory block; returns the block and a {name: (offset, dtype, length)} layout"""
+    layout = {}
+    offset = 0
+    for name, values in arrays.items():
+        layout[name] = (offset, values.dtype.str, len(values))
+        # Keep every column 8-byte aligned
+        offset += -(-values.nbytes // 8) * 8
+    block = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+    for name, values in arrays.items():
+        start, dtype, length = layout[name]
+        np.ndarray(length, dtype=dtype, buffer=block.buf, offset=start)[:] = values
+    return block, layout
+
+
+def _shard_totals(block_name, layout, start, stop, categories):
+    """Worker: per-employee totals for rows [start, stop) of the shared columns"""
+    # Pool workers share the parent's resource tracker, which unlinks the block once the parent is done
+    block = shared_memory.SharedMemory(name=block_name)
+    try:
+        columns = {
+            name: np.ndarray(length, dtype=dtype, buffer=block.buf, offset=offset)[start:stop]
+            for name, (offset, dtype, length) in layout.items()
+        }
+        # Copy the shard out so nothing references the block once it is closed
+        df = pd.DataFrame({
+            'Name': pd.Categorical.from_codes(columns['Name'].copy(), categories=categories),
+            'Date': columns['Date'].copy(),
+            'Clock In': columns['Clock In'].copy(),
+            'Clock Out': columns['Clock Out'].copy(),
+        })
+        del columns
+        return employee_totals(summary_rows(df))
+    finally:
+        block.close()
+
+
+def parallel_employee_summary(df, workers=None, shards=None):
+    """generate_employee_summary computed over employee shards in `workers` processes"""
+    workers = workers or os.cpu_count()
+    shards = shards or workers
+    if not is_compact_frame(df):
+        df = compact_attendance_frame(df)
+
+    names = df['Name'] if isinstance(df['Name'].dtype, pd.CategoricalDtype) else df['Name'].astype('category')
+    codes = names.cat.codes.to_numpy()
+    date = df['Date'].to_numpy()
+    clock_in = df['Clock In'].to_numpy()
+
+    # Working days (days when any employee checked in) are counted once over the whole file
+    total_working_days = len(np.unique(date[clock_in != MISSING_MINUTE]))
+
+    # Rows without a name never reach the summary
+    order = np.flatnonzero(codes >= 0)
+    order = order[np.argsort(codes[order], kind='stable')]
+    arrays = {'Name': codes[order], 'Date': date[order], 'Clock In': clock_in[order],
+              'Clock Out': df['Clock Out'].to_numpy()[order]}
+    bounds = shard_bounds(arrays['Name'], shards)
+
+    block, layout = _share(arrays)
+    del arrays
+    tasks = [(block.name, layout, start, stop, names.cat.categories) for start, stop in zip(bounds[:-1], bounds[1:])]
+    partials = []
+    try:
+        if tasks:
+            with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as executor:
+                partials = list(executor.map(_shard_totals, *zip(*tasks)))
+    finally:
+        block.close()
+        block.unlink()
+
+    # Shards cover increasing employee ranges, so the concatenation is already sorted by name
+    partials = [partial for partial in partials if not partial.empty]
+    if not partials:
+        return finalize_summary(pd.DataFrame(), total_working_days)
+    return finalize_summary(pd.concat(partials), total_working_days)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Employee summary of a cleaned CSV on several cores')
+    parser.add_argument('cleaned', help='Cleaned CSV as written by the app or batch_process.py')
+    parser.add_argument('-w', '--workers', type=int, default=os.cpu_count(), help='Worker processes (default: all cores)')
+    parser.add_argument('-o', '--output', default='employee_summary.csv', help='Where to write the summary CSV')
+    args = parser.parse_args(argv)
+
+    df = pd.read_csv(args.cleaned, usecols=['Emp No.', 'AC-No.', 'Name', 'Date', 'Clock In', 'Clock Out'],
+                     dtype={'Clock In': str, 'Clock Out': str})
+    summary = parallel_employee_summary(compact_attendance_frame(df), workers=args.workers)
+    summary.to_csv(args.output, index=False)
+    print(f'Summary of {len(summary)} employees ({len(df)} records, {args.workers} workers) saved to {args.output}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,271 @@
+"""Per-(employee, month) summary partitions for quarter, year and custom-range reports.
+
+    partitions = PeriodPartitions('attendance_partitions')
+    partitions.update(df_cleaned)       # rebuilds only the months df_cleaned touches
+    partitions.report('2025-Q2')        # or '2025', '2025-06', or report('2025-03-15', '2025-08-31')
+
+Usage:
+    python period_partitions.py "Attendance June.xlsx" "Attendance July.xlsx" --dir attendance_partitions
+    python period_partitions.py --dir attendance_partitions --report 2025-Q3 --output q3_summary.csv
+
+Each month is one .npz file with the month's per-(employee, day) totals, its
+working days and the per-employee month totals derived from them. Months do
+not share days, so every total, attendance-day counts and working days
+included, adds up across months: a quarter or year report is a sum of stored
+month totals, and only the months cut by a custom range are aggregated from
+their daily totals. A report is the frame generate_employee_summary gives for
+all records in the range, without reading any workbook again.
+
+An upload replaces the records of each employee on the days it has for them,
+in each month it touches. Other employees' records on those days, other days
+of a touched month and other months' files are kept (the latter are neither
+read nor written), so daily exports, exports from several branches and
+corrected re-exports can be folded in one at a time. Records
+without a date cannot be placed in a month and are left out (the Data Quality
+report lists them).
+"""
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from attendance_core import clean_attendance_frame, finalize_summary, summary_rows
+from compact_records import NAT_ORDINAL
+from shift_policy import DEFAULT_POLICY
+
+PARTITION_VERSION = 1
+
+# Per-(employee, day) totals kept in a partition
+DAILY_COLUMNS = ['checkins', 'checkouts', 'late', 'early', 'undertime', 'overtime']
+
+# Per-employee totals, as finalize_summary expects them
+TOTAL_COLUMNS = ['first_day', 'last_day', 'checkins', 'checkouts', 'checkin_days', 'checkout_days',
+                 'late', 'early', 'undertime', 'overtime']
+
+
+def month_ordinals(days):
+    """Months since 1970-01 for int64 day ordinals"""
+    return np.asarray(days, dtype=np.int64).astype('datetime64[D]').astype('datetime64[M]').astype(np.int64)
+
+
+def month_name(month):
+    """'2025-06' for a month ordinal"""
+    return str(np.datetime64(int(month), 'M'))
+
+
+def period_days(start, end=None):
+    """Inclusive (first, last) day ordinals of a period.
+
+    `start` alone is a year ('2025'), quarter ('2025-Q2'), month ('2025-06') or day;
+    with `end`, the range runs from the start of `start` to the end of `end`.
+    """
+    first = pd.Period(start).start_time
+    last = pd.Period(start if end is None else end).end_time
+    return int(np.datetime64(first, 'D').astype(np.int64)), int(np.datetime64(last, 'D').astype(np.int64))
+
+
+def daily_totals(df, policy=DEFAULT_POLICY):
+    """Per-(employee, day) totals, working days (days anyone checked in) and all days of dated cleaned records"""
+    rows = summary_rows(df, policy)
+    rows = rows[rows['Day'] != NAT_ORDINAL]
+    days = np.unique(rows['Day'].to_numpy(dtype=np.int64))
+    working_days = np.unique(rows.loc[rows['Clock In'], 'Day'].to_numpy(dtype=np.int64))
+
+    grouped = rows.groupby(['Name', 'Day'], sort=True, observed=True).agg(
+        checkins=('Clock In', 'sum'),
+        checkouts=('Clock Out', 'sum'),
+        late=('Late', 'sum'),
+        early=('Early', 'sum'),
+        undertime=('Undertime', 'sum'),
+        overtime=('Overtime', 'sum'),
+    )
+    daily = pd.DataFrame({
+        'Name': grouped.index.get_level_values('Name').astype(str).to_numpy(dtype=object),
+        'Day': grouped.index.get_level_values('Day').to_numpy(dtype=np.int64),
+        **{column: grouped[column].to_numpy(dtype=np.int64) for column in DAILY_COLUMNS},
+    })
+    return daily, working_days, days
+
+
+def _totals_from_daily(daily):
+    """Per-employee TOTAL_COLUMNS from per-(employee, day) totals, indexed by name"""
+    daily = daily.assign(checkin_day=daily['checkins'] > 0, checkout_day=daily['checkouts'] > 0)
+    grouped = daily.groupby('Name', sort=True).agg(
+        first_day=('Day', 'min'),
+        last_day=('Day', 'max'),
+        checkins=('checkins', 'sum'),
+        checkouts=('checkouts', 'sum'),
+        checkin_days=('checkin_day', 'sum'),
+        checkout_days=('checkout_day', 'sum'),
+        late=('late', 'sum'),
+        early=('early', 'sum'),
+        undertime=('undertime', 'sum'),
+        overtime=('overtime', 'sum'),
+    )
+    return grouped[TOTAL_COLUMNS].astype(np.int64)
+
+
+class MonthPartition:
+    """One month's per-(employee, day) totals, working days and per-employee month totals"""
+    __slots__ = ('month', 'daily', 'working_days', 'totals')
+
+    def __init__(self, month, daily, working_days, totals=None):
+        self.month = month
+        self.daily = daily
+        self.working_days = working_days
+        self.totals = _totals_from_daily(daily) if totals is None else totals
+
+    def replace_rows(self, daily, working_days):
+        """A new partition with the (employee, day) rows of `daily` in place of the stored ones.
+
+        Stored rows of other employees on the same days are kept, and so are the working
+        days they (or unnamed records) account for; `working_days` are the upload's own.
+        """
+        keys = pd.MultiIndex.from_frame(self.daily[['Name', 'Day']])
+        replaced = keys.isin(pd.MultiIndex.from_frame(daily[['Name', 'Day']]))
+        merged = pd.concat([self.daily[~replaced], daily], ignore_index=True)
+        merged = merged.sort_values(['Name', 'Day'], ignore_index=True)
+        # Stored working days no named check-in accounts for came from unnamed records, which are never replaced
+        named = self.daily.loc[self.daily['checkins'] > 0, 'Day'].to_numpy()
+        unnamed = self.working_days[~np.isin(self.working_days, named)]
+        checkin_days = merged.loc[merged['checkins'] > 0, 'Day'].to_numpy(dtype=np.int64)
+        working_days = np.union1d(np.union1d(checkin_days, unnamed), working_days)
+        return MonthPartition(self.month, merged, working_days)
+
+    def range_totals(self, first_day, last_day):
+        """(per-employee totals, working days) for the inclusive day range, which may cut the month"""
+        days = self.daily['Day'].to_numpy()
+        daily = self.daily[(days >= first_day) & (days <= last_day)]
+        working = np.count_nonzero((self.working_days >= first_day) & (self.working_days <= last_day))
+        return _totals_from_daily(daily), working
+
+    def save(self, path):
+        """Write the partition to `path` (.npz), replacing it atomically"""
+        # Read back without pickle: names are stored once as fixed-width strings, daily rows hold codes into them
+        names = np.asarray(self.totals.index, dtype=str)
+        # One day's totals and day ordinals fit in int32
+        arrays = {f'daily {column}': self.daily[column].to_numpy(dtype=np.int32) for column in ['Day'] + DAILY_COLUMNS}
+        arrays.update({f'totals {column}': self.totals[column].to_numpy() for column in TOTAL_COLUMNS})
+        codes = np.searchsorted(names, self.daily['Name'].to_numpy(dtype=str)).astype(np.int32)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, version=PARTITION_VERSION, month=self.month, names=names, daily_codes=codes,
+                     working_days=self.working_days, **arrays)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """Read a partition written by save()"""
+        with np.load(path, allow_pickle=False) as stored:
+            if int(stored['version']) != PARTITION_VERSION:
+                raise ValueError(f'{path}: unsupported partition version {int(stored["version"])}')
+            names = stored['names'].astype(object)
+            daily = pd.DataFrame({'Name': names[stored['daily_codes']],
+                                  **{column: stored[f'daily {column}'].astype(np.int64) for column in ['Day'] + DAILY_COLUMNS}})
+            totals = pd.DataFrame({column: stored[f'totals {column}'] for column in TOTAL_COLUMNS},
+                                  index=pd.Index(names, name='Name'))
+            return cls(int(stored['month']), daily, stored['working_days'], totals)
+
+
+class PeriodPartitions:
+    """A directory of MonthPartition files ('2025-06.npz', ...), loaded on first use"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.loaded = {}
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, month):
+        return os.path.join(self.directory, month_name(month) + '.npz')
+
+    def months(self):
+        """Month ordinals that have a partition, in order"""
+        names = [name[:-len('.npz')] for name in os.listdir(self.directory) if name.endswith('.npz')]
+        return sorted(int(np.datetime64(name, 'M').astype(np.int64)) for name in names)
+
+    def partition(self, month):
+        """The stored MonthPartition of a month ordinal (None if there is none)"""
+        if month not in self.loaded:
+            path = self._path(month)
+            self.loaded[month] = MonthPartition.load(path) if os.path.exists(path) else None
+        return self.loaded[month]
+
+    def update(self, df, policy=DEFAULT_POLICY):
+        """Fold cleaned records into the months they touch, replacing each employee's days they contain.
+
+        Returns the names ('2025-06') of the rebuilt months.
+        """
+        daily, working_days, days = daily_totals(df, policy)
+        months = month_ordinals(days)
+        daily_months = month_ordinals(daily['Day'].to_numpy())
+        working_months = month_ordinals(working_days)
+
+        rebuilt = []
+        for month in np.unique(months).tolist():
+            month_daily = daily[daily_months == month].reset_index(drop=True)
+            month_working = working_days[working_months == month]
+            stored = self.partition(month)
+            if stored is None:
+                partition = MonthPartition(month, month_daily, month_working)
+            else:
+                partition = stored.replace_rows(month_daily, month_working)
+            partition.save(self._path(month))
+            self.loaded[month] = partition
+            rebuilt.append(month_name(month))
+        return rebuilt
+
+    def report(self, start, end=None):
+        """Employee summary of a period (see period_days) from the stored partitions"""
+        first_day, last_day = period_days(start, end)
+        first_month, last_month = month_ordinals([first_day, last_day]).tolist()
+
+        partials = []
+        total_working_days = 0
+        for month in self.months():
+            if not first_month <= month <= last_month:
+                continue
+            partition = self.partition(month)
+            month_first, month_last = period_days(month_name(month))
+            if first_day <= month_first and month_last <= last_day:
+                # A whole month: its materialized totals
+                totals, working = partition.totals, len(partition.working_days)
+            else:
+                totals, working = partition.range_totals(first_day, last_day)
+            partials.append(totals)
+            total_working_days += working
+
+        if not partials:
+            return finalize_summary(pd.DataFrame(), total_working_days)
+        merged = pd.concat(partials).groupby(level='Name', sort=True).agg(
+            {column: 'min' if column == 'first_day' else 'max' if column == 'last_day' else 'sum'
+             for column in TOTAL_COLUMNS}
+        )
+        return finalize_summary(merged, total_working_days)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Fold workbooks into monthly partitions and report any period')
+    parser.add_argument('workbooks', nargs='*', help='Excel exports to fold in')
+    parser.add_argument('--dir', default='attendance_partitions', help='Partition directory (created if missing)')
+    parser.add_argument('--report', help="Period to report: '2025', '2025-Q2', '2025-06' or a start date with --to")
+    parser.add_argument('--to', help='End of a custom range (a month or a date)')
+    parser.add_argument('--output', default='period_summary.csv', help='Where to write the report CSV')
+    args = parser.parse_args(argv)
+
+    partitions = PeriodPartitions(args.dir)
+    for workbook in args.workbooks:
+        engine = 'xlrd' if workbook.endswith('.xls') else None
+        rebuilt = partitions.update(clean_attendance_frame(pd.read_excel(workbook, engine=engine)))
+        print(f"{workbook}: rebuilt {', '.join(rebuilt) or 'no months'}")
+
+    if args.report:
+        df_summary = partitions.report(args.report, args.to)
+        df_summary.to_csv(args.output, index=False)
+        print(f"{len(df_summary)} employees, report saved to {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,168 @@
+"""A bounded worker pool shared by every app session, run a chunk at a time and fair across sessions.
+
+    pool = ProcessingPool(workers=2)
+    job = pool.submit(session_id, iter_attendance_cached(uploaded_file, cache))
+    while not job.wait(0.25):
+        print(job.progress)          # ('Reading rows', 15000, 150000)
+    result, error, from_cache = job.result()
+
+A job is a step generator (see attendance_core.iter_attendance_cached): it
+yields a (stage, done, total) progress tuple after each chunk of rows and
+returns its result. Workers run one step at a time, taking turns over the
+sessions that have work queued (round-robin), so a 500k-row upload is
+interleaved chunk by chunk with a colleague's 5k-row one instead of holding a
+worker until it is done. A session's own jobs run one after another, in the
+order they were submitted. job.cancel() stops a job before its next step and
+closes its generator, so temporary files are cleaned up.
+
+The pool size comes from ATTENDANCE_WORKERS (default: the CPU count, at most
+4). Workers are threads: openpyxl decoding holds the GIL, so more workers than
+CPUs only add contention.
+"""
+import collections
+import os
+import threading
+
+
+def pool_workers():
+    """Worker threads for the processing pool, from ATTENDANCE_WORKERS (default: CPUs, at most 4)"""
+    return max(int(os.environ.get('ATTENDANCE_WORKERS') or min(os.cpu_count() or 1, 4)), 1)
+
+
+class ProcessingCancelled(Exception):
+    """Raised by PoolJob.result() for a cancelled job"""
+
+
+class PoolJob:
+    """A submitted step generator, its latest progress and, once done, its result"""
+    __slots__ = ('session', 'steps', 'progress', 'cancelled', '_done', '_result', '_error')
+
+    def __init__(self, session, steps):
+        self.session = session
+        self.steps = steps
+        self.progress = ('Queued', 0, None)
+        self.cancelled = False
+        self._done = threading.Event()
+        self._result = None
+        self._error = None
+
+    def cancel(self):
+        """Stop the job before its next step"""
+        self.cancelled = True
+
+    def done(self):
+        return self._done.is_set()
+
+    def wait(self, timeout=None):
+        """Wait for the job to finish; False if it is still running after `timeout` seconds"""
+        return self._done.wait(timeout)
+
+    def result(self):
+        """The generator's return value (waits for it); re-raises its exception"""
+        self._done.wait()
+        if self._error is not None:
+            raise self._error
+        return self._result
+
+    def fraction(self):
+        """Progress of the current stage as a 0-1 fraction (0 when the total is unknown)"""
+        stage, done, total = self.progress
+        return min(done / total, 1.0) if total else 0.0
+
+    def _finish(self, result=None, error=None):
+        self._result = result
+        self._error = error
+        self._done.set()
+
+
+class ProcessingPool:
+    """Worker threads that run queued jobs one step at a time, round-robin over sessions"""
+
+    def __init__(self, workers=None):
+        self.workers = workers or pool_workers()
+        # session -> deque of its jobs; the order of the sessions is their turn
+        self.queues = collections.OrderedDict()
+        # Sessions with a step in progress
+        self.running = set()
+        self.condition = threading.Condition()
+        self.closed = False
+        self.threads = [threading.Thread(target=self._work, name=f'attendance-worker-{i}', daemon=True)
+                        for i in range(self.workers)]
+        for thread in self.threads:
+            thread.start()
+
+    def submit(self, session, steps):
+        """Queue a step generator behind `session`'s earlier jobs and return its PoolJob"""
+        job = PoolJob(session, steps)
+        with self.condition:
+            if self.closed:
+                raise RuntimeError('The processing pool is shut down')
+            self.queues.setdefault(session, collections.deque()).append(job)
+            self.condition.notify()
+        return job
+
+    def pending(self, session=None):
+        """Jobs queued or running, for one session or all"""
+        with self.condition:
+            if session is not None:
+                return len(self.queues.get(session, ()))
+            return sum(len(jobs) for jobs in self.queues.values())
+
+    def shutdown(self, wait=True):
+        """Cancel queued jobs and stop the workers after their current step"""
+        with self.condition:
+            self.closed = True
+            for jobs in self.queues.values():
+                for job in jobs:
+                    job.cancel()
+            self.condition.notify_all()
+        if wait:
+            for thread in self.threads:
+                thread.join()
+
+    def _next_job(self):
+        """The first job of the next session in turn with no step running (None if there is none)"""
+        for session, jobs in self.queues.items():
+            if session not in self.running:
+                # The session goes to the back of the turn order
+                self.queues.move_to_end(session)
+                self.running.add(session)
+                return jobs[0]
+        return None
+
+    def _work(self):
+        while True:
+            with self.condition:
+                job = self._next_job()
+                while job is None:
+                    if self.closed and not self.queues:
+                        return
+                    self.condition.wait()
+                    job = self._next_job()
+
+            finished = self._step(job)
+
+            with self.condition:
+                self.running.discard(job.session)
+                if finished:
+                    jobs = self.queues[job.session]
+                    jobs.popleft()
+                    if not jobs:
+                        del self.queues[job.session]
+                self.condition.notify_all()
+
+    @staticmethod
+    def _step(job):
+        """Run the job's next step; True once it has finished"""
+        if job.cancelled:
+            job.steps.close()
+            job._finish(error=ProcessingCancelled('Processing was cancelled'))
+            return True
+        try:
+            job.progress = next(job.steps)
+            return False
+        except StopIteration as done:
+            job._finish(result=done.value)
+        except BaseException as e:
+            job._finish(error=e)
+        return True
@@ -0,0 +1,298 @@
+"""Raw punch-log ingest: device exports with one punch per line instead of one day per row.
+
+    df_cleaned, df_summary, error = process_punch_log('attlog.txt')
+
+Usage:
+    python punch_log.py attlog.txt --names roster.csv --output-prefix june
+
+Access-control terminals log every punch as an AC number and a timestamp,
+e.g. the tab-separated attlog export (extra status fields are ignored)
+
+        1	2025-06-01 08:59:01	1	0	1	0
+
+or a CSV with a header row: 'AC-No.' and either 'Time' (a timestamp) or
+'Date' plus 'Time', optionally 'Name' and 'Emp No.'. The log is read in chunks
+by pandas' C parser with every column typed as str, and each chunk is reduced
+at once to int64 AC numbers and minutes since the epoch. All punches are then
+sorted by (AC number, time) once: each run of one AC number and shift day is a
+row of the day-per-row workbook, and the sorted minutes are the flat punch
+stream punch_bound_minutes takes. A shift day runs from 15:00 to 14:59 the next
+morning (the +9h ordering of SHIFT_ORDER_OFFSET) and is dated by the day it
+starts, so a 19:00 check-in and the 03:00 check-out the terminal stamps on the
+next date are one row, as in the workbook ("19:07 04:15").
+Clock times, the data-quality checks and the summary follow the same rules as
+for workbooks, without building a 'Clock-in/out Time' string per row.
+
+Logs without a Name column are named by AC number unless a roster (AC-No. ->
+Name) is given; Emp No. defaults to the AC number. Lines whose AC number or
+timestamp cannot be read are reported as malformed tokens.
+"""
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from attendance_core import SHIFT_ORDER_OFFSET, punch_bound_minutes, run_steps, summarize_attendance
+from compact_records import _to_int32, display_attendance_frame
+from instrumentation import PipelineMetrics
+from shift_policy import DEFAULT_POLICY, policy_clock_minutes
+from time_parsing import MINUTE_LABELS, MINUTES_PER_DAY, MISSING_MINUTE
+
+# Lines parsed per chunk
+PUNCH_CHUNK_ROWS = 500000
+
+# Bytes of the log read up front to detect its layout and estimate its line count
+SNIFF_BYTES = 64 * 1024
+
+# Header spellings (lower case) of the columns a punch log may have
+COLUMN_ALIASES = {
+    'AC-No.': ('ac-no.', 'ac-no', 'ac no.', 'ac no', 'acno', 'user id', 'userid', 'id'),
+    'Time': ('time', 'datetime', 'date/time', 'date time', 'timestamp', 'punch time', 'check time'),
+    'Date': ('date',),
+    'Name': ('name',),
+    'Emp No.': ('emp no.', 'emp no', 'empno'),
+}
+
+_LABELS = np.array(MINUTE_LABELS, dtype=object)
+
+
+def _peek(source):
+    """(first SNIFF_BYTES of the log as text, its size in bytes) without moving a file's position"""
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'rb') as f:
+            return f.read(SNIFF_BYTES).decode('utf-8-sig', errors='replace'), os.path.getsize(source)
+    position = source.tell()
+    head = source.read(SNIFF_BYTES)
+    size = source.seek(0, os.SEEK_END)
+    source.seek(position)
+    return head.decode('utf-8-sig', errors='replace'), size
+
+
+def read_options(head):
+    """pd.read_csv options and the canonical name of each column read, from the start of the log"""
+    lines = [line for line in head.splitlines() if line.strip()]
+    if not lines:
+        raise ValueError("The punch log is empty")
+    first = lines[0]
+    delimiter = next((d for d in ('\t', ',', ';') if d in first), None)
+    fields = first.split(delimiter) if delimiter else first.split()
+    options = dict(sep=delimiter or r'\s+', engine='c', encoding='utf-8-sig', skip_blank_lines=True)
+
+    if fields[0].strip().isdigit():
+        # No header: AC number, then the timestamp (split in two by whitespace separators)
+        options['header'] = None
+        names = ['AC-No.', 'Date', 'Time'] if delimiter is None else ['AC-No.', 'Time']
+        options['usecols'] = list(range(len(names)))
+        options['dtype'] = _dtypes(dict(enumerate(names)))
+        return options, names
+
+    found = {}
+    for position, field in enumerate(fields):
+        label = field.strip().lower()
+        for column, aliases in COLUMN_ALIASES.items():
+            if label in aliases and column not in found:
+                found[column] = position
+    if 'AC-No.' not in found or 'Time' not in found:
+        raise ValueError(f"Punch log header needs an AC-No. and a Time column, found: {', '.join(fields)}")
+    options['header'] = 0
+    options['usecols'] = sorted(found.values())
+    by_position = {position: column for column, position in found.items()}
+    options['dtype'] = _dtypes(by_position)
+    return options, [by_position[position] for position in options['usecols']]
+
+
+def _dtypes(columns):
+    """read_csv dtypes by column position: str for everything but the AC number.
+
+    The C parser reads a column of plain integers straight to int64; AC numbers only
+    come back as str (and are converted afterwards) in a chunk with unreadable lines.
+    """
+    return {position: str for position, column in columns.items() if column != 'AC-No.'}
+
+
+def _timestamps(chunk):
+    return chunk['Time'] if 'Date' not in chunk else chunk['Date'] + ' ' + chunk['Time']
+
+
+def _parse_chunk(chunk, time_format):
+    """(AC numbers, minutes since the epoch, readable mask) of a chunk of raw lines"""
+    ac = chunk['AC-No.']
+    ac = (ac if pd.api.types.is_numeric_dtype(ac.dtype) else pd.to_numeric(ac, errors='coerce')).to_numpy(dtype=np.float64)
+    times = pd.to_datetime(_timestamps(chunk), format=time_format, errors='coerce').to_numpy()
+    readable = ~np.isnan(ac) & (ac == np.floor(ac)) & ~np.isnat(times)
+    minutes = times[readable].astype('datetime64[m]').astype(np.int64)
+    return ac[readable].astype(np.int64), minutes, readable
+
+
+def _per_employee(employees, known, defaults):
+    """One value per AC number in `employees`: the known one, else the default"""
+    return np.array([known.get(ac, default) for ac, default in zip(employees.tolist(), defaults)], dtype=object)
+
+
+def iter_punch_log(source, chunk_rows=PUNCH_CHUNK_ROWS, names=None, time_format=None, metrics=None, quality=None,
+                   policy=DEFAULT_POLICY):
+    """Read a punch log into cleaned records and their summary, a chunk of lines per step.
+
+    Yields ('Reading punches', lines read, estimated total lines) after each chunk and
+    returns (cleaned, summary, error) like process_attendance_file. `names` maps AC
+    numbers to names for logs without a Name column; `time_format` is a strftime
+    format for the timestamps (inferred from the first one by default).
+    """
+    metrics = metrics or PipelineMetrics()
+    try:
+        head, size = _peek(source)
+        options, columns = read_options(head)
+        sample_lines = max(head.count('\n'), 1)
+        estimated_lines = max(size * sample_lines // max(len(head.encode('utf-8')), 1), 1)
+
+        ac_parts, minute_parts = [], []
+        # First Name/Emp No. seen per AC number
+        first_seen = {}
+        lines = 0
+        reader = pd.read_csv(source, chunksize=chunk_rows, **options)
+        with reader:
+            while True:
+                with metrics.stage('read_log') as stage:
+                    chunk = next(reader, None)
+                    if chunk is None:
+                        break
+                    chunk.columns = columns
+                    stage.rows += len(chunk)
+                    ac, minutes, readable = _parse_chunk(chunk, time_format)
+                    ac_parts.append(ac)
+                    minute_parts.append(minutes)
+                    for column in ('Name', 'Emp No.'):
+                        if column in chunk:
+                            values = pd.Series(chunk[column].to_numpy()[readable], index=ac).dropna()
+                            known = first_seen.setdefault(column, {})
+                            for key, value in values[~values.index.duplicated()].items():
+                                known.setdefault(key, value)
+
+                if quality is not None and not readable.all():
+                    with metrics.stage('data_quality'):
+                        rejected = chunk[~readable]
+                        bad_ac = pd.to_numeric(rejected['AC-No.'], errors='coerce').isna().to_numpy()
+                        rejected = rejected.astype({'AC-No.': str})
+                        employees = rejected['Name'] if 'Name' in rejected else rejected['AC-No.']
+                        quality.add_rejected(employees.fillna('(no name)').astype(str).str.strip().to_numpy(),
+                                             np.where(bad_ac, 'AC-No.', 'Time'),
+                                             np.where(bad_ac, rejected['AC-No.'], _timestamps(rejected)))
+                lines += len(chunk)
+                yield 'Reading punches', lines, max(estimated_lines, lines)
+
+        ac = np.concatenate(ac_parts) if ac_parts else np.empty(0, dtype=np.int64)
+        if not len(ac):
+            return None, None, "The punch log has no readable punches"
+        stamps = np.concatenate(minute_parts)
+        del ac_parts, minute_parts
+
+        # Pivot: one row per (AC number, shift day), its punches in time order
+        with metrics.stage('pivot_punches', rows=len(ac)):
+            first_stamp = stamps.min()
+            span = int(stamps.max() - first_stamp) + 1
+            if 0 <= ac.min() and int(ac.max()) < np.iinfo(np.int64).max // span:
+                # One sort of a combined (AC number, time) key; the key itself gives both back
+                keys = np.sort(ac * span + (stamps - first_stamp))
+                ac, stamps = keys // span, keys % span + first_stamp
+                del keys
+            else:
+                order = np.lexsort((stamps, ac))
+                ac, stamps = ac[order], stamps[order]
+                del order
+            # Punches before 15:00 belong to the shift that started the day before
+            days = (stamps - (MINUTES_PER_DAY - SHIFT_ORDER_OFFSET)) // MINUTES_PER_DAY
+            minutes = stamps % MINUTES_PER_DAY
+            del stamps
+            new_row = np.r_[True, (ac[1:] != ac[:-1]) | (days[1:] != days[:-1])]
+            row_ids = np.cumsum(new_row) - 1
+            starts = np.flatnonzero(new_row)
+            row_ac, row_days = ac[starts], days[starts]
+
+        with metrics.stage('extract_clock_times', rows=len(starts)):
+            first, last = punch_bound_minutes(row_ids, minutes, len(starts))
+            clock_in, clock_out = policy_clock_minutes(first, last, policy)
+
+        # Names and employee numbers are looked up once per AC number
+        employees, row_employee = np.unique(row_ac, return_inverse=True)
+        known_names = first_seen.get('Name', {})
+        if names is not None:
+            known_names = {**known_names, **{int(ac): name for ac, name in names.items()}}
+        employee_names = _per_employee(employees, known_names, employees.astype(str))
+        employee_names = np.array([str(name).strip() for name in employee_names], dtype=object)
+        employee_numbers = _per_employee(employees, first_seen.get('Emp No.', {}), employees)
+        numeric = pd.to_numeric(pd.Series(employee_numbers), errors='coerce')
+        if numeric.notna().all():
+            employee_numbers = numeric.to_numpy()
+
+        if quality is not None:
+            with metrics.stage('data_quality', rows=len(starts)):
+                day_rows = pd.DataFrame({'Name': employee_names[row_employee],
+                                         'Date': row_days.astype('datetime64[D]').astype('datetime64[ns]')})
+                quality.add(day_rows, row_ids, _LABELS[minutes], minutes.astype(np.float64),
+                            np.zeros(len(minutes), dtype=bool))
+
+        with metrics.stage('filter', rows=len(starts)):
+            keep = np.flatnonzero((clock_in != MISSING_MINUTE) | (clock_out != MISSING_MINUTE))
+            kept_employees = row_employee[keep]
+            name_codes = pd.Categorical(employee_names)
+            df_cleaned = pd.DataFrame({
+                'Emp No.': _to_int32(pd.Series(employee_numbers[kept_employees])),
+                'AC-No.': _to_int32(pd.Series(row_ac[keep])),
+                'Name': pd.Categorical.from_codes(name_codes.codes[kept_employees], name_codes.categories),
+                'Date': row_days[keep].astype(np.int32),
+                'Clock In': clock_in[keep],
+                'Clock Out': clock_out[keep],
+                # Kept so another ShiftPolicy can be applied later (see shift_whatif)
+                'First Punch': first[keep],
+                'Last Punch': last[keep],
+            })
+
+        yield 'Summarizing', lines, lines
+        return df_cleaned, summarize_attendance(df_cleaned, metrics), None
+
+    except Exception as e:
+        return None, None, str(e)
+
+
+def process_punch_log(source, chunk_rows=PUNCH_CHUNK_ROWS, names=None, time_format=None, metrics=None, quality=None):
+    """Cleaned records and employee summary of a punch log (path or file-like), see iter_punch_log"""
+    return run_steps(iter_punch_log(source, chunk_rows, names, time_format, metrics, quality))
+
+
+def read_roster(path):
+    """AC number -> name mapping from a CSV with AC-No. and Name columns"""
+    roster = pd.read_csv(path, dtype={'Name': str})
+    return dict(zip(pd.to_numeric(roster['AC-No.']).astype(np.int64), roster['Name'].str.strip()))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Process a raw punch-log export (one punch per line)')
+    parser.add_argument('log', help='Punch log (.csv or .txt)')
+    parser.add_argument('--names', help='Roster CSV with AC-No. and Name columns, for logs without names')
+    parser.add_argument('--time-format', help="strftime format of the timestamps, e.g. '%%d/%%m/%%Y %%H:%%M'")
+    parser.add_argument('--output-prefix', help='Prefix of the output CSVs (default: the log name)')
+    args = parser.parse_args(argv)
+
+    from data_quality import DataQualityReport
+
+    quality = DataQualityReport()
+    names = read_roster(args.names) if args.names else None
+    df_cleaned, df_summary, error = process_punch_log(args.log, names=names, time_format=args.time_format,
+                                                      quality=quality)
+    if error:
+        print(f'{args.log}: {error}', file=sys.stderr)
+        return 1
+
+    prefix = args.output_prefix or os.path.splitext(args.log)[0]
+    display_attendance_frame(df_cleaned).to_csv(f'{prefix}_cleaned.csv', index=False)
+    df_summary.to_csv(f'{prefix}_summary.csv', index=False)
+    quality.table().to_csv(f'{prefix}_diagnostics.csv', index=False)
+    print(f'{len(df_cleaned)} records, {len(df_summary)} employees, {len(quality)} data-quality findings '
+          f'written to {prefix}_*.csv')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,113 @@
+"""Content-addressed cache for processed attendance results.
+
+Results are keyed by a hash of the uploaded bytes, so a Streamlit rerun (or
+re-uploading the same workbook later) skips processing entirely. Entries live
+in a small in-memory LRU and, optionally, in an on-disk directory that is
+trimmed least-recently-used first once it grows past a byte budget.
+"""
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+from collections import OrderedDict
+
+DEFAULT_MEMORY_ENTRIES = 8
+DEFAULT_DISK_BYTES = 512 * 1024 * 1024
+
+
+def content_key(data, *parts):
+    """SHA-256 of the uploaded bytes, plus any extra strings that change the result"""
+    digest = hashlib.sha256(data)
+    for part in parts:
+        digest.update(b'\0' + str(part).encode())
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """Two-level LRU cache: in-memory entries backed by an optional pickle directory"""
+
+    def __init__(self, max_entries=DEFAULT_MEMORY_ENTRIES, cache_dir=None, max_disk_bytes=DEFAULT_DISK_BYTES):
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self.max_disk_bytes = max_disk_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f'{key}.pkl')
+
+    def get(self, key):
+        """Return the cached value for `key`, or None"""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+
+        if not self.cache_dir:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                value = pickle.load(f)
+            # Touch the file so disk eviction sees it as recently used
+            os.utime(path)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+
+        self._remember(key, value)
+        return value
+
+    def put(self, key, value):
+        """Store `value` in memory and, when configured, on disk"""
+        self._remember(key, value)
+        if not self.cache_dir:
+            return
+
+        # Write to a temp file first so readers never see a partial entry
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self._path(key))
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return
+        self._evict_disk()
+
+    def _remember(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _evict_disk(self):
+        """Delete least recently used entries until the directory fits the byte budget"""
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith('.pkl'):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+
+    def clear(self):
+        """Drop every entry from both levels"""
+        with self._lock:
+            self._entries.clear()
+        if self.cache_dir:
+            for entry in os.scandir(self.cache_dir):
+                if entry.name.endswith('.pkl'):
+                    os.remove(entry.path)
@@ -0,0 +1,86 @@
+"""Configurable shift rules shared by clock-time extraction and the employee summary.
+
+    policy = ShiftPolicy(shift_start=parse_hhmm('20:00'), collapse_minutes=30)
+    df_cleaned = clean_attendance_frame(df, policy=policy)
+    df_summary = generate_employee_summary(df_cleaned, policy=policy)
+
+The defaults are the site rules the app has always used: the shift runs from
+19:00 to 04:00, a lone punch between 02:00 and 18:00 is a check-out, and a
+check-in and check-out within an hour of each other are one punch.
+
+Extraction first orders each row's punches (+9h normalization, independent of
+the policy) and keeps only the first and last one; select_punches then applies
+the punch rules to those two. Cleaned records keep both punches, so a different
+policy can be applied later without the workbook (see shift_whatif).
+"""
+import numpy as np
+
+from time_parsing import MISSING_MINUTE, minutes_between
+
+
+class ShiftPolicy:
+    """Shift rules, all in minutes of the day.
+
+    shift_start:        a later check-in is late and counts as undertime, an earlier
+                        one as overtime (19:00)
+    shift_end:          an earlier check-out is an early checkout and counts as
+                        undertime, a later one as overtime (04:00)
+    out_only_window:    minutes of day where a lone punch is a check-out, otherwise
+                        it is a check-in (02:00-18:00, inclusive)
+    collapse_minutes:   a check-in and check-out this close together are treated as
+                        one punch, kept by the out_only_window rule (60)
+    """
+    __slots__ = ('shift_start', 'shift_end', 'out_only_window', 'collapse_minutes')
+
+    def __init__(self, shift_start=1140, shift_end=240, out_only_window=(120, 1080), collapse_minutes=60):
+        self.shift_start = shift_start
+        self.shift_end = shift_end
+        self.out_only_window = tuple(out_only_window)
+        self.collapse_minutes = collapse_minutes
+
+    def key(self):
+        return (self.shift_start, self.shift_end, self.out_only_window, self.collapse_minutes)
+
+    def punch_rules(self):
+        """The part of the policy that decides which punches are kept (not the summary thresholds)"""
+        return (self.out_only_window, self.collapse_minutes)
+
+    def __eq__(self, other):
+        return isinstance(other, ShiftPolicy) and self.key() == other.key()
+
+    def __hash__(self):
+        return hash(self.key())
+
+    def __repr__(self):
+        return 'ShiftPolicy(shift_start={}, shift_end={}, out_only_window={}, collapse_minutes={})'.format(*self.key())
+
+
+DEFAULT_POLICY = ShiftPolicy()
+
+
+def select_punches(first, last, policy=DEFAULT_POLICY):
+    """Which rows get a check-in and a check-out, given each row's first and last punch.
+
+    `first` and `last` are minutes of day in shift order; `last` is MISSING_MINUTE on
+    rows with a single punch and both are on rows without any. The check-in is the
+    first punch, the check-out the last one (the first on single-punch rows).
+    Returns (has check-in, has check-out) boolean arrays.
+    """
+    first = np.asarray(first, dtype=np.int64)
+    last = np.asarray(last, dtype=np.int64)
+    low, high = policy.out_only_window
+
+    in_window = (first >= low) & (first <= high)
+    collapsed = (last == MISSING_MINUTE) | (minutes_between(first, last) <= policy.collapse_minutes)
+    has_punch = first != MISSING_MINUTE
+    return has_punch & ~(collapsed & in_window), has_punch & ~(collapsed & ~in_window)
+
+
+def policy_clock_minutes(first, last, policy=DEFAULT_POLICY):
+    """Check-in and check-out minute (uint16, MISSING_MINUTE if none) from first/last punch minutes"""
+    first = np.asarray(first, dtype=np.uint16)
+    last = np.asarray(last, dtype=np.uint16)
+    has_in, has_out = select_punches(first, last, policy)
+    clock_out = np.where(last == MISSING_MINUTE, first, last)
+    return (np.where(has_in, first, MISSING_MINUTE).astype(np.uint16),
+            np.where(has_out, clock_out, MISSING_MINUTE).astype(np.uint16))
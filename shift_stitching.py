@@ -0,0 +1,123 @@
+"""Stitch night shifts across date boundaries from the raw punch stream.
+
+extract_clock_times picks check-in/check-out within each date row, so a shift
+that starts at 19:00 on one date and ends at 04:00 on the next is split over
+two rows. Here every punch of the export becomes one timestamp (row date +
+time of day), the stream is sorted by (employee, timestamp), and one linear
+sweep cuts it into shifts: a shift holds the punches that fall inside the same
+24-hour shift window, which opens at `day_start` each day (15:00, where the
++9h ordering of extract_clock_times starts a shift day). Single punches and
+punches close together follow the ShiftPolicy punch rules, as in the app.
+
+Usage:
+    python shift_stitching.py "Attendance June.xlsx" --output shifts.csv --day-start 15:00
+"""
+import argparse
+import sys
+
+import numpy as np
+import pandas as pd
+
+from attendance_core import SHIFT_ORDER_OFFSET, tokenize_punches
+from compact_records import NAT_ORDINAL, day_ordinals
+from shift_policy import DEFAULT_POLICY, ShiftPolicy
+from time_parsing import MINUTES_PER_DAY, format_minutes, parse_hhmm
+
+
+# Minute of day each 24-hour shift window opens (15:00)
+DEFAULT_DAY_START = MINUTES_PER_DAY - SHIFT_ORDER_OFFSET
+
+
+def punch_stream(df):
+    """Every punch in a raw export as (employee code, timestamp in minutes since 1970-01-01).
+
+    Employees are identified by Name; codes index the sorted names returned as the
+    third value. Punches on rows without a name or a valid date are dropped. The
+    stream is sorted by (employee, timestamp), ties keeping their export order.
+    """
+    row_ids, _, minutes = tokenize_punches(df['Clock-in/out Time'], df['Clock Out'])
+    codes, names = pd.factorize(df['Name'], sort=True)
+    days = day_ordinals(df['Date']).to_numpy()
+
+    employee = codes[row_ids]
+    day = days[row_ids]
+    keep = (employee >= 0) & (day != NAT_ORDINAL)
+    employee, timestamp, row_ids = employee[keep], day[keep] * MINUTES_PER_DAY + minutes[keep], row_ids[keep]
+
+    order = np.lexsort((timestamp, employee))
+    return employee[order], timestamp[order], names, row_ids[order]
+
+
+def stitch_shifts(df, policy=DEFAULT_POLICY, day_start=DEFAULT_DAY_START):
+    """Pair the punches of a raw export into shift records that may span two dates.
+
+    A shift whose punches all lie within `policy.collapse_minutes` is a single punch,
+    a check-out inside `policy.out_only_window` and a check-in otherwise. Returns one
+    row per (employee, shift) with Emp No. and AC-No. (when present), Name, Shift
+    Date, Clock In / Clock Out timestamps (NaT when missing), Punches and Hours.
+    """
+    employee, timestamp, names, row_ids = punch_stream(df)
+
+    # Sweep: a new shift starts at every employee or shift-window change
+    shift_day = (timestamp - day_start) // MINUTES_PER_DAY
+    boundary = np.ones(len(timestamp), dtype=bool)
+    boundary[1:] = (employee[1:] != employee[:-1]) | (shift_day[1:] != shift_day[:-1])
+    starts = np.flatnonzero(boundary)
+    ends = np.append(starts[1:], len(timestamp))[:len(starts)] - 1
+
+    first = timestamp[starts]
+    last = timestamp[ends]
+    first_minute = first % MINUTES_PER_DAY
+    low, high = policy.out_only_window
+    collapsed = last - first <= policy.collapse_minutes
+    out_only = collapsed & (first_minute >= low) & (first_minute <= high)
+    in_only = collapsed & ~out_only
+
+    not_a_time = np.datetime64('NaT', 'm')
+    shifts = pd.DataFrame({
+        'Name': names.to_numpy()[employee[starts]],
+        'Shift Date': shift_day[starts].astype('datetime64[D]').astype('datetime64[ns]'),
+        'Clock In': np.where(out_only, not_a_time, first.astype('datetime64[m]')).astype('datetime64[ns]'),
+        'Clock Out': np.where(in_only, not_a_time, last.astype('datetime64[m]')).astype('datetime64[ns]'),
+        'Punches': ends - starts + 1,
+        'Hours': np.where(collapsed, np.nan, np.round((last - first) / 60, 2)),
+    })
+
+    # Employee numbers come from the row of the shift's first punch
+    for column in ('AC-No.', 'Emp No.'):
+        if column in df.columns:
+            shifts.insert(0, column, df[column].to_numpy()[row_ids[starts]])
+    return shifts
+
+
+def parse_clock(text):
+    """argparse type for HH:MM options"""
+    minutes = parse_hhmm(text)
+    if minutes is None:
+        raise argparse.ArgumentTypeError(f'expected HH:MM, got {text!r}')
+    return minutes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Stitch night shifts that cross midnight from an attendance export')
+    parser.add_argument('workbook', help='Excel attendance export')
+    parser.add_argument('-o', '--output', default='shifts.csv', help='Where to write the shift records')
+    parser.add_argument('--day-start', type=parse_clock, default=DEFAULT_DAY_START,
+                        help='Time of day each shift window opens (default: 15:00)')
+    parser.add_argument('--collapse-minutes', type=int, default=DEFAULT_POLICY.collapse_minutes,
+                        help='Punches this close together count as one (default: 60)')
+    args = parser.parse_args(argv)
+
+    engine = 'xlrd' if args.workbook.endswith('.xls') else None
+    df = pd.read_excel(args.workbook, engine=engine)
+    shifts = stitch_shifts(df, ShiftPolicy(collapse_minutes=args.collapse_minutes), args.day_start)
+    shifts.to_csv(args.output, index=False)
+
+    spanning = (shifts['Clock Out'].dt.normalize() > shifts['Clock In'].dt.normalize()).sum()
+    print(f"{len(shifts)} shifts ({spanning} crossing midnight) with window opening at "
+          f"{format_minutes(args.day_start)}, saved to {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,186 @@
+"""Instant employee summaries for alternative shift policies.
+
+    what_if = ShiftWhatIf(df_cleaned)
+    what_if.summary(ShiftPolicy(shift_start=1200, shift_end=300))
+
+Cleaned records keep each row's first and last punch, so the check-in and
+check-out a policy picks can be re-derived without the workbook. For a given
+set of punch rules (out-only window and collapse distance) the records are
+reduced once to per-employee minute-of-day histograms of check-ins and
+check-outs, plus the attendance-day counts those rules give. Late check-ins,
+early checkouts, undertime and overtime for any shift start and end are then
+sums over histogram suffixes and prefixes: a threshold change costs
+O(employees x 1440) instead of a pass over every record. Changing the punch
+rules costs one vectorized pass to rebuild the histograms.
+
+Results read back from CSV (e.g. from the processing service) have no punch
+columns; the first and last punch are then taken from Clock In and Clock Out,
+which is exact except for rows whose punches were collapsed into one.
+"""
+import numpy as np
+import pandas as pd
+
+from attendance_core import finalize_summary
+from compact_records import NAT_ORDINAL, compact_attendance_frame, day_ordinals, is_compact_frame
+from shift_policy import DEFAULT_POLICY, policy_clock_minutes
+from time_parsing import MINUTES_PER_DAY, MISSING_MINUTE
+
+MINUTES = np.arange(MINUTES_PER_DAY, dtype=np.int64)
+
+
+class PunchHistograms:
+    """Per-employee check-in/check-out minute histograms for one set of punch rules"""
+    __slots__ = ('checkins', 'checkouts', 'both_in', 'both_out', 'checkin_days', 'checkout_days', 'working_days')
+
+    def __init__(self, codes, days, clock_in, clock_out, n_employees):
+        has_in = clock_in != MISSING_MINUTE
+        has_out = clock_out != MISSING_MINUTE
+
+        # Working days count every record, named or not
+        self.working_days = len(np.unique(days[has_in]))
+
+        named = codes >= 0
+        codes, days, clock_in, clock_out = codes[named], days[named], clock_in[named], clock_out[named]
+        has_in, has_out = has_in[named], has_out[named]
+        has_both = has_in & has_out
+
+        self.checkins = self._histogram(codes[has_in], clock_in[has_in], n_employees)
+        self.checkouts = self._histogram(codes[has_out], clock_out[has_out], n_employees)
+        self.both_in = self._histogram(codes[has_both], clock_in[has_both], n_employees)
+        self.both_out = self._histogram(codes[has_both], clock_out[has_both], n_employees)
+
+        # Distinct (employee, day) pairs, counted per employee
+        day_ids, day_index = np.unique(days, return_inverse=True)
+        self.checkin_days = self._distinct_days(codes[has_in], day_index[has_in], len(day_ids), n_employees)
+        self.checkout_days = self._distinct_days(codes[has_out], day_index[has_out], len(day_ids), n_employees)
+
+    @staticmethod
+    def _histogram(codes, minutes, n_employees):
+        keys = codes.astype(np.int64) * MINUTES_PER_DAY + minutes
+        counts = np.bincount(keys, minlength=n_employees * MINUTES_PER_DAY)
+        return counts.astype(np.int32).reshape(n_employees, MINUTES_PER_DAY)
+
+    @staticmethod
+    def _distinct_days(codes, day_index, n_days, n_employees):
+        pairs = np.unique(codes.astype(np.int64) * max(n_days, 1) + day_index)
+        return np.bincount(pairs // max(n_days, 1), minlength=n_employees)
+
+    def totals(self, shift_start, shift_end):
+        """Late/early counts and undertime/overtime minutes per employee for one shift start and end"""
+        after_start = slice(shift_start + 1, None)
+        before_start = slice(None, shift_start)
+        before_end = slice(None, shift_end)
+        after_end = slice(shift_end + 1, None)
+
+        # Undertime: late check-in after the start, early checkout before the end (rows with both only)
+        # Overtime: early check-in before the start, late checkout after the end
+        undertime = (self.both_in[:, after_start] @ (MINUTES[after_start] - shift_start)
+                     + self.both_out[:, before_end] @ (shift_end - MINUTES[before_end]))
+        overtime = (self.both_in[:, before_start] @ (shift_start - MINUTES[before_start])
+                    + self.both_out[:, after_end] @ (MINUTES[after_end] - shift_end))
+        return {
+            'late': self.checkins[:, after_start].sum(axis=1, dtype=np.int64),
+            'early': self.checkouts[:, before_end].sum(axis=1, dtype=np.int64),
+            'undertime': undertime,
+            'overtime': overtime,
+        }
+
+
+class ShiftWhatIf:
+    """Employee summaries (and cleaned records) of one result under any ShiftPolicy"""
+
+    def __init__(self, cleaned, diagnostics=None):
+        self.cleaned = cleaned
+        self.diagnostics = diagnostics
+        self._records = None
+        self._histograms = None
+        self._exports = None
+
+    def _prepare(self):
+        """Employee positions, days, clock and punch minutes and each employee's month, built on first use"""
+        if self._records is None:
+            df = self.cleaned if is_compact_frame(self.cleaned) else compact_attendance_frame(self.cleaned)
+            names = df['Name'] if isinstance(df['Name'].dtype, pd.CategoricalDtype) else df['Name'].astype('category')
+            codes = names.cat.codes.to_numpy()
+            days = day_ordinals(df['Date']).to_numpy()
+            clock_in, clock_out = df['Clock In'].to_numpy(), df['Clock Out'].to_numpy()
+
+            if 'First Punch' in df:
+                first, last = df['First Punch'].to_numpy(), df['Last Punch'].to_numpy()
+            else:
+                first = np.where(clock_in != MISSING_MINUTE, clock_in, clock_out)
+                last = np.where(clock_in != MISSING_MINUTE, clock_out, MISSING_MINUTE).astype(np.uint16)
+
+            # Summary rows are the employees that have records, in name order; Month spans their dated rows
+            named = codes >= 0
+            employees = np.unique(codes[named])
+            positions = np.searchsorted(employees, codes)
+            positions[~named] = -1
+            dated = pd.Series(np.where(days != NAT_ORDINAL, days, np.nan)[named])
+            day_span = dated.groupby(positions[named]).agg(['min', 'max']).reindex(np.arange(len(employees)))
+
+            self._records = {
+                'positions': positions,
+                'days': days,
+                'clock_in': clock_in,
+                'clock_out': clock_out,
+                'first': first,
+                'last': last,
+                'names': np.asarray(names.cat.categories)[employees],
+                'first_days': day_span['min'].to_numpy(),
+                'last_days': day_span['max'].to_numpy(),
+            }
+        return self._records
+
+    def clock_minutes(self, policy=DEFAULT_POLICY):
+        """Clock In and Clock Out minutes of every record under the policy's punch rules"""
+        records = self._prepare()
+        # The records were processed with the default rules, which need no re-derivation
+        if policy.punch_rules() == DEFAULT_POLICY.punch_rules():
+            return records['clock_in'], records['clock_out']
+        return policy_clock_minutes(records['first'], records['last'], policy)
+
+    def histograms(self, policy=DEFAULT_POLICY):
+        """PunchHistograms for the policy's punch rules (the last set is kept)"""
+        rules = policy.punch_rules()
+        cached = self._histograms
+        if cached is None or cached[0] != rules:
+            records = self._prepare()
+            clock_in, clock_out = self.clock_minutes(policy)
+            histograms = PunchHistograms(records['positions'], records['days'], clock_in, clock_out, len(records['names']))
+            cached = self._histograms = (rules, histograms)
+        return cached[1]
+
+    def summary(self, policy=DEFAULT_POLICY):
+        """generate_employee_summary of the cleaned records as if they had been processed with `policy`"""
+        records = self._prepare()
+        if not len(records['names']):
+            return pd.DataFrame()
+        histograms = self.histograms(policy)
+        grouped = pd.DataFrame({
+            'first_day': records['first_days'],
+            'last_day': records['last_days'],
+            'checkins': histograms.checkins.sum(axis=1, dtype=np.int64),
+            'checkouts': histograms.checkouts.sum(axis=1, dtype=np.int64),
+            'checkin_days': histograms.checkin_days,
+            'checkout_days': histograms.checkout_days,
+            **histograms.totals(policy.shift_start, policy.shift_end),
+        }, index=pd.Index(records['names'], name='Name'))
+        return finalize_summary(grouped, histograms.working_days)
+
+    def cleaned_records(self, policy=DEFAULT_POLICY):
+        """The cleaned records with Clock In/Clock Out picked by `policy`'s punch rules"""
+        if policy.punch_rules() == DEFAULT_POLICY.punch_rules():
+            return self.cleaned
+        df = self.cleaned.copy(deep=False)
+        df['Clock In'], df['Clock Out'] = self.clock_minutes(policy)
+        return df
+
+    def exports(self, policy):
+        """ResultExports of the cleaned records and summary under `policy` (the last one is kept)"""
+        from exports import ResultExports
+
+        cached = self._exports
+        if cached is None or cached[0] != policy:
+            cached = self._exports = (policy, ResultExports(self.cleaned_records(policy), self.summary(policy), self.diagnostics))
+        return cached[1]
@@ -0,0 +1,93 @@
+"""Synthetic attendance workloads for benchmarks and load testing.
+
+Generates frames in the same layout as the device exports the app reads
+(Emp No., AC-No., Name, Date, Clock-in/out Time, Clock Out): one row per
+employee per day, night-shift punches around 19:00-04:00, optional extra
+punches, repeated punches such as "22:09 22:09 22:09", absent days and
+missing 'Clock Out' values.
+"""
+import io
+
+import numpy as np
+import pandas as pd
+
+from time_parsing import MINUTE_LABELS, MINUTES_PER_DAY
+
+LABELS = np.array(MINUTE_LABELS, dtype=object)
+
+
+def generate_attendance(employees=100, days=30, punches_per_day=2, duplicate_rate=0.05,
+                        missing_clock_out_rate=0.5, absence_rate=0.1, start_date='2025-06-01', seed=0):
+    """Build a synthetic attendance frame with `employees * days` rows.
+
+    `punches_per_day` is the typical number of punches on a worked day (check-in,
+    any extra punches, check-out). `duplicate_rate` is the chance a punch is
+    repeated 2-4 times, `missing_clock_out_rate` the chance the check-out stays in
+    'Clock-in/out Time' instead of the 'Clock Out' column.
+    """
+    rng = np.random.default_rng(seed)
+    n_rows = employees * days
+
+    employee = np.repeat(np.arange(employees), days)
+    dates = pd.date_range(start_date, periods=days, freq='D')
+
+    # Night shift: check-in around 19:00, check-out around 04:00, extras in between
+    checkin = np.rint(rng.normal(1140, 20, n_rows)).astype(np.int64) % MINUTES_PER_DAY
+    checkout = np.rint(rng.normal(240, 30, n_rows)).astype(np.int64) % MINUTES_PER_DAY
+    extra_count = rng.poisson(max(punches_per_day - 2, 0), n_rows)
+    max_extra = int(extra_count.max()) if n_rows else 0
+    extras = (1140 + rng.integers(60, 480, (n_rows, max_extra))) % MINUTES_PER_DAY
+    extras.sort(axis=1)
+
+    absent = rng.random(n_rows) < absence_rate
+    # Some worked days only have one of the two punches
+    no_checkin = rng.random(n_rows) < 0.03
+    no_checkout = rng.random(n_rows) < 0.05
+    in_clock_out_column = rng.random(n_rows) >= missing_clock_out_rate
+    duplicate = rng.random((n_rows, max_extra + 2)) < duplicate_rate
+    repeats = rng.integers(2, 5, (n_rows, max_extra + 2))
+
+    clock_in_out = []
+    clock_out = []
+    for i in range(n_rows):
+        if absent[i]:
+            clock_in_out.append(np.nan)
+            clock_out.append(np.nan)
+            continue
+
+        punches = [] if no_checkin[i] else [checkin[i]]
+        punches.extend(extras[i, :extra_count[i]])
+        out_label = np.nan
+        if not no_checkout[i]:
+            if in_clock_out_column[i]:
+                out_label = LABELS[checkout[i]]
+            else:
+                punches.append(checkout[i])
+
+        tokens = []
+        for j, minute in enumerate(punches):
+            tokens.extend([LABELS[minute]] * (repeats[i, j] if duplicate[i, j] else 1))
+        clock_in_out.append(' '.join(tokens) if tokens else np.nan)
+        clock_out.append(out_label)
+
+    return pd.DataFrame({
+        'Emp No.': employee + 1,
+        'AC-No.': employee + 1000,
+        'Name': pd.Series([f'Employee {e + 1:05d}' for e in range(employees)]).to_numpy()[employee],
+        'Date': np.tile(dates.strftime('%Y-%m-%d').to_numpy(), employees),
+        'Clock-in/out Time': clock_in_out,
+        'Clock Out': clock_out,
+    })
+
+
+def generate_rows(rows, days=30, **kwargs):
+    """Synthetic frame with (about) `rows` rows, spread over `days` days"""
+    days = min(days, rows)
+    return generate_attendance(employees=max(rows // days, 1), days=days, **kwargs)
+
+
+def to_workbook_bytes(df):
+    """Serialize a frame to .xlsx bytes, as an upload would arrive"""
+    buffer = io.BytesIO()
+    df.to_excel(buffer, index=False)
+    return buffer.getvalue()
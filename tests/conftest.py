@@ -0,0 +1,61 @@
+import datetime
+import os
+import random
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# The modules live at the repository root, next to the app
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Tokens the device exports get wrong now and then
+BAD_TOKENS = ['xx', '24:00', '9:5', '7:60', '19:7', '', '12:3a', '1:01']
+
+
+def _token(rng):
+    if rng.random() < 0.05:
+        return rng.choice(BAD_TOKENS)
+    return f'{rng.randrange(24):02d}:{rng.randrange(60):02d}'
+
+
+def fuzzed_attendance(rows=3000, seed=0, employees=40, days=30, start='2025-06-01'):
+    """Workbook-layout frame with random punches, bad tokens, repeats, blanks and non-string cells"""
+    rng = random.Random(seed)
+    first_day = datetime.date.fromisoformat(start)
+    records = []
+    for i in range(rows):
+        clock_in_out = ' '.join(_token(rng) for _ in range(rng.choice([0, 0, 1, 1, 2, 2, 3, 4])))
+        if rng.random() < 0.1:
+            clock_in_out = np.nan
+        elif rng.random() < 0.05:
+            clock_in_out = datetime.time(19, 7)
+        elif rng.random() < 0.05:
+            clock_in_out = clock_in_out + ' ' + clock_in_out
+        clock_out = _token(rng) if rng.random() < 0.4 else (np.nan if rng.random() < 0.8 else '')
+        records.append({
+            'Emp No.': i % employees,
+            'AC-No.': 100 + i % employees,
+            'Name': f'N{i % employees:03d}',
+            'Date': (first_day + datetime.timedelta(days=rng.randrange(days))).isoformat(),
+            'Clock-in/out Time': clock_in_out,
+            'Clock Out': clock_out,
+        })
+    return pd.DataFrame(records)
+
+
+@pytest.fixture
+def fuzzed():
+    return fuzzed_attendance
+
+
+@pytest.fixture
+def cleaned_with_gaps(fuzzed):
+    """Cleaned records with unnamed and undated rows, which the per-employee totals leave out"""
+    from attendance_core import clean_attendance_frame
+
+    df = fuzzed(6000, 7)
+    df.loc[df.index[::37], 'Name'] = None
+    df.loc[df.index[::53], 'Date'] = None
+    return clean_attendance_frame(df)
@@ -0,0 +1,17 @@
+"""Explorer filters against the summary counts they correspond to"""
+import pytest
+
+from attendance_core import clean_attendance_frame, generate_employee_summary
+from attendance_explorer import AttendanceExplorer
+from shift_policy import DEFAULT_POLICY, ShiftPolicy
+
+
+@pytest.mark.parametrize('policy', [DEFAULT_POLICY, ShiftPolicy(shift_start=1200, shift_end=300)])
+def test_flag_filters_match_summary(fuzzed, policy):
+    cleaned = clean_attendance_frame(fuzzed(3000, 9))
+    summary = generate_employee_summary(cleaned, policy)
+    explorer = AttendanceExplorer(cleaned, summary)
+
+    assert len(explorer.query(show='Late check-ins', policy=policy)) == summary['Late Check-ins'].sum()
+    assert len(explorer.query(show='Early checkouts', policy=policy)) == summary['Early Checkouts'].sum()
+    assert len(explorer.query(show='Missing clock in')) == len(cleaned) - summary['Total Check-ins'].sum()
@@ -0,0 +1,79 @@
+"""Job queue housekeeping and client behaviour of the processing service"""
+import os
+import shutil
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+from attendance_service import AttendanceService, JobQueue, ServiceClient
+from synthetic_attendance import generate_attendance, to_workbook_bytes
+
+
+def run_one_job(jobs):
+    job = jobs.submit('June.xlsx', to_workbook_bytes(generate_attendance(employees=3, days=5)))
+    job.future.result()
+    return job
+
+
+def test_shutdown_keeps_a_supplied_work_dir(tmp_path):
+    unrelated = tmp_path / 'notes.txt'
+    unrelated.write_text('keep me')
+    jobs = JobQueue(workers=1, work_dir=str(tmp_path))
+    job = run_one_job(jobs)
+    assert os.path.exists(os.path.join(job.dir, 'summary.csv'))
+
+    jobs.shutdown()
+    assert unrelated.read_text() == 'keep me'
+    assert not os.path.exists(job.dir)
+
+
+def test_shutdown_removes_its_own_work_dir():
+    jobs = JobQueue(workers=1)
+    run_one_job(jobs)
+    jobs.shutdown()
+    assert not os.path.exists(jobs.work_dir)
+
+
+def test_failed_upload_write_frees_its_slot(tmp_path, monkeypatch):
+    jobs = JobQueue(workers=1, max_pending=1, work_dir=str(tmp_path))
+
+    def full_disk(*args, **kwargs):
+        raise OSError(28, 'No space left on device')
+
+    monkeypatch.setattr('attendance_service.open', full_disk, raising=False)
+    with pytest.raises(OSError):
+        jobs.submit('June.xlsx', b'workbook')
+    monkeypatch.undo()
+
+    assert jobs.pending == 0
+    assert os.listdir(tmp_path) == []
+    run_one_job(jobs)
+    jobs.shutdown()
+
+
+def test_result_removed_after_lookup_is_not_found(tmp_path):
+    jobs = JobQueue(workers=1, work_dir=str(tmp_path))
+    job = run_one_job(jobs)
+    server = AttendanceService(('127.0.0.1', 0), jobs)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        url = f'http://127.0.0.1:{server.server_address[1]}/jobs/{job.id}/summary.csv'
+        assert urllib.request.urlopen(url).read().startswith(b'Name')
+        # What a DELETE racing this GET leaves behind: the job still listed, its files gone
+        shutil.rmtree(job.dir)
+        with pytest.raises(urllib.error.HTTPError) as error:
+            urllib.request.urlopen(url)
+        assert error.value.code == 404
+    finally:
+        server.shutdown()
+        server.server_close()
+        jobs.shutdown()
+
+
+def test_wait_gives_up_after_timeout():
+    client = ServiceClient('http://127.0.0.1:1')
+    client.status = lambda job_id: {'status': 'running'}
+    with pytest.raises(TimeoutError):
+        client.wait('stuck', timeout=0.05, poll_seconds=0.01)
@@ -0,0 +1,20 @@
+"""AttendanceStore queries against the same filters on the records frame"""
+import pytest
+
+from attendance_core import clean_attendance_frame
+from attendance_store import AttendanceStore
+from compact_records import display_attendance_frame
+from shift_policy import DEFAULT_POLICY, ShiftPolicy
+from time_parsing import MISSING_MINUTE
+
+
+@pytest.mark.parametrize('policy', [DEFAULT_POLICY, ShiftPolicy(shift_start=1200)])
+def test_late_checkins_follow_policy(fuzzed, policy):
+    cleaned = clean_attendance_frame(fuzzed(3000, 10))
+    store = AttendanceStore.from_frame(cleaned)
+
+    late = store.late_checkins('2025-06-05', '2025-06-20', policy)
+    clock_in = cleaned['Clock In']
+    dates = display_attendance_frame(cleaned)['Date']
+    expected = (clock_in > policy.shift_start) & (clock_in != MISSING_MINUTE) & dates.between('2025-06-05', '2025-06-20')
+    assert len(late) == expected.sum() > 0
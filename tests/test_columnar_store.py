@@ -0,0 +1,16 @@
+"""Columnar store round trips"""
+from attendance_core import extract_clock_minutes_batch, extract_clock_times_batch
+from columnar_store import open_columnar_store
+from synthetic_attendance import generate_attendance, to_workbook_bytes
+
+
+def test_derived_minutes_read_back_as_labels(tmp_path):
+    df = generate_attendance(employees=20, days=10)
+    workbook = tmp_path / 'June.xlsx'
+    workbook.write_bytes(to_workbook_bytes(df))
+    store = open_columnar_store(str(workbook))
+
+    minutes = extract_clock_minutes_batch(df['Clock-in/out Time'], df['Clock Out'])
+    store.write_minutes('Clock In', minutes['Clock In'])
+    expected = extract_clock_times_batch(df['Clock-in/out Time'], df['Clock Out'])['Clock In']
+    assert open_columnar_store(str(workbook)).column('Clock In').tolist() == expected.tolist()
@@ -0,0 +1,50 @@
+"""Incremental daily ingest: SummaryAccumulator.add_new_days and saved state"""
+import pandas as pd
+
+from attendance_core import SummaryAccumulator, clean_attendance_frame, generate_employee_summary
+from compact_records import day_ordinals
+
+
+def test_saved_state_folds_in_new_days(cleaned_with_gaps, tmp_path):
+    cleaned = cleaned_with_gaps
+    path = str(tmp_path / 'state.pkl')
+    days = day_ordinals(cleaned['Date'])
+    cutoff = days[days > days.min()].min() + 10
+
+    state = SummaryAccumulator()
+    assert state.add_new_days(cleaned[days < cutoff]) == (days < cutoff).sum()
+    state.save(path)
+
+    state = SummaryAccumulator.load(path)
+    assert state.add_new_days(cleaned) == (days >= cutoff).sum()
+    # Re-running the same import adds nothing
+    assert state.add_new_days(cleaned) == 0
+    pd.testing.assert_frame_equal(state.summary(), generate_employee_summary(cleaned), check_exact=True)
+
+
+def test_new_days_are_keyed_by_employee_and_date(fuzzed):
+    df = fuzzed(3000, 14)
+    df.loc[df.index[::41], 'Name'] = None
+    first_terminal = df[df['Emp No.'] % 2 == 0]
+    second_terminal = df[df['Emp No.'] % 2 == 1]
+
+    state = SummaryAccumulator()
+    state.add_new_days(clean_attendance_frame(first_terminal))
+    # The second terminal's export covers the same dates for other employees
+    cleaned = clean_attendance_frame(second_terminal)
+    assert state.add_new_days(cleaned) == cleaned['Name'].notna().sum()
+    assert state.add_new_days(cleaned) == 0
+
+    expected = generate_employee_summary(clean_attendance_frame(df[df['Name'].notna() | (df['Emp No.'] % 2 == 0)]))
+    pd.testing.assert_frame_equal(state.summary(), expected, check_exact=True)
+
+
+def test_state_saved_without_day_index_still_skips_ingested_days(cleaned_with_gaps, tmp_path):
+    path = str(tmp_path / 'state.pkl')
+    state = SummaryAccumulator()
+    state.add(cleaned_with_gaps)
+    # As saved before the day -> names index was kept
+    del state.names_by_day
+    state.save(path)
+
+    assert SummaryAccumulator.load(path).add_new_days(cleaned_with_gaps) == 0
@@ -0,0 +1,54 @@
+"""Data-quality reports: findings, merging and the service round trip"""
+import io
+
+import pandas as pd
+
+from attendance_core import clean_attendance_frame
+from attendance_service import read_result_csv, run_job
+from data_quality import DataQualityReport
+from punch_log import process_punch_log
+
+
+def rejected_report():
+    quality = DataQualityReport()
+    quality.add_rejected(['Doe, Jane', 'Doe, Jane', 'Ali'], 'Time',
+                         ['2025-06-01, 08:00', '01/06/2025 8:00, 9:00', 'late'])
+    return quality
+
+
+def test_chunked_reports_merge_to_one_report(fuzzed):
+    df = fuzzed(3000, 15)
+    whole = DataQualityReport(last_date='2026-01-01')
+    clean_attendance_frame(df, quality=whole)
+
+    merged = DataQualityReport(last_date='2026-01-01')
+    for start in range(0, len(df), 500):
+        chunk = DataQualityReport(last_date='2026-01-01')
+        clean_attendance_frame(df.iloc[start:start + 500], quality=chunk)
+        merged.merge(chunk)
+    assert len(whole) > 0
+    pd.testing.assert_frame_equal(merged.totals(), whole.totals())
+
+
+def test_examples_with_commas_survive_add_table():
+    quality = rejected_report()
+    copy = DataQualityReport()
+    copy.add_table(quality.table(join_examples=False))
+    assert copy.findings == quality.findings
+    assert quality.findings[('Doe, Jane', 'Time', 'Malformed token')] == [2, ['2025-06-01, 08:00',
+                                                                           '01/06/2025 8:00, 9:00']]
+
+
+def test_service_diagnostics_round_trip(tmp_path):
+    # The timestamp format is inferred from the first line, so the second one is unreadable
+    log = 'AC-No.,Name,Time\n7,"Doe, Jane",2025-06-01 19:00:00\n7,"Doe, Jane","2025-06-01, 19:00"\n'
+    path = tmp_path / 'log.csv'
+    path.write_text(log)
+    expected = DataQualityReport()
+    process_punch_log(io.BytesIO(log.encode()), quality=expected)
+
+    run_job(str(path), str(tmp_path))
+    quality = DataQualityReport()
+    quality.add_table(read_result_csv((tmp_path / 'diagnostics.csv').read_bytes(), keep_default_na=False))
+    assert quality.findings == expected.findings
+    assert quality.findings[('Doe, Jane', 'Time', 'Malformed token')] == [1, ['2025-06-01, 19:00']]
@@ -0,0 +1,23 @@
+"""Lazily encoded downloads: ResultExports"""
+from attendance_core import clean_attendance_frame, generate_employee_summary
+from exports import ResultExports
+from instrumentation import PipelineMetrics
+
+
+def test_encodes_are_timed_into_the_run_record(fuzzed):
+    cleaned = clean_attendance_frame(fuzzed(500, 2))
+    summary = generate_employee_summary(cleaned)
+    metrics = PipelineMetrics()
+    with metrics.stage('filter', rows=len(cleaned)):
+        pass
+    run = metrics.as_record()
+    exports = ResultExports(cleaned, summary, metrics=run)
+
+    exports.get('cleaned', 'CSV')
+    exports.get('summary', 'CSV (gzip)')
+    # A second request reuses the encoded bytes
+    exports.get('cleaned', 'CSV')
+
+    stage = run['stages'][-1]
+    assert (stage['stage'], stage['rows'], stage['calls']) == ('export_encode', len(cleaned) + len(summary), 2)
+    assert run['total_seconds'] == round(sum(s['seconds'] for s in run['stages']), 6)
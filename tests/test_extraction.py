@@ -0,0 +1,117 @@
+"""The vectorized extraction and summary against the row-by-row reference (extract_clock_times)"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from attendance_core import (
+    clean_attendance_frame, extract_clock_minutes_batch, extract_clock_times, extract_clock_times_batch,
+    generate_employee_summary,
+)
+from compact_records import display_attendance_frame
+from shift_policy import DEFAULT_POLICY, ShiftPolicy
+from time_parsing import MISSING_MINUTE, format_minutes, parse_hhmm
+
+POLICIES = [DEFAULT_POLICY,
+            ShiftPolicy(shift_start=1200, shift_end=300, out_only_window=(180, 1020), collapse_minutes=30)]
+
+
+def reference_clock_times(df, policy=DEFAULT_POLICY):
+    """'Clock In'/'Clock Out' columns from extract_clock_times, one row at a time"""
+    pairs = [extract_clock_times(a, b, policy) for a, b in zip(df['Clock-in/out Time'], df['Clock Out'])]
+    return pd.DataFrame(pairs, columns=['Clock In', 'Clock Out'], index=df.index)
+
+
+def reference_summary(df, policy=DEFAULT_POLICY):
+    """Employee summary computed employee by employee and row by row, from "HH:MM" clock times"""
+    df = df.assign(Date=pd.to_datetime(df['Date']))
+    working_days = df.loc[df['Clock In'].notna(), 'Date'].dt.date.nunique()
+    rows = []
+    for name, emp in df.groupby('Name'):
+        late = early = undertime = overtime = 0
+        for clock_in, clock_out in zip(emp['Clock In'], emp['Clock Out']):
+            checkin = parse_hhmm(clock_in) if pd.notna(clock_in) else None
+            checkout = parse_hhmm(clock_out) if pd.notna(clock_out) else None
+            late += checkin is not None and checkin > policy.shift_start
+            early += checkout is not None and checkout < policy.shift_end
+            if checkin is not None and checkout is not None:
+                undertime += max(checkin - policy.shift_start, 0) + max(policy.shift_end - checkout, 0)
+                overtime += max(policy.shift_start - checkin, 0) + max(checkout - policy.shift_end, 0)
+        attended = max(emp.loc[emp['Clock In'].notna(), 'Date'].nunique(),
+                       emp.loc[emp['Clock Out'].notna(), 'Date'].nunique())
+        rows.append((name, int(emp['Clock In'].notna().sum()), int(emp['Clock Out'].notna().sum()),
+                     working_days - attended, late, early, round(undertime / 60, 2), round(overtime / 60, 2),
+                     round((overtime - undertime) / 60, 2)))
+    return pd.DataFrame(rows, columns=['Name', 'Total Check-ins', 'Total Check-outs', 'Absences', 'Late Check-ins',
+                                       'Early Checkouts', 'Undertime (hrs)', 'Overtime (hrs)', 'Net Overtime (hrs)'])
+
+
+def test_documented_cases():
+    assert extract_clock_times('01:35', '04:50') == ('01:35', '04:50')
+    assert extract_clock_times('20:07 20:07', '02:30') == ('20:07', '02:30')
+    assert extract_clock_times('19:07', '') == ('19:07', None)
+    assert extract_clock_times('', '04:15') == (None, '04:15')
+    assert extract_clock_times('22:09 22:09 22:09 22:09', '22:09') == ('22:09', None)
+    assert extract_clock_times('01:30', '02:00') == ('01:30', None)
+    assert extract_clock_times('10:00', '10:30') == (None, '10:30')
+    assert extract_clock_times(np.nan, np.nan) == (None, None)
+
+
+@pytest.mark.parametrize('seed', [0, 1, 2])
+@pytest.mark.parametrize('policy', POLICIES)
+def test_batch_matches_reference(fuzzed, seed, policy):
+    df = fuzzed(3000, seed)
+    expected = reference_clock_times(df, policy)
+
+    pd.testing.assert_frame_equal(extract_clock_times_batch(df['Clock-in/out Time'], df['Clock Out'], policy),
+                                  expected)
+
+    minutes = extract_clock_minutes_batch(df['Clock-in/out Time'], df['Clock Out'], policy)
+    for column in ('Clock In', 'Clock Out'):
+        expected_minutes = expected[column].map(lambda t: MISSING_MINUTE if t is None else parse_hhmm(t))
+        np.testing.assert_array_equal(minutes[column].to_numpy(), expected_minutes.to_numpy())
+
+
+def test_batch_keeps_index(fuzzed):
+    df = fuzzed(500, 3).iloc[::-2]
+    pd.testing.assert_frame_equal(extract_clock_times_batch(df['Clock-in/out Time'], df['Clock Out']),
+                                  reference_clock_times(df))
+
+
+@pytest.mark.parametrize('seed', [0, 4])
+@pytest.mark.parametrize('policy', POLICIES)
+def test_cleaned_frame_matches_reference(fuzzed, seed, policy):
+    df = fuzzed(3000, seed)
+    expected = reference_clock_times(df, policy)
+    # Compact records keep minutes, so a token like '19:7' reads back as '19:07'
+    expected = expected.apply(lambda column: column.map(lambda t: t and format_minutes(parse_hhmm(t))))
+    expected = pd.concat([df[['Emp No.', 'AC-No.', 'Name', 'Date']], expected], axis=1)
+    expected = expected[expected['Clock In'].notna() | expected['Clock Out'].notna()]
+
+    cleaned = display_attendance_frame(clean_attendance_frame(df, policy=policy))
+    got = cleaned[['Emp No.', 'AC-No.', 'Name', 'Date', 'Clock In', 'Clock Out']].astype({'Name': object})
+    pd.testing.assert_frame_equal(got.reset_index(drop=True),
+                                  expected.reset_index(drop=True).astype({'Date': 'datetime64[ns]'}),
+                                  check_dtype=False)
+
+
+@pytest.mark.parametrize('seed', [0, 5])
+@pytest.mark.parametrize('policy', POLICIES)
+def test_summary_matches_reference(fuzzed, seed, policy):
+    df = fuzzed(4000, seed)
+    df = df.assign(**reference_clock_times(df, policy))
+    df = df[df['Clock In'].notna() | df['Clock Out'].notna()]
+    expected = reference_summary(df, policy)
+
+    summary = generate_employee_summary(clean_attendance_frame(fuzzed(4000, seed), policy=policy), policy)
+    pd.testing.assert_frame_equal(summary.drop(columns='Month'), expected, check_dtype=False, atol=0.011)
+
+    # The same summary from "HH:MM" strings and dates, as read back from a downloaded CSV
+    pd.testing.assert_frame_equal(generate_employee_summary(df, policy), summary)
+
+
+def test_month_is_one_unambiguous_label(fuzzed):
+    june = fuzzed(300, 6, employees=2)
+    spanning = fuzzed(300, 6, employees=2, days=400).assign(Name=lambda df: 'Y' + df['Name'])
+    summary = generate_employee_summary(clean_attendance_frame(pd.concat([june, spanning], ignore_index=True)))
+    # A span from one June to the next is not mistaken for a single month
+    assert summary['Month'].tolist() == ['2025-06', '2025-06', '2025-06..2026-06', '2025-06..2026-07']
@@ -0,0 +1,27 @@
+"""Sharded employee summary against the single-process one"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from attendance_core import generate_employee_summary
+from compact_records import display_attendance_frame
+from parallel_summary import parallel_employee_summary, shard_bounds
+
+
+def test_shards_hold_whole_employees():
+    codes = np.array([0, 0, 1, 1, 1, 2, 3, 3])
+    bounds = shard_bounds(codes, 3)
+    assert bounds[0] == 0 and bounds[-1] == len(codes)
+    # Every cut falls between two employees
+    assert all(codes[cut - 1] != codes[cut] for cut in bounds[1:-1])
+
+
+@pytest.mark.parametrize('workers, shards', [(2, None), (3, 7), (1, 1)])
+def test_parallel_summary_matches_summary(cleaned_with_gaps, workers, shards):
+    cleaned = cleaned_with_gaps
+    expected = generate_employee_summary(cleaned)
+    pd.testing.assert_frame_equal(parallel_employee_summary(cleaned, workers=workers, shards=shards), expected,
+                                  check_exact=True)
+    # Cleaned records read back from a CSV download
+    pd.testing.assert_frame_equal(parallel_employee_summary(display_attendance_frame(cleaned), workers=workers),
+                                  expected, check_exact=True)
@@ -0,0 +1,105 @@
+"""Period reports from month partitions against the summary of the same records"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from attendance_core import clean_attendance_frame, generate_employee_summary
+from compact_records import day_ordinals
+from period_partitions import PeriodPartitions, period_days
+
+PERIODS = [('2025',), ('2025-Q2',), ('2025-06',), ('2025-03-15', '2025-08-31'), ('2025-02-10', '2025-02-20'),
+           ('2025-06-14',), ('2024',), ('2025-11', '2026-03')]
+
+
+@pytest.fixture
+def year(fuzzed):
+    df = fuzzed(20000, 11, days=365, start='2025-01-01')
+    df.loc[df.index[::97], 'Name'] = None
+    df.loc[df.index[::131], 'Date'] = None
+    return df
+
+
+def expected_report(cleaned, start, end=None):
+    first_day, last_day = period_days(start, end)
+    days = day_ordinals(cleaned['Date']).to_numpy()
+    return generate_employee_summary(cleaned[(days >= first_day) & (days <= last_day)])
+
+
+@pytest.mark.parametrize('period', PERIODS)
+def test_report_matches_summary(year, tmp_path, period):
+    cleaned = clean_attendance_frame(year)
+    PeriodPartitions(str(tmp_path)).update(cleaned)
+
+    # Reports from a fresh load read the partitions back from disk
+    report = PeriodPartitions(str(tmp_path)).report(*period)
+    pd.testing.assert_frame_equal(report, expected_report(cleaned, *period), check_dtype=False)
+
+
+def test_monthly_uploads_match_one_upload(year, tmp_path):
+    partitions = PeriodPartitions(str(tmp_path))
+    months = pd.to_datetime(year['Date']).dt.month
+    for month in range(1, 13):
+        assert partitions.update(clean_attendance_frame(year[months == month])) == [f'2025-{month:02d}']
+
+    cleaned = clean_attendance_frame(year)
+    for period in PERIODS:
+        pd.testing.assert_frame_equal(partitions.report(*period), expected_report(cleaned, *period),
+                                      check_dtype=False)
+
+
+def test_update_rewrites_only_touched_months(year, tmp_path):
+    partitions = PeriodPartitions(str(tmp_path))
+    partitions.update(clean_attendance_frame(year))
+    stored = {month: partitions.partition(month) for month in partitions.months()}
+
+    june = pd.to_datetime(year['Date']).dt.month == 6
+    assert partitions.update(clean_attendance_frame(year[june].iloc[::2])) == ['2025-06']
+    assert all(partitions.partition(month) is stored[month] for month in stored
+               if month != int(np.datetime64('2025-06', 'M').astype(np.int64)))
+
+
+def test_uploads_with_different_employees_are_combined(fuzzed, tmp_path):
+    branch_a = fuzzed(2000, 12, employees=5)
+    branch_b = fuzzed(2000, 13, employees=5).assign(Name=lambda df: 'B' + df['Name'])
+    partitions = PeriodPartitions(str(tmp_path))
+    partitions.update(clean_attendance_frame(branch_a))
+    partitions.update(clean_attendance_frame(branch_b))
+
+    expected = generate_employee_summary(clean_attendance_frame(pd.concat([branch_a, branch_b], ignore_index=True)))
+    assert len(expected) == 10
+    pd.testing.assert_frame_equal(partitions.report('2025-06'), expected, check_dtype=False)
+
+
+def test_reexport_replaces_only_its_employees_days(year, tmp_path):
+    partitions = PeriodPartitions(str(tmp_path))
+    partitions.update(clean_attendance_frame(year))
+
+    dates = pd.to_datetime(year['Date'])
+    reexported = year[(dates >= '2025-06-10') & (dates < '2025-07-10') & year['Name'].isin(['N001', 'N002', 'N003'])]
+    # The re-export has other punches for the same employees and days, and drops some of their rows
+    reexported = reexported.iloc[::2].assign(**{'Clock-in/out Time': '18:45 03:50', 'Clock Out': None})
+    partitions.update(clean_attendance_frame(reexported))
+
+    replaced = pd.MultiIndex.from_frame(reexported[['Name', 'Date']])
+    kept = year[~pd.MultiIndex.from_frame(year[['Name', 'Date']]).isin(replaced)]
+    cleaned = clean_attendance_frame(pd.concat([kept, reexported], ignore_index=True))
+    for period in PERIODS:
+        pd.testing.assert_frame_equal(partitions.report(*period), expected_report(cleaned, *period),
+                                      check_dtype=False)
+
+
+def test_reexport_recomputes_working_days(tmp_path):
+    def records(rows):
+        return clean_attendance_frame(pd.DataFrame(rows, columns=['Emp No.', 'AC-No.', 'Name', 'Date',
+                                                                  'Clock-in/out Time', 'Clock Out']))
+
+    partitions = PeriodPartitions(str(tmp_path))
+    partitions.update(records([(1, 101, 'Ali', '2025-06-01', '19:00', '04:00'),
+                               (2, 102, 'Sara', '2025-06-02', '19:10', '04:00'),
+                               (3, 103, None, '2025-06-03', '19:00', None)]))
+    # Sara's corrected day has no check-in left, so June 2 is no longer a working day
+    partitions.update(records([(2, 102, 'Sara', '2025-06-02', None, '04:00')]))
+
+    report = partitions.report('2025-06')
+    assert report['Absences'].tolist() == [1, 1]
+    assert report['Total Check-ins'].tolist() == [1, 0]
@@ -0,0 +1,87 @@
+"""Punch logs against the workbook path on the same punches"""
+import io
+
+import pandas as pd
+import pytest
+
+from attendance_core import clean_attendance_frame, generate_employee_summary
+from compact_records import display_attendance_frame
+from data_quality import DataQualityReport
+from punch_log import process_punch_log
+from time_parsing import format_minutes, parse_hhmm
+
+CLEANED_COLUMNS = ['Emp No.', 'AC-No.', 'Name', 'Date', 'Clock In', 'Clock Out', 'First Punch', 'Last Punch']
+
+
+def punch_log(df):
+    """One (AC-No., Name, Emp No., Time) line per valid punch of workbook rows, shuffled.
+
+    A row's punches before 15:00 belong to the morning after its date, as the terminal stamps them.
+    """
+    lines = []
+    rows = zip(df['AC-No.'], df['Name'], df['Emp No.'], df['Date'], df['Clock-in/out Time'], df['Clock Out'])
+    for ac, name, emp, date, clock_in_out, clock_out in rows:
+        tokens = [token for cell in (clock_in_out, clock_out) if isinstance(cell, str) for token in cell.split()]
+        for minute in filter(lambda m: m is not None, map(parse_hhmm, tokens)):
+            day = pd.Timestamp(date) + pd.Timedelta(days=int(minute < 900))
+            lines.append((ac, name, emp, f'{day:%Y-%m-%d} {format_minutes(minute)}:00'))
+    log = pd.DataFrame(lines, columns=['AC-No.', 'Name', 'Emp No.', 'Time'])
+    return log.sample(frac=1, random_state=1)
+
+
+def sorted_records(cleaned):
+    cleaned = cleaned[CLEANED_COLUMNS].astype({'Name': str})
+    return cleaned.sort_values(['AC-No.', 'Date']).reset_index(drop=True)
+
+
+@pytest.fixture
+def workbook(fuzzed):
+    # A workbook has one row per employee and day
+    return fuzzed(4000, 8).drop_duplicates(['AC-No.', 'Date']).reset_index(drop=True)
+
+
+def test_csv_log_matches_workbook(workbook):
+    expected = clean_attendance_frame(workbook)
+    data = punch_log(workbook).to_csv(index=False).encode()
+
+    cleaned, summary, error = process_punch_log(io.BytesIO(data), chunk_rows=1000)
+    assert error is None
+    pd.testing.assert_frame_equal(sorted_records(cleaned), sorted_records(expected), check_dtype=False)
+    pd.testing.assert_frame_equal(summary, generate_employee_summary(expected))
+
+
+def test_attlog_is_named_by_ac_number(workbook):
+    log = punch_log(workbook)
+    data = '\n'.join(f'  {ac}\t{time}\t1\t0\t1\t0' for ac, time in zip(log['AC-No.'], log['Time'])).encode()
+
+    cleaned, summary, error = process_punch_log(io.BytesIO(data))
+    assert error is None
+    expected = sorted_records(clean_attendance_frame(workbook))
+    expected['Name'] = expected['AC-No.'].astype(str)
+    expected['Emp No.'] = expected['AC-No.']
+    pd.testing.assert_frame_equal(sorted_records(cleaned), expected, check_dtype=False)
+
+
+def test_unreadable_lines_are_reported(workbook):
+    data = punch_log(workbook).to_csv(index=False) + 'abc,X,1,2025-06-01 08:00:00\n5,Y,1,notatime\n'
+    quality = DataQualityReport()
+
+    cleaned, summary, error = process_punch_log(io.BytesIO(data.encode()), quality=quality)
+    assert error is None
+    assert len(cleaned) == len(clean_attendance_frame(workbook))
+    malformed = quality.table()
+    malformed = malformed[malformed['Issue'] == 'Malformed token']
+    assert set(malformed['Employee']) >= {'X', 'Y'}
+
+
+def test_night_shift_across_midnight_is_one_row():
+    data = b'AC-No.,Name,Time\n7,Ali,2025-06-01 19:00:00\n7,Ali,2025-06-02 03:00:00\n7,Ali,2025-06-02 19:05:00\n'
+
+    cleaned, summary, error = process_punch_log(io.BytesIO(data))
+    assert error is None
+    rows = display_attendance_frame(cleaned)
+    assert rows['Date'].dt.strftime('%Y-%m-%d').tolist() == ['2025-06-01', '2025-06-02']
+    assert rows['Clock In'].tolist() == ['19:00', '19:05']
+    assert rows['Clock Out'].tolist() == ['03:00', None]
+    assert summary.loc[0, 'Early Checkouts'] == 1
+    assert summary.loc[0, 'Undertime (hrs)'] == 1.0
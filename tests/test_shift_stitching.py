@@ -0,0 +1,26 @@
+"""Shift stitching across date rows"""
+import pandas as pd
+
+from shift_policy import ShiftPolicy
+from shift_stitching import stitch_shifts
+
+
+def export(rows):
+    return pd.DataFrame(rows, columns=['Name', 'Date', 'Clock-in/out Time', 'Clock Out'])
+
+
+def test_night_shift_split_over_two_rows_is_one_shift():
+    shifts = stitch_shifts(export([('Ali', '2025-06-01', '19:00', None),
+                                   ('Ali', '2025-06-02', '03:00 19:10', None),
+                                   ('Ali', '2025-06-03', '10:00', None)]))
+    assert shifts['Shift Date'].dt.strftime('%Y-%m-%d').tolist() == ['2025-06-01', '2025-06-02']
+    assert shifts['Hours'].tolist()[0] == 8.0
+    # 19:10 and the next morning's 10:00 share a window and are more than an hour apart
+    assert shifts['Punches'].tolist() == [2, 2]
+
+
+def test_punch_rules_come_from_the_policy():
+    df = export([('Sara', '2025-06-01', '10:00 10:40', None)])
+    assert stitch_shifts(df)['Clock In'].isna().all()
+    shifts = stitch_shifts(df, ShiftPolicy(collapse_minutes=30))
+    assert shifts['Hours'].tolist() == [0.67]
@@ -0,0 +1,22 @@
+"""SummaryAccumulator fed in chunks or merged against the whole-file summary"""
+import pandas as pd
+
+from attendance_core import SummaryAccumulator, generate_employee_summary
+
+
+def test_chunked_accumulator_matches_summary(cleaned_with_gaps):
+    cleaned = cleaned_with_gaps
+    accumulator = SummaryAccumulator()
+    for start in range(0, len(cleaned), 700):
+        accumulator.add(cleaned.iloc[start:start + 700])
+    pd.testing.assert_frame_equal(accumulator.summary(), generate_employee_summary(cleaned), check_exact=True)
+
+
+def test_merged_accumulators_match_summary(cleaned_with_gaps):
+    cleaned = cleaned_with_gaps
+    halves = [SummaryAccumulator(), SummaryAccumulator()]
+    middle = len(cleaned) // 2
+    halves[0].add(cleaned.iloc[:middle])
+    halves[1].add(cleaned.iloc[middle:])
+    merged = halves[0].merge(halves[1])
+    pd.testing.assert_frame_equal(merged.summary(), generate_employee_summary(cleaned), check_exact=True)
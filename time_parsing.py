@@ -0,0 +1,54 @@
+"""Shared HH:MM parsing backed by a precomputed lookup table.
+
+Attendance exports only ever contain a few hundred distinct time tokens, so
+instead of calling datetime.strptime(x, '%H:%M') for every one of them we map
+each token to its minute of the day with a single dict lookup.
+"""
+import sys
+
+MINUTES_PER_DAY = 1440
+
+# Sentinel for "no time" in uint16 minute-of-day columns
+MISSING_MINUTE = 0xFFFF
+
+# "HH:MM" label for every minute of the day, indexed by minute
+MINUTE_LABELS = [f'{minute // 60:02d}:{minute % 60:02d}' for minute in range(MINUTES_PER_DAY)]
+
+
+def _build_lookup_table():
+    """Map every token strptime('%H:%M') accepts to its minute of the day"""
+    table = {}
+    for minute in range(MINUTES_PER_DAY):
+        hour, mins = divmod(minute, 60)
+        # strptime also accepts unpadded hours and minutes, e.g. "9:05" or "19:7"
+        for hour_str in {f'{hour:02d}', str(hour)}:
+            for mins_str in {f'{mins:02d}', str(mins)}:
+                table[sys.intern(f'{hour_str}:{mins_str}')] = minute
+    return table
+
+
+# 1440 canonical "HH:MM" entries plus their unpadded spellings
+HHMM_TO_MINUTES = _build_lookup_table()
+
+
+def parse_hhmm(token):
+    """Return the minute of the day for an HH:MM token, or None if it is not a valid time"""
+    # Fast path: valid tokens are 3-5 character strings, reject anything else before hashing
+    if type(token) is not str or not 3 <= len(token) <= 5:
+        return None
+    return HHMM_TO_MINUTES.get(token)
+
+
+def parse_hhmm_series(tokens):
+    """Map a Series of HH:MM tokens to minute-of-day floats (NaN where missing or invalid)"""
+    return tokens.map(HHMM_TO_MINUTES)
+
+
+def format_minutes(minute):
+    """Format a minute of the day as HH:MM"""
+    return MINUTE_LABELS[minute]
+
+
+def minutes_between(start_minute, end_minute):
+    """Minutes from start to end, treating an earlier end as the next day"""
+    return (end_minute - start_minute) % MINUTES_PER_DAY
@@ -0,0 +1,84 @@
+"""Spill uploaded workbooks to disk and read them back memory-mapped.
+
+    with spill_upload(uploaded_file) as upload:      # or MappedUpload(path) for a file on disk
+        process_attendance_file(upload, streaming=True)
+
+An upload held in memory is written to a temporary file in blocks and then
+mapped read-only, so the readers pull pages from the page cache instead of
+working on an in-memory copy of the workbook; the OS can drop those pages
+under memory pressure. Streamlit's UploadedFile shares its bytes until it is
+written to, so reading it in blocks (or getvalue()) does not copy it, while
+getbuffer() would. MappedUpload is file-like (read/seek/tell, for
+openpyxl's zip reader) and path-like (so xlrd and pd.read_excel open the file
+themselves; xlrd maps it too).
+
+Set ATTENDANCE_SPILL_DIR to put the temporary files somewhere other than the
+system temp directory.
+"""
+import contextlib
+import io
+import mmap
+import os
+import shutil
+import tempfile
+
+SPILL_BLOCK_BYTES = 1024 * 1024
+
+
+def spill_dir():
+    """Directory for spilled uploads, from ATTENDANCE_SPILL_DIR (None = system temp directory)"""
+    return os.environ.get('ATTENDANCE_SPILL_DIR') or None
+
+
+class MappedUpload:
+    """A workbook file mapped read-only, with the name and size attributes of an upload"""
+    __slots__ = ('path', 'name', 'size', '_file', 'buffer')
+
+    def __init__(self, path, name=None):
+        self.path = path
+        self.name = name or os.path.basename(path)
+        self._file = open(path, 'rb')
+        self.size = os.fstat(self._file.fileno()).st_size
+        # Empty files cannot be mapped
+        self.buffer = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if self.size else io.BytesIO()
+
+    def __fspath__(self):
+        return self.path
+
+    def read(self, size=-1):
+        return self.buffer.read(size)
+
+    def seek(self, offset, whence=os.SEEK_SET):
+        return self.buffer.seek(offset, whence)
+
+    def tell(self):
+        return self.buffer.tell()
+
+    def seekable(self):
+        return True
+
+    def close(self):
+        self.buffer.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+@contextlib.contextmanager
+def spill_upload(uploaded_file):
+    """Write an in-memory upload to a temporary file and yield it as a MappedUpload"""
+    extension = os.path.splitext(uploaded_file.name)[1].lower()
+    fd, path = tempfile.mkstemp(suffix=extension, prefix='attendance-upload-', dir=spill_dir())
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            uploaded_file.seek(0)
+            shutil.copyfileobj(uploaded_file, f, SPILL_BLOCK_BYTES)
+        uploaded_file.seek(0)
+        with MappedUpload(path, uploaded_file.name) as upload:
+            yield upload
+    finally:
+        os.remove(path)